@@ -0,0 +1,181 @@
+"""Micro-benchmark for the Creality frame decoder.
+
+Compares the table-driven decoder in ``decoder.py`` with the if-chain it
+replaced. Both decode a synthetic print: a stream of full telemetry frames
+where temperatures jitter, the head moves and timers tick, followed by a
+stream of small temperature-only deltas. The "cold" column resets the
+decoder before every frame, which shows the cost of the table without the
+unchanged-field skip. The table also decodes the fan and light fields,
+which the if-chain ignored, so it does more work per full frame; the two
+are checked to agree on the fields they share. Runs without Home Assistant
+installed:
+
+    python benchmarks/bench_decoder.py [--frames 2000] [--rounds 30]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any
+
+import harness
+
+
+FULL_FRAME: dict[str, Any] = {
+    "nozzleTemp": "219.870000",
+    "targetNozzleTemp": 220,
+    "bedTemp0": "59.950000",
+    "targetBedTemp0": 60,
+    "boxTemp": 31,
+    "printProgress": 42,
+    "printJobTime": 3661,
+    "printLeftTime": 5120,
+    "printFileName": "/usr/data/printer_data/gcodes/benchy_PLA_0.2_1h42m.gcode",
+    "deviceState": 1,
+    "state": 1,
+    "curPosition": "X:117.25 Y:126.50 Z:12.40",
+    "realTimeSpeed": "187.32",
+    "curFeedratePct": 100,
+    "layer": 62,
+    "TotalLayer": 240,
+    "modelFanPct": 100,
+    "auxiliaryFanPct": 60,
+    "caseFanPct": 30,
+    "lightSw": 1,
+    "err": {"errcode": 0, "key": 0},
+    "model": "K1 Max",
+    "hostname": "K1Max-A1B2",
+    "usedMaterialLength": 1523,
+}
+
+DELTA_FRAME: dict[str, Any] = {"nozzleTemp": "219.910000", "bedTemp0": "59.970000"}
+
+
+def synthetic_print(frames: int) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Return full frames and delta frames for a print in progress."""
+    full, delta = [], []
+    for i in range(frames):
+        frame = dict(FULL_FRAME)
+        frame["nozzleTemp"] = f"{219.5 + (i * 7 % 10) / 10:.6f}"
+        frame["bedTemp0"] = f"{59.8 + (i * 3 % 5) / 10:.6f}"
+        frame["curPosition"] = f"X:{100 + i % 150:.2f} Y:{120 + i * 3 % 90:.2f} Z:12.40"
+        frame["realTimeSpeed"] = f"{150 + i * 11 % 90:.2f}"
+        frame["printJobTime"] = 3661 + i // 4
+        frame["printLeftTime"] = 5120 - i // 4
+        frame["printProgress"] = 42 + i // 200
+        full.append(frame)
+        delta.append(
+            {"nozzleTemp": frame["nozzleTemp"], "bedTemp0": frame["bedTemp0"]}
+        )
+    return full, delta
+
+
+def legacy_decode(data: dict[str, Any]) -> dict[str, Any]:
+    """Decode a frame the way the coordinator did before the mapping table."""
+    updated_data = {}
+
+    if "nozzleTemp" in data:
+        updated_data["nozzle_temp"] = round(float(data["nozzleTemp"]), 1)
+    if "bedTemp0" in data:
+        updated_data["bed_temp"] = round(float(data["bedTemp0"]), 1)
+    if "targetNozzleTemp" in data:
+        updated_data["nozzle_target"] = round(float(data["targetNozzleTemp"]), 1)
+    if "targetBedTemp0" in data:
+        updated_data["bed_target"] = round(float(data["targetBedTemp0"]), 1)
+
+    if "printProgress" in data:
+        updated_data["progress"] = round(float(data["printProgress"]), 1)
+    if "printJobTime" in data:
+        updated_data["print_duration"] = int(data["printJobTime"])
+    if "printLeftTime" in data:
+        updated_data["print_time_remaining"] = int(data["printLeftTime"])
+        if "printJobTime" in data:
+            updated_data["total_duration"] = int(data["printJobTime"]) + int(data["printLeftTime"])
+
+    if "printFileName" in data:
+        updated_data["filename"] = str(data["printFileName"]).split("/")[-1]
+    if "state" in data or "deviceState" in data:
+        state_code = data.get("deviceState", data.get("state", 0))
+        state_map = {0: "idle", 1: "printing", 2: "paused", 3: "complete"}
+        updated_data["state"] = state_map.get(state_code, "idle")
+
+    if "curPosition" in data:
+        pos_str = data["curPosition"]
+        x_match = pos_str.split("X:")[1].split()[0] if "X:" in pos_str else "0"
+        y_match = pos_str.split("Y:")[1].split()[0] if "Y:" in pos_str else "0"
+        z_match = pos_str.split("Z:")[1].split()[0] if "Z:" in pos_str else "0"
+        updated_data["position_x"] = round(float(x_match), 2)
+        updated_data["position_y"] = round(float(y_match), 2)
+        updated_data["position_z"] = round(float(z_match), 2)
+
+    if "realTimeSpeed" in data:
+        updated_data["speed"] = round(float(data["realTimeSpeed"]), 2)
+    if "curFeedratePct" in data:
+        updated_data["speed_factor"] = round(float(data["curFeedratePct"]), 0)
+
+    if "layer" in data:
+        updated_data["current_layer"] = int(data["layer"])
+    if "TotalLayer" in data:
+        updated_data["total_layers"] = int(data["TotalLayer"])
+
+    return updated_data
+
+
+def _time_per_frame(
+    decoders: dict[str, Any], frames: list[dict[str, Any]], rounds: int
+) -> dict[str, float]:
+    """Return the best time per frame in microseconds for each decoder.
+
+    Rounds are interleaved so that noise from other processes hits every
+    decoder alike.
+    """
+    best = dict.fromkeys(decoders, float("inf"))
+    for _ in range(rounds):
+        for name, decode in decoders.items():
+            start = time.perf_counter()
+            for frame in frames:
+                decode(frame)
+            best[name] = min(best[name], time.perf_counter() - start)
+    return {name: elapsed / len(frames) * 1e6 for name, elapsed in best.items()}
+
+
+def main() -> None:
+    """Run the benchmark and print a before/after table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+
+    decoder_module = harness.import_integration("decoder")
+    full, delta = synthetic_print(args.frames)
+
+    # The decoders must agree on every field the legacy decoder knew about
+    decoder = decoder_module.CrealityFrameDecoder()
+    state: dict[str, Any] = {}
+    for frame in full:
+        legacy = legacy_decode(frame)
+        state.update(decoder.decode(frame))
+        mismatched = {key for key in legacy if legacy[key] != state.get(key)}
+        if mismatched:
+            raise SystemExit(f"Decoders disagree on {sorted(mismatched)}")
+
+    def cold(frame: dict[str, Any]) -> dict[str, Any]:
+        decoder.reset()
+        return decoder.decode(frame)
+
+    print(f"{'stream':<8} {'legacy µs':>10} {'cold µs':>10} {'table µs':>10} {'speedup':>8}")
+    for name, frames in (("full", full), ("delta", delta)):
+        warm = decoder_module.CrealityFrameDecoder()
+        times = _time_per_frame(
+            {"legacy": legacy_decode, "cold": cold, "table": warm.decode},
+            frames,
+            args.rounds,
+        )
+        print(
+            f"{name:<8} {times['legacy']:>10.2f} {times['cold']:>10.2f}"
+            f" {times['table']:>10.2f} {times['legacy'] / times['table']:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
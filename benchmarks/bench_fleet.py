@@ -0,0 +1,171 @@
+"""Measure event-loop lag while one instance follows a fleet of printers.
+
+Starts emulated printers (tools/k1max_emulator.py) in a separate process,
+then, for each fleet size, connects that many coordinators through the
+shared connection manager, with every entity subscribed as in Home
+Assistant, and samples how late a 10 ms ticker wakes up on the event loop.
+Flat lag percentiles as the fleet grows mean frame handling and reconnects
+are not monopolising the loop.
+
+Reported per fleet size:
+
+* seconds until every printer is connected (connects are bounded by
+  MAX_CONCURRENT_CONNECTS)
+* frames/s handled across the fleet
+* event-loop lag p50, p99 and max in milliseconds
+* reconnects during sampling; with --disconnect-every the emulator drops
+  every printer periodically, which exercises backoff and the reconnect
+  token bucket under a simultaneous outage
+
+Requires aiohttp and websockets.
+
+    python benchmarks/bench_fleet.py [--sizes 1 10 20 40 80] [--seconds 10] [--rate 5]
+        [--disconnect-every SECONDS]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any
+
+import harness
+
+EMULATOR = Path(__file__).resolve().parent.parent / "tools" / "k1max_emulator.py"
+TICK = 0.01
+
+
+def start_emulator(
+    count: int, ws_port: int, stride: int, rate: float, disconnect_every: float | None
+) -> subprocess.Popen:
+    """Start count emulated printers and wait until they are all listening."""
+    extra = ["--disconnect-every", str(disconnect_every)] if disconnect_every else []
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(EMULATOR),
+            "--count", str(count),
+            "--ws-port", str(ws_port),
+            "--web-port", str(ws_port + 1),
+            "--camera-port", str(ws_port + 2),
+            "--port-stride", str(stride),
+            "--rate", str(rate),
+            "--camera-size", "64x48",
+            "--stats-interval", "3600",
+            *extra,
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    # The emulator prints a header and one line per printer once bound
+    for _ in range(count + 1):
+        if not process.stdout.readline():
+            process.kill()
+            raise RuntimeError("Emulator exited before all printers started")
+    return process
+
+
+async def sample_lag(seconds: float) -> list[float]:
+    """Return how late each TICK-second sleep woke up, in milliseconds."""
+    lags = []
+    end = time.monotonic() + seconds
+    while (before := time.monotonic()) < end:
+        await asyncio.sleep(TICK)
+        lags.append((time.monotonic() - before - TICK) * 1000)
+    return lags
+
+
+async def measure(size: int, ws_port: int, stride: int, seconds: float) -> dict[str, Any]:
+    """Follow size printers and return connect time, throughput and lag."""
+    hass = harness.HomeAssistant(harness.RealClock())
+    coordinators = []
+    for index in range(size):
+        coordinator, _ = await harness.async_setup_printer(
+            hass, entry_id=f"printer_{index}", ws_port=ws_port + index * stride
+        )
+        coordinators.append(coordinator)
+
+    connections = coordinators[0].connections
+    start = time.monotonic()
+    for coordinator in coordinators:
+        await coordinator.async_start_websocket()
+    while connections.aggregate_health()["connected"] < size:
+        await asyncio.sleep(0.01)
+    connect_seconds = time.monotonic() - start
+
+    # Let subscriptions and first full frames settle before sampling
+    await asyncio.sleep(1)
+    before = connections.aggregate_health()
+    lags = await sample_lag(seconds)
+    after = connections.aggregate_health()
+
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+    if hass.http_session is not None:
+        await hass.http_session.close()
+
+    lags.sort()
+    return {
+        "printers": size,
+        "connect_seconds": connect_seconds,
+        "frames_per_sec": (after["frames"] - before["frames"]) / seconds,
+        "reconnects": after["connects"] - before["connects"],
+        "lag_p50_ms": statistics.median(lags),
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1],
+        "lag_max_ms": lags[-1],
+    }
+
+
+async def async_main(sizes: list[int], ws_port: int, stride: int, seconds: float) -> list[dict[str, Any]]:
+    """Measure every fleet size in turn."""
+    return [await measure(size, ws_port, stride, seconds) for size in sizes]
+
+
+def main() -> None:
+    """Parse arguments, run the emulator and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 20, 40, 80])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, default=5.0, help="frames per second per printer")
+    parser.add_argument("--ws-port", type=int, default=20000)
+    parser.add_argument("--port-stride", type=int, default=10)
+    parser.add_argument("--disconnect-every", type=float, default=None)
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    emulator = start_emulator(
+        max(args.sizes), args.ws_port, args.port_stride, args.rate, args.disconnect_every
+    )
+    try:
+        results = asyncio.run(
+            async_main(args.sizes, args.ws_port, args.port_stride, args.seconds)
+        )
+    finally:
+        emulator.terminate()
+        emulator.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'printers':>8} {'connect s':>10} {'frames/s':>9}"
+        f" {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11} {'reconnects':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['printers']:>8} {result['connect_seconds']:>10.2f}"
+            f" {result['frames_per_sec']:>9.0f} {result['lag_p50_ms']:>11.2f}"
+            f" {result['lag_p99_ms']:>11.2f} {result['lag_max_ms']:>11.2f}"
+            f" {result['reconnects']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
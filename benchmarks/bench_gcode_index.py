@@ -0,0 +1,144 @@
+"""Benchmark for the G-code metadata index.
+
+Writes a directory of G-code files with slicer headers, embedded thumbnails
+and footers around a large body, indexes it through ``parse_gcode`` the way
+the index_gcode service does, indexes it again unchanged, and compares the
+time per file with reading each file line by line, as a parser that does
+not know where the metadata lives would. The bodies are sparse, so the
+files take little disk space; each still has 1 MiB of G-code at either
+end. Runs without Home Assistant installed:
+
+    python benchmarks/bench_gcode_index.py [--files 300] [--size-mb 200]
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+from pathlib import Path
+import random
+import tempfile
+import time
+from typing import Any
+
+import harness
+
+DENSE_BYTES = 1024 * 1024
+
+
+def _thumbnail(width: int, height: int, rng: random.Random) -> str:
+    """Return a thumbnail block of random base64 text, as slicers write them."""
+    text = base64.b64encode(rng.randbytes(width * height // 4)).decode()
+    lines = "".join(f"; {text[i:i + 78]}\n" for i in range(0, len(text), 78))
+    return f"; thumbnail begin {width}x{height} {len(text)}\n{lines}; thumbnail end\n;\n"
+
+
+def _moves(rng: random.Random, size: int) -> bytes:
+    """Return about size bytes of extrusion moves and feature comments."""
+    lines = []
+    total = 0
+    while total < size:
+        line = (
+            f"G1 X{rng.uniform(0, 300):.3f} Y{rng.uniform(0, 300):.3f}"
+            f" E{rng.uniform(0, 1):.5f}\n"
+        )
+        if rng.random() < 0.05:
+            line += ";TYPE:Outer wall\n;WIDTH:0.45\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines).encode()
+
+
+def write_files(directory: Path, count: int, size: int, seed: int = 0) -> int:
+    """Write count G-code files of size bytes; return the total size."""
+    rng = random.Random(seed)
+    thumbnails = _thumbnail(32, 32, rng) + _thumbnail(300, 300, rng)
+    body = _moves(rng, DENSE_BYTES)
+    for index in range(count):
+        header = (
+            f"; generated by OrcaSlicer 2.0.0 on 2026-01-01 at 10:00:00\n"
+            f"; total layer number: {100 + index}\n; max_z_height: 30.00\n"
+            f"{thumbnails}"
+        ).encode()
+        footer = (
+            f"; model printing time: 1h 2m; total estimated time: {index}h 5m 10s\n"
+            "; filament used [mm] = 5432.10\n; filament used [g] = 16.2\n"
+            "; CONFIG_BLOCK_START\n; layer_height = 0.2\n; filament_type = PLA\n"
+            + "".join(f"; setting_{n} = {n}\n" for n in range(2000))
+            + "; CONFIG_BLOCK_END\n"
+        ).encode()
+        with (directory / f"part_{index:04d}.gcode").open("wb") as file:
+            file.write(header + body)
+            file.seek(max(size - len(body) - len(footer), file.tell()))
+            file.write(body + footer)
+    return sum(path.stat().st_size for path in directory.iterdir())
+
+
+def read_all_lines(path: Path) -> dict[str, str]:
+    """Collect "; key = value" comments by reading the whole file."""
+    found: dict[str, str] = {}
+    with path.open("rb") as file:
+        for line in file:
+            if line.startswith(b";") and b"=" in line:
+                key, _, value = line[1:].partition(b"=")
+                found.setdefault(key.strip().decode(), value.strip().decode())
+    return found
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--baseline-files", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    harness.install()
+    gcode = harness.import_integration("gcode")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        total = write_files(directory, args.files, args.size_mb * 1024 * 1024)
+
+        start = time.perf_counter()
+        results, errors = gcode._index_files([directory], {})
+        first = time.perf_counter() - start
+        if errors or len(results) != args.files:
+            raise SystemExit(f"Indexing failed: {errors}")
+        if any(
+            not metadata.estimated_time or not metadata.layer_count or not metadata.thumbnails
+            for metadata in results
+        ):
+            raise SystemExit("Metadata missing from an indexed file")
+
+        known = {m.path: (m.size, m.mtime_ns) for m in results}
+        start = time.perf_counter()
+        gcode._index_files([directory], known)
+        again = time.perf_counter() - start
+
+        sample = sorted(directory.iterdir())[: args.baseline_files]
+        start = time.perf_counter()
+        for path in sample:
+            read_all_lines(path)
+        baseline = (time.perf_counter() - start) / len(sample)
+
+    figures: dict[str, Any] = {
+        "files": args.files,
+        "total_gb": round(total / 1024**3, 1),
+        "index_s": round(first, 3),
+        "index_ms_per_file": round(first / args.files * 1000, 2),
+        "reindex_s": round(again, 3),
+        "read_all_ms_per_file": round(baseline * 1000, 1),
+        "read_all_projected_s": round(baseline * args.files, 1),
+        "thumbnails_per_file": len(results[0].thumbnails),
+    }
+    if args.json:
+        print(json.dumps(figures, indent=2))
+        return
+    for key, value in figures.items():
+        print(f"{key:<22} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Replay recorded WebSocket frames through the coordinator hot path.
+
+Each recording in benchmarks/frames/ (or given on the command line) is fed
+through ``CrealityK1MaxCoordinator._handle_websocket_message`` with every
+sensor, binary sensor, number, switch and button entity subscribed, exactly
+as Home Assistant would set them up. Home Assistant itself is stubbed (see
+harness.py), so this runs offline on plain Linux.
+
+Reported per recording:
+
+* frames/s and µs/frame for JSON decode, merge and entity fan-out
+* peak bytes allocated while handling a frame (tracemalloc)
+* generation-0 garbage collections per 1000 frames
+* entity state writes per frame, including writes deferred by rate limits
+
+    python benchmarks/bench_replay.py [--passes 5] [--json] [recording ...]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+from pathlib import Path
+import time
+import tracemalloc
+from typing import Any
+
+import harness
+
+
+def load_recording(path: Path) -> list[tuple[float, str]]:
+    """Load a JSONL recording of {"t": seconds, "msg": raw frame} lines."""
+    frames = []
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                frames.append((float(record["t"]), record["msg"]))
+    return frames
+
+
+async def replay(frames: list[tuple[float, str]], passes: int) -> dict[str, Any]:
+    """Replay frames through a fresh coordinator and return the metrics."""
+    hass = harness.HomeAssistant()
+    coordinator, entities = await harness.async_setup_printer(hass)
+    handle = coordinator._handle_websocket_message  # pylint: disable=protected-access
+    clock = hass.clock
+    span = frames[-1][0] + 1.0 if frames else 1.0
+    offset = 0.0
+
+    async def run_pass(measure_alloc: bool = False) -> tuple[float, int]:
+        nonlocal offset
+        elapsed = 0.0
+        peak_total = 0
+        for t, message in frames:
+            clock.advance(offset + t)
+            if measure_alloc:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                await handle(message)
+                peak_total += tracemalloc.get_traced_memory()[1] - before
+            else:
+                start = time.perf_counter()
+                await handle(message)
+                elapsed += time.perf_counter() - start
+        offset += span
+        # Let coalesced writes flush before the next pass starts
+        clock.advance(offset)
+        return elapsed, peak_total
+
+    # Warm up caches and the adaptive interpreter
+    await run_pass()
+
+    collections = [0]
+
+    def count_gc(phase: str, info: dict[str, Any]) -> None:
+        if phase == "start" and info["generation"] == 0:
+            collections[0] += 1
+
+    writes_before = hass.state_writes
+    gc.callbacks.append(count_gc)
+    try:
+        elapsed = 0.0
+        for _ in range(passes):
+            elapsed += (await run_pass())[0]
+    finally:
+        gc.callbacks.remove(count_gc)
+    writes = hass.state_writes - writes_before
+
+    tracemalloc.start()
+    try:
+        _, peak_total = await run_pass(measure_alloc=True)
+    finally:
+        tracemalloc.stop()
+
+    count = len(frames) * passes
+    return {
+        "frames": len(frames),
+        "entities": len(entities),
+        "frames_per_sec": count / elapsed if elapsed else 0.0,
+        "us_per_frame": elapsed / count * 1e6 if count else 0.0,
+        "peak_bytes_per_frame": peak_total / len(frames) if frames else 0.0,
+        "gc_gen0_per_1k_frames": collections[0] / count * 1000 if count else 0.0,
+        "writes_per_frame": writes / count if count else 0.0,
+    }
+
+
+async def async_main(paths: list[Path], passes: int) -> dict[str, dict[str, Any]]:
+    """Replay every recording."""
+    return {path.stem: await replay(load_recording(path), passes) for path in paths}
+
+
+def main() -> None:
+    """Parse arguments, replay and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", nargs="*", type=Path)
+    parser.add_argument("--passes", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    paths = args.recordings or sorted(harness.FRAMES_DIR.glob("*.jsonl"))
+    results = asyncio.run(async_main(paths, args.passes))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'recording':<12} {'frames':>7} {'frames/s':>10} {'µs/frame':>9}"
+        f" {'peak B/frame':>13} {'gc0/1k':>7} {'writes/frame':>13}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<12} {result['frames']:>7} {result['frames_per_sec']:>10.0f}"
+            f" {result['us_per_frame']:>9.1f} {result['peak_bytes_per_frame']:>13.0f}"
+            f" {result['gc_gen0_per_1k_frames']:>7.1f} {result['writes_per_frame']:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
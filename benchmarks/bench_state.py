@@ -0,0 +1,184 @@
+"""Micro-benchmark for the printer state model.
+
+Compares ``PrinterState``, which applies decoded frames in place, with the
+dict merging it replaced: a set of changed keys plus a merged copy of the
+whole state for every frame. Both apply the decoded frames of a recording
+(benchmarks/frames/creality.jsonl by default) over and over, the way the
+coordinator does under sustained traffic, and then read every field the way
+the entities do. Runs without Home Assistant installed:
+
+    python benchmarks/bench_state.py [--updates 200000] [--rounds 5] [recording]
+"""
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable, Mapping
+import gc
+import json
+from pathlib import Path
+import time
+import tracemalloc
+from typing import Any
+
+import harness
+from bench_replay import load_recording
+
+
+class LegacyState:
+    """State kept as a dict and replaced by a merged copy on every change."""
+
+    def __init__(self, defaults: Mapping[str, Any]) -> None:
+        """Initialize."""
+        self.data = dict(defaults)
+
+    def update(self, updated_data: Mapping[str, Any]) -> set[str]:
+        """Merge partial data the way the coordinator did before PrinterState."""
+        data = self.data
+        changed = {
+            key
+            for key, value in updated_data.items()
+            if key not in data or data[key] != value
+        }
+        if changed:
+            self.data = {**data, **updated_data}
+        return changed
+
+
+def decoded_frames(path: Path) -> list[dict[str, Any]]:
+    """Return the non-empty updates the decoder produces for a recording."""
+    decoder = harness.import_integration("decoder").CrealityFrameDecoder()
+    updates = []
+    for _, message in load_recording(path):
+        if updated := decoder.decode(json.loads(message)):
+            updates.append(updated)
+    return updates
+
+
+def _measure(
+    apply: Callable[[dict[str, Any]], Any],
+    read: Callable[[], Any],
+    updates: list[dict[str, Any]],
+    count: int,
+) -> dict[str, float]:
+    """Return time, allocation and collection figures for count updates."""
+    frames = [updates[i % len(updates)] for i in range(count)]
+
+    start = time.perf_counter()
+    for frame in frames:
+        apply(frame)
+    update_ns = (time.perf_counter() - start) / count * 1e9
+
+    start = time.perf_counter()
+    for _ in range(count):
+        read()
+    read_ns = (time.perf_counter() - start) / count * 1e9
+
+    collections = [0, 0, 0]
+
+    def count_gc(phase: str, info: dict[str, Any]) -> None:
+        if phase == "start":
+            collections[info["generation"]] += 1
+
+    gc.collect()
+    gc.callbacks.append(count_gc)
+    try:
+        for frame in frames:
+            apply(frame)
+            read()
+    finally:
+        gc.callbacks.remove(count_gc)
+
+    sample = frames[: min(count, 20000)]
+    peak_total = 0
+    tracemalloc.start()
+    try:
+        for frame in sample:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            apply(frame)
+            peak_total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "update_ns": update_ns,
+        "read_ns": read_ns,
+        "peak_bytes_per_update": peak_total / len(sample),
+        **{
+            f"gc_gen{generation}_per_1k_updates": runs / count * 1000
+            for generation, runs in enumerate(collections)
+        },
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print a before/after table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "recording",
+        nargs="?",
+        type=Path,
+        default=harness.FRAMES_DIR / "creality.jsonl",
+    )
+    parser.add_argument("--updates", type=int, default=200000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    state_module = harness.import_integration("state")
+    updates = decoded_frames(args.recording)
+    fields = tuple(state_module.FIELDS)
+
+    # Both models must end up holding the same values
+    legacy, slotted = LegacyState(state_module.FIELDS), state_module.PrinterState()
+    for frame in updates:
+        if sorted(legacy.update(frame)) != sorted(slotted.update(frame)):
+            raise SystemExit("State models disagree on the changed keys")
+    if legacy.data != slotted.as_dict():
+        raise SystemExit("State models disagree on the values")
+
+    def legacy_model() -> tuple[Callable, Callable]:
+        model = LegacyState(state_module.FIELDS)
+        # Entities read through data.get() lambdas
+        getters = [
+            lambda data, key=key, default=default: data.get(key, default)
+            for key, default in state_module.FIELDS.items()
+        ]
+        return model.update, lambda: [get(model.data) for get in getters]
+
+    def slotted_model() -> tuple[Callable, Callable]:
+        model = state_module.PrinterState()
+        # Entities read attributes
+        getters = [
+            lambda data, key=key: getattr(data, key) for key in fields
+        ]
+        return model.update, lambda: [get(model) for get in getters]
+
+    results: dict[str, dict[str, float]] = {}
+    for _ in range(args.rounds):
+        for name, factory in (("dict", legacy_model), ("slots", slotted_model)):
+            figures = _measure(*factory(), updates, args.updates)
+            best = results.setdefault(name, figures)
+            for key, value in figures.items():
+                best[key] = min(best[key], value)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'model':<6} {'update ns':>10} {'read ns':>9} {'peak B':>8}"
+        f" {'gc0/1k':>7} {'gc1/1k':>7} {'gc2/1k':>7}"
+    )
+    for name, figures in results.items():
+        print(
+            f"{name:<6} {figures['update_ns']:>10.0f} {figures['read_ns']:>9.0f}"
+            f" {figures['peak_bytes_per_update']:>8.0f}"
+            f" {figures['gc_gen0_per_1k_updates']:>7.2f}"
+            f" {figures['gc_gen1_per_1k_updates']:>7.3f}"
+            f" {figures['gc_gen2_per_1k_updates']:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,488 @@
+"""Offline harness for running integration code without Home Assistant.
+
+Installs minimal stand-ins for the parts of Home Assistant the coordinator
+and the entity platforms use, then imports integration modules through a
+bare package so ``__init__.py`` (and its config entry plumbing) never runs.
+The stand-ins follow Home Assistant's own semantics closely enough that
+listener fan-out and state writes behave as they do in a real instance:
+``async_write_ha_state`` renders the entity state and counts the write.
+
+Time is virtual. ``VirtualClock`` replaces ``time.monotonic`` in the
+coordinator module and drives ``async_call_later`` timers, so replays run
+as fast as the CPU allows while rate limits still see recorded timing.
+Benchmarks against live (emulated) printers pass a ``RealClock`` instead.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable, Coroutine, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import asyncio
+import heapq
+import importlib
+import itertools
+import logging
+from pathlib import Path
+import sys
+import time
+import types
+from typing import Any
+
+PACKAGE_NAME = "creality_connect"
+PACKAGE_DIR = (
+    Path(__file__).resolve().parent.parent / "custom_components" / PACKAGE_NAME
+)
+FRAMES_DIR = Path(__file__).resolve().parent / "frames"
+ENTRY_ID = "bench_entry"
+
+# Platforms whose entities are CoordinatorEntity subclasses built from descriptions
+ENTITY_PLATFORMS = ("sensor", "binary_sensor", "number", "switch", "button")
+
+
+def import_integration(module: str) -> types.ModuleType:
+    """Import an integration module without running the package __init__."""
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{module}")
+
+
+class VirtualClock:
+    """Monotonic clock and timer wheel that only moves when told to."""
+
+    def __init__(self) -> None:
+        """Initialize the clock at zero."""
+        self._now = 0.0
+        self._timers: list[tuple[float, int, list[Any]]] = []
+        self._counter = itertools.count()
+
+    def monotonic(self) -> float:
+        """Return the virtual time in seconds."""
+        return self._now
+
+    def call_later(self, delay: float, action: Callable[[datetime], None]) -> Callable[[], None]:
+        """Schedule action after delay virtual seconds; return a cancel callable."""
+        timer = [action]
+        heapq.heappush(self._timers, (self._now + delay, next(self._counter), timer))
+
+        def cancel() -> None:
+            timer[0] = None
+
+        return cancel
+
+    def advance(self, to: float) -> None:
+        """Move time forward, running timers that fall due on the way."""
+        while self._timers and self._timers[0][0] <= to:
+            when, _, timer = heapq.heappop(self._timers)
+            self._now = max(self._now, when)
+            if timer[0] is not None:
+                timer[0](datetime.now(timezone.utc))
+        self._now = max(self._now, to)
+
+
+class RealClock:
+    """Wall-clock counterpart of VirtualClock, backed by the event loop."""
+
+    monotonic = staticmethod(time.monotonic)
+
+    def call_later(self, delay: float, action: Callable[[datetime], None]) -> Callable[[], None]:
+        """Schedule action after delay seconds; return a cancel callable."""
+        handle = asyncio.get_running_loop().call_later(
+            delay, lambda: action(datetime.now(timezone.utc))
+        )
+        return handle.cancel
+
+
+class _AnyAttr(type):
+    """Metaclass answering any class attribute with its lower-cased name."""
+
+    def __getattr__(cls, name: str) -> str:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return name.lower()
+
+
+def _module(name: str, **attrs: Any) -> types.ModuleType:
+    """Create and register a stub module."""
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def _callback(func: Callable) -> Callable:
+    """Mark a function as safe to run in the event loop."""
+    setattr(func, "_hass_callback", True)
+    return func
+
+
+class HomeAssistant:
+    """Just enough of HomeAssistant for coordinators and entities."""
+
+    def __init__(self, clock: VirtualClock | RealClock | None = None) -> None:
+        """Initialize with an optional clock, virtual by default."""
+        self.data: dict[str, Any] = {}
+        self.clock = clock or VirtualClock()
+        self.http_session: Any = None
+        self.state_writes = 0
+        self.bus = types.SimpleNamespace(async_fire=lambda *args, **kwargs: None)
+
+    def async_create_task(self, target: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """Schedule a coroutine on the running loop."""
+        return asyncio.get_running_loop().create_task(target)
+
+
+class UpdateFailed(Exception):
+    """Raised by _async_update_data on failure."""
+
+
+class DataUpdateCoordinator:
+    """Listener bookkeeping as in homeassistant.helpers.update_coordinator."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        logger: logging.Logger,
+        *,
+        name: str,
+        update_interval: timedelta | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.logger = logger
+        self.name = name
+        self.update_interval = update_interval
+        self.data: Any = None
+        self.last_update_success = True
+        self.last_exception: Exception | None = None
+        self._listeners: dict[Callable[[], None], tuple[Callable[[], None], Any]] = {}
+
+    @_callback
+    def async_add_listener(
+        self, update_callback: Callable[[], None], context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates."""
+
+        @_callback
+        def remove_listener() -> None:
+            self._listeners.pop(remove_listener)
+
+        self._listeners[remove_listener] = (update_callback, context)
+        return remove_listener
+
+    def async_contexts(self) -> Iterable[Any]:
+        """Return all registered contexts."""
+        return {
+            context for _, context in self._listeners.values() if context is not None
+        }
+
+    @_callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners."""
+        for update_callback, _ in list(self._listeners.values()):
+            update_callback()
+
+    @_callback
+    def async_set_updated_data(self, data: Any) -> None:
+        """Manually update data and notify listeners."""
+        self.data = data
+        self.last_update_success = True
+        self.async_update_listeners()
+
+    async def async_refresh(self) -> None:
+        """Refresh data and notify listeners."""
+        try:
+            self.data = await self._async_update_data()
+            self.last_update_success = True
+        except UpdateFailed as err:
+            self.last_exception = err
+            self.last_update_success = False
+        self.async_update_listeners()
+
+    async def async_config_entry_first_refresh(self) -> None:
+        """Refresh data for the first time."""
+        await self.async_refresh()
+
+    async def async_request_refresh(self) -> None:
+        """Request a refresh (not debounced here)."""
+        await self.async_refresh()
+
+    async def _async_update_data(self) -> Any:
+        raise NotImplementedError
+
+
+@dataclass
+class EntityDescription:
+    """Union of the description fields used by the integration's platforms."""
+
+    key: str
+    name: str | None = None
+    icon: str | None = None
+    device_class: str | None = None
+    state_class: str | None = None
+    entity_category: str | None = None
+    entity_registry_enabled_default: bool = True
+    native_unit_of_measurement: str | None = None
+    native_min_value: float | None = None
+    native_max_value: float | None = None
+    native_step: float | None = None
+    mode: str | None = None
+
+
+class Entity:
+    """Entity base; state writes render the state and count themselves."""
+
+    hass: HomeAssistant | None = None
+    entity_id: str | None = None
+    _attr_has_entity_name = False
+
+    def _render_state(self) -> Any:
+        return None
+
+    @property
+    def available(self) -> bool:
+        """Return if the entity is available."""
+        return True
+
+    @_callback
+    def async_write_ha_state(self) -> None:
+        """Render and record a state write."""
+        if self.available:
+            self._render_state()
+        self.hass.state_writes += 1
+
+    def async_on_remove(self, func: Callable[[], None]) -> None:
+        """Add a function to call when the entity is removed."""
+        self.__dict__.setdefault("_on_remove", []).append(func)
+
+    async def async_added_to_hass(self) -> None:
+        """Run when the entity is added."""
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Run when the entity is removed."""
+        for func in self.__dict__.pop("_on_remove", []):
+            func()
+
+
+class CoordinatorEntity(Entity):
+    """Entity subscribed to a coordinator, as in update_coordinator."""
+
+    def __init__(self, coordinator: DataUpdateCoordinator, context: Any = None) -> None:
+        """Create the entity with a coordinator."""
+        self.coordinator = coordinator
+        self.coordinator_context = context
+
+    @property
+    def available(self) -> bool:
+        """Return if the coordinator's last update succeeded."""
+        return self.coordinator.last_update_success
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to coordinator updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_listener(
+                self._handle_coordinator_update, self.coordinator_context
+            )
+        )
+
+    @_callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self.async_write_ha_state()
+
+
+class _ValueEntity(Entity):
+    def _render_state(self) -> Any:
+        return self.native_value
+
+
+class _OnOffEntity(Entity):
+    def _render_state(self) -> Any:
+        return self.is_on
+
+
+def _async_call_later(
+    hass: HomeAssistant, delay: float | timedelta, action: Callable[[datetime], None]
+) -> Callable[[], None]:
+    if isinstance(delay, timedelta):
+        delay = delay.total_seconds()
+    return hass.clock.call_later(delay, action)
+
+
+def _async_track_time_interval(
+    hass: HomeAssistant, action: Callable[[datetime], None], interval: timedelta
+) -> Callable[[], None]:
+    cancel: list[Callable[[], None]] = []
+
+    def fire(now: datetime) -> None:
+        cancel[0] = hass.clock.call_later(interval.total_seconds(), fire)
+        action(now)
+
+    cancel.append(hass.clock.call_later(interval.total_seconds(), fire))
+    return lambda: cancel[0]()
+
+
+def _async_get_clientsession(hass: HomeAssistant) -> Any:
+    if hass.http_session is None:
+        import aiohttp  # pylint: disable=import-outside-toplevel
+
+        hass.http_session = aiohttp.ClientSession()
+    return hass.http_session
+
+
+def _install_optional(name: str, **attrs: Any) -> None:
+    """Stub a third-party module only if it is not installed."""
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        _module(name, **attrs)
+
+
+def install() -> None:
+    """Register the Home Assistant stand-ins in sys.modules."""
+    if "homeassistant" in sys.modules:
+        return
+
+    class WebSocketException(Exception):
+        """Stand-in for websockets.exceptions.WebSocketException."""
+
+    class ClientError(Exception):
+        """Stand-in for aiohttp.ClientError."""
+
+    _install_optional(
+        "aiohttp",
+        ClientError=ClientError,
+        ClientTimeout=lambda **kwargs: kwargs,
+        ClientSession=object,
+    )
+    try:
+        importlib.import_module("websockets")
+    except ImportError:
+        exceptions = _module(
+            "websockets.exceptions", WebSocketException=WebSocketException
+        )
+        client = _module("websockets.client", WebSocketClientProtocol=object)
+        _module("websockets", exceptions=exceptions, client=client, connect=None)
+
+    _module("homeassistant")
+    _module(
+        "homeassistant.core",
+        CALLBACK_TYPE=Callable[[], None],
+        HomeAssistant=HomeAssistant,
+        callback=_callback,
+    )
+    _module(
+        "homeassistant.const",
+        CONF_HOST="host",
+        PERCENTAGE="%",
+        Platform=_AnyAttr("Platform", (), {}),
+        EntityCategory=_AnyAttr("EntityCategory", (), {}),
+        UnitOfLength=_AnyAttr("UnitOfLength", (), {}),
+        UnitOfSpeed=_AnyAttr("UnitOfSpeed", (), {}),
+        UnitOfTemperature=_AnyAttr("UnitOfTemperature", (), {}),
+        UnitOfTime=_AnyAttr("UnitOfTime", (), {}),
+    )
+    _module("homeassistant.config_entries", ConfigEntry=object)
+    _module(
+        "homeassistant.exceptions",
+        HomeAssistantError=Exception,
+        ConfigEntryNotReady=Exception,
+    )
+    _module("homeassistant.helpers")
+    _module(
+        "homeassistant.helpers.aiohttp_client",
+        async_get_clientsession=_async_get_clientsession,
+    )
+    _module("homeassistant.helpers.entity", EntityCategory=_AnyAttr("EntityCategory", (), {}))
+    _module("homeassistant.helpers.entity_platform", AddEntitiesCallback=Callable)
+    _module(
+        "homeassistant.helpers.event",
+        async_call_later=_async_call_later,
+        async_track_time_interval=_async_track_time_interval,
+    )
+    _module(
+        "homeassistant.helpers.update_coordinator",
+        CoordinatorEntity=CoordinatorEntity,
+        DataUpdateCoordinator=DataUpdateCoordinator,
+        UpdateFailed=UpdateFailed,
+    )
+    _module("homeassistant.components")
+    _module(
+        "homeassistant.components.sensor",
+        SensorDeviceClass=_AnyAttr("SensorDeviceClass", (), {}),
+        SensorStateClass=_AnyAttr("SensorStateClass", (), {}),
+        SensorEntity=type("SensorEntity", (_ValueEntity,), {}),
+        SensorEntityDescription=type(
+            "SensorEntityDescription", (EntityDescription,), {}
+        ),
+    )
+    _module(
+        "homeassistant.components.binary_sensor",
+        BinarySensorDeviceClass=_AnyAttr("BinarySensorDeviceClass", (), {}),
+        BinarySensorEntity=type("BinarySensorEntity", (_OnOffEntity,), {}),
+        BinarySensorEntityDescription=type(
+            "BinarySensorEntityDescription", (EntityDescription,), {}
+        ),
+    )
+    _module(
+        "homeassistant.components.number",
+        NumberMode=_AnyAttr("NumberMode", (), {}),
+        NumberEntity=type("NumberEntity", (_ValueEntity,), {}),
+        NumberEntityDescription=type(
+            "NumberEntityDescription", (EntityDescription,), {}
+        ),
+    )
+    _module(
+        "homeassistant.components.switch",
+        SwitchEntity=type("SwitchEntity", (_OnOffEntity,), {}),
+        SwitchEntityDescription=type(
+            "SwitchEntityDescription", (EntityDescription,), {}
+        ),
+    )
+    _module("homeassistant.components.camera", Camera=type("Camera", (Entity,), {}))
+    _module(
+        "homeassistant.components.button",
+        ButtonEntity=type("ButtonEntity", (Entity,), {}),
+        ButtonEntityDescription=type(
+            "ButtonEntityDescription", (EntityDescription,), {}
+        ),
+    )
+
+
+async def async_setup_printer(
+    hass: HomeAssistant,
+    host: str = "127.0.0.1",
+    entry_id: str = ENTRY_ID,
+    ws_port: int | None = None,
+    **kwargs: Any,
+) -> tuple[Any, list[Entity]]:
+    """Create a coordinator and its entities, subscribed as in Home Assistant.
+
+    Returns the coordinator (already holding its default data) and the list
+    of entities added by every platform in ENTITY_PLATFORMS.
+    """
+    install()
+    coordinator_module = import_integration("coordinator")
+    const = import_integration("const")
+    coordinator_module.time = hass.clock
+
+    coordinator = coordinator_module.CrealityK1MaxCoordinator(
+        hass, host, const.DEFAULT_PORT, ws_port or const.DEFAULT_WS_PORT, **kwargs
+    )
+    await coordinator.async_config_entry_first_refresh()
+    hass.data.setdefault(const.DOMAIN, {})[entry_id] = coordinator
+
+    entry = types.SimpleNamespace(entry_id=entry_id, data={}, options={})
+    entities: list[Entity] = []
+    for platform in ENTITY_PLATFORMS:
+        module = import_integration(platform)
+        await module.async_setup_entry(hass, entry, entities.extend)
+
+    for entity in entities:
+        entity.hass = hass
+        await entity.async_added_to_hass()
+
+    return coordinator, entities
@@ -0,0 +1,124 @@
+"""Generate the replay recordings in benchmarks/frames/.
+
+The committed recordings are synthetic. They are modelled on K1 Max
+firmware traffic: partial Creality frames at about 5 Hz with a full frame
+every 30 s, and Moonraker ``notify_status_update`` deltas batched every
+250 ms. They are deterministic, so numbers can be compared across commits.
+To capture real traffic from a printer instead, use record_frames.py.
+
+    python benchmarks/make_frames.py [--seconds 120]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import random
+from typing import Any
+
+FRAMES_DIR = Path(__file__).resolve().parent / "frames"
+
+
+def _write(path: Path, frames: list[tuple[float, dict[str, Any]]]) -> None:
+    with path.open("w", encoding="utf-8") as file:
+        for timestamp, frame in frames:
+            message = json.dumps(frame, separators=(",", ":"))
+            file.write(json.dumps({"t": round(timestamp, 3), "msg": message}) + "\n")
+
+
+def creality_frames(seconds: int, rng: random.Random) -> list[tuple[float, dict[str, Any]]]:
+    """Return timestamped Creality-format frames for a print in progress."""
+    frames = []
+    total_layers = 240
+    for tick in range(seconds * 5):
+        t = tick / 5
+        elapsed = 3600 + int(t)
+        layer = min(total_layers, 60 + int(t / 20))
+        x = 110 + 80 * rng.random()
+        y = 110 + 80 * rng.random()
+        full = {
+            "nozzleTemp": f"{220 + rng.gauss(0, 0.4):.6f}",
+            "targetNozzleTemp": 220,
+            "bedTemp0": f"{60 + rng.gauss(0, 0.1):.6f}",
+            "targetBedTemp0": 60,
+            "boxTemp": 31,
+            "printProgress": min(100, 25 + int(t / 12)),
+            "printJobTime": elapsed,
+            "printLeftTime": max(0, 9000 - elapsed),
+            "printFileName": "/usr/data/printer_data/gcodes/bracket_PETG_0.2mm.gcode",
+            "deviceState": 1,
+            "state": 1,
+            "curPosition": f"X:{x:.2f} Y:{y:.2f} Z:{layer * 0.2:.2f}",
+            "realTimeSpeed": f"{rng.uniform(60, 300):.2f}",
+            "curFeedratePct": 100,
+            "layer": layer,
+            "TotalLayer": total_layers,
+            "modelFanPct": 100,
+            "auxiliaryFanPct": 60,
+            "caseFanPct": 30,
+            "lightSw": 1,
+            "err": {"errcode": 0, "key": 0},
+        }
+        if tick % 150 == 0:
+            frames.append((t, full))
+            continue
+
+        frame = {key: full[key] for key in ("nozzleTemp", "bedTemp0")}
+        if rng.random() < 0.8:
+            frame["curPosition"] = full["curPosition"]
+            frame["realTimeSpeed"] = full["realTimeSpeed"]
+        if tick % 5 == 0:
+            for key in ("printJobTime", "printLeftTime", "printProgress", "layer"):
+                frame[key] = full[key]
+        frames.append((t, frame))
+    return frames
+
+
+def moonraker_frames(seconds: int, rng: random.Random) -> list[tuple[float, dict[str, Any]]]:
+    """Return timestamped Moonraker notify_status_update deltas."""
+    frames = []
+    for tick in range(seconds * 4):
+        t = tick / 4
+        status: dict[str, Any] = {
+            "extruder": {"temperature": round(220 + rng.gauss(0, 0.4), 2)},
+            "heater_bed": {"temperature": round(60 + rng.gauss(0, 0.1), 2)},
+        }
+        if rng.random() < 0.8:
+            status["toolhead"] = {
+                "position": [
+                    round(110 + 80 * rng.random(), 3),
+                    round(110 + 80 * rng.random(), 3),
+                    round(12 + t / 100, 3),
+                    round(1500 + t * 2, 3),
+                ]
+            }
+            status["gcode_move"] = {"speed": round(rng.uniform(3600, 18000), 1)}
+        if tick % 4 == 0:
+            status["print_stats"] = {"print_duration": 3600 + t, "total_duration": 3700 + t}
+            status["virtual_sdcard"] = {"progress": min(1.0, 0.25 + t / 7200)}
+        frames.append(
+            (
+                t,
+                {
+                    "jsonrpc": "2.0",
+                    "method": "notify_status_update",
+                    "params": [status, 12345.0 + t],
+                },
+            )
+        )
+    return frames
+
+
+def main() -> None:
+    """Write both recordings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=120)
+    args = parser.parse_args()
+
+    FRAMES_DIR.mkdir(exist_ok=True)
+    _write(FRAMES_DIR / "creality.jsonl", creality_frames(args.seconds, random.Random(1)))
+    _write(FRAMES_DIR / "moonraker.jsonl", moonraker_frames(args.seconds, random.Random(2)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Record WebSocket frames from a printer for replay with bench_replay.py.
+
+Writes one JSON object per line: ``{"t": seconds_since_start, "msg": raw}``.
+Creality firmware pushes frames unprompted; pass --subscribe to send the
+coordinator's Moonraker subscription first. Requires the websockets package.
+
+    python benchmarks/record_frames.py 192.168.1.50 --seconds 300 \
+        --output benchmarks/frames/my_printer.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+import websockets
+
+
+SUBSCRIBE_OBJECTS = (
+    "print_stats",
+    "toolhead",
+    "extruder",
+    "heater_bed",
+    "fan",
+    "gcode_move",
+    "virtual_sdcard",
+)
+
+
+async def record(
+    host: str, port: int, seconds: float, output: str, subscribe: bool
+) -> int:
+    """Record frames for the given duration and return how many were written."""
+    count = 0
+    start = time.monotonic()
+    async with websockets.connect(f"ws://{host}:{port}/websocket") as websocket:
+        if subscribe:
+            await websocket.send(
+                json.dumps(
+                    {
+                        "jsonrpc": "2.0",
+                        "method": "printer.objects.subscribe",
+                        "params": {"objects": dict.fromkeys(SUBSCRIBE_OBJECTS)},
+                        "id": 1,
+                    }
+                )
+            )
+        with open(output, "w", encoding="utf-8") as file:
+            while (remaining := seconds - (time.monotonic() - start)) > 0:
+                try:
+                    message = await asyncio.wait_for(websocket.recv(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if isinstance(message, bytes):
+                    message = message.decode()
+                t = round(time.monotonic() - start, 3)
+                file.write(json.dumps({"t": t, "msg": message}) + "\n")
+                count += 1
+    return count
+
+
+def main() -> None:
+    """Parse arguments and record."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("host")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--seconds", type=float, default=300)
+    parser.add_argument("--output", default="frames.jsonl")
+    parser.add_argument("--subscribe", action="store_true")
+    args = parser.parse_args()
+
+    count = asyncio.run(
+        record(args.host, args.port, args.seconds, args.output, args.subscribe)
+    )
+    print(f"Recorded {count} frames to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,29 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
-
-from .const import CONF_PORT, CONF_WS_PORT, DEFAULT_PORT, DEFAULT_WS_PORT, DOMAIN
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    CONF_PORT,
+    CONF_STALE_TIMEOUT,
+    CONF_TIMELAPSE_INTERVAL,
+    CONF_TIMELAPSE_KEEP,
+    CONF_TIMELAPSE_MODE,
+    CONF_WS_PORT,
+    DEFAULT_PORT,
+    DEFAULT_STALE_TIMEOUT,
+    DEFAULT_TIMELAPSE_INTERVAL,
+    DEFAULT_TIMELAPSE_KEEP,
+    DEFAULT_TIMELAPSE_MODE,
+    DEFAULT_WS_PORT,
+    DOMAIN,
+    TIMELAPSE_OFF,
+)
 from .coordinator import CrealityK1MaxCoordinator
+from .services import async_setup_services
+from .timelapse import TimelapseRecorder
+from .upload import FileUploader
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,14 +43,25 @@ PLATFORMS: list[Platform] = [
     Platform.IMAGE,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Creality Connect services."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Creality Connect from a config entry."""
     host = entry.data[CONF_HOST]
     port = entry.data.get(CONF_PORT, DEFAULT_PORT)
     ws_port = entry.data.get(CONF_WS_PORT, DEFAULT_WS_PORT)
+    stale_timeout = entry.options.get(CONF_STALE_TIMEOUT, DEFAULT_STALE_TIMEOUT)
 
-    coordinator = CrealityK1MaxCoordinator(hass, host, port, ws_port)
+    coordinator = CrealityK1MaxCoordinator(
+        hass, host, port, ws_port, stale_timeout=stale_timeout
+    )
 
     try:
         await coordinator.async_config_entry_first_refresh()
@@ -38,11 +69,31 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         raise ConfigEntryNotReady(f"Failed to connect to printer: {err}") from err
 
     await coordinator.async_start_websocket()
+    try:
+        coordinator.uploader = FileUploader(hass, coordinator, entry.entry_id)
+
+        timelapse_mode = entry.options.get(CONF_TIMELAPSE_MODE, DEFAULT_TIMELAPSE_MODE)
+        if timelapse_mode != TIMELAPSE_OFF:
+            coordinator.timelapse = TimelapseRecorder(
+                hass,
+                coordinator,
+                entry.entry_id,
+                timelapse_mode,
+                entry.options.get(CONF_TIMELAPSE_INTERVAL, DEFAULT_TIMELAPSE_INTERVAL),
+                entry.options.get(CONF_TIMELAPSE_KEEP, DEFAULT_TIMELAPSE_KEEP),
+            )
+            await coordinator.timelapse.async_start()
+
+        hass.data.setdefault(DOMAIN, {})
+        hass.data[DOMAIN][entry.entry_id] = coordinator
+
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except Exception:
+        # Stop the connection, timers and listeners started above
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        await coordinator.async_shutdown()
+        raise
 
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = coordinator
-
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
     return True
@@ -11,19 +11,23 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import CrealityK1MaxCoordinator
+from .state import PrinterState
 
 
 @dataclass
 class CrealityK1MaxBinarySensorEntityDescription(BinarySensorEntityDescription):
     """Describes Creality K1 Max binary sensor entity."""
 
-    value_fn: Callable[[dict[str, Any]], bool] | None = None
+    value_fn: Callable[[PrinterState], bool] | None = None
+    attributes_fn: Callable[[PrinterState], dict[str, Any]] | None = None
+    data_keys: tuple[str, ...] | None = None
 
 
 BINARY_SENSORS: tuple[CrealityK1MaxBinarySensorEntityDescription, ...] = (
@@ -31,22 +35,35 @@ BINARY_SENSORS: tuple[CrealityK1MaxBinarySensorEntityDescription, ...] = (
         key="is_printing",
         name="Printing",
         device_class=BinarySensorDeviceClass.RUNNING,
-        value_fn=lambda data: data.get("state") == "printing",
+        value_fn=lambda data: data.state == "printing",
+        data_keys=("state",),
         icon="mdi:printer-3d",
     ),
     CrealityK1MaxBinarySensorEntityDescription(
         key="is_paused",
         name="Paused",
-        value_fn=lambda data: data.get("state") == "paused",
+        value_fn=lambda data: data.state == "paused",
+        data_keys=("state",),
         icon="mdi:pause",
     ),
     CrealityK1MaxBinarySensorEntityDescription(
         key="light_on",
         name="LED Light",
         device_class=BinarySensorDeviceClass.LIGHT,
-        value_fn=lambda data: data.get("light_on", False),
+        value_fn=lambda data: data.light_on,
+        data_keys=("light_on",),
         icon="mdi:lightbulb",
     ),
+    CrealityK1MaxBinarySensorEntityDescription(
+        key="thermal_problem",
+        name="Thermal Problem",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: bool(data.thermal_anomalies),
+        attributes_fn=lambda data: {"anomalies": list(data.thermal_anomalies)},
+        data_keys=("thermal_anomalies",),
+        icon="mdi:thermometer-alert",
+    ),
 )
 
 
@@ -77,7 +94,7 @@ class CrealityK1MaxBinarySensor(CoordinatorEntity, BinarySensorEntity):
         entry: ConfigEntry,
     ) -> None:
         """Initialize the binary sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=description.data_keys)
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
         self._attr_device_info = {
@@ -94,3 +111,10 @@ class CrealityK1MaxBinarySensor(CoordinatorEntity, BinarySensorEntity):
             return self.entity_description.value_fn(self.coordinator.data)
         return False
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the state attributes."""
+        if self.entity_description.attributes_fn:
+            return self.entity_description.attributes_fn(self.coordinator.data)
+        return None
+
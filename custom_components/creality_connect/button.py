@@ -82,7 +82,8 @@ class CrealityK1MaxButton(CoordinatorEntity, ButtonEntity):
         entry: ConfigEntry,
     ) -> None:
         """Initialize the button."""
-        super().__init__(coordinator)
+        # Buttons render no data; only availability changes concern them
+        super().__init__(coordinator, context=())
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
         self._attr_device_info = {
@@ -96,6 +97,5 @@ class CrealityK1MaxButton(CoordinatorEntity, ButtonEntity):
         """Handle the button press."""
         if self.entity_description.press_params:
             params = self.entity_description.press_params()
-            await self.coordinator.send_command(params)
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_send_command(params)
 
@@ -3,17 +3,30 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 
 import aiohttp
+from aiohttp import web
 
 from homeassistant.components.camera import Camera
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .const import (
+    CAMERA_PORT,
+    CONF_IMAGE_MAX_WIDTH,
+    CONF_IMAGE_QUALITY,
+    CONF_SNAPSHOT_TTL,
+    DEFAULT_IMAGE_MAX_WIDTH,
+    DEFAULT_IMAGE_QUALITY,
+    DEFAULT_SNAPSHOT_TTL,
+    DOMAIN,
+    MJPEG_BOUNDARY,
+    MJPEG_READ_TIMEOUT,
+)
 from .coordinator import CrealityK1MaxCoordinator
+from .imaging import ScaledImageCache
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,7 +39,14 @@ async def async_setup_entry(
     """Set up Creality K1 Max camera based on a config entry."""
     coordinator: CrealityK1MaxCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    async_add_entities([CrealityK1MaxCamera(coordinator, entry)])
+    snapshot_ttl = entry.options.get(CONF_SNAPSHOT_TTL, DEFAULT_SNAPSHOT_TTL)
+    scaler = ScaledImageCache(
+        hass,
+        entry.options.get(CONF_IMAGE_MAX_WIDTH, DEFAULT_IMAGE_MAX_WIDTH),
+        entry.options.get(CONF_IMAGE_QUALITY, DEFAULT_IMAGE_QUALITY),
+    )
+
+    async_add_entities([CrealityK1MaxCamera(coordinator, entry, snapshot_ttl, scaler)])
 
 
 class CrealityK1MaxCamera(Camera):
@@ -39,10 +59,17 @@ class CrealityK1MaxCamera(Camera):
         self,
         coordinator: CrealityK1MaxCoordinator,
         entry: ConfigEntry,
+        snapshot_ttl: float,
+        scaler: ScaledImageCache,
     ) -> None:
         """Initialize the camera."""
         super().__init__()
         self.coordinator = coordinator
+        self._snapshot_ttl = snapshot_ttl
+        self._scaler = scaler
+        self._snapshot: bytes | None = None
+        self._snapshot_time = 0.0
+        self._snapshot_request: asyncio.Task[bytes | None] | None = None
         self._attr_unique_id = f"{entry.entry_id}_camera"
         self._attr_device_info = {
             "identifiers": {(DOMAIN, entry.entry_id)},
@@ -50,28 +77,50 @@ class CrealityK1MaxCamera(Camera):
             "manufacturer": "Creality",
             "model": "K1 Max",
         }
-        
-        # Webcam stream URL (port 8080 for Creality K1 Max)
-        self._stream_url = f"http://{coordinator.host}:8080/?action=stream"
 
     async def async_camera_image(
         self, width: int | None = None, height: int | None = None
     ) -> bytes | None:
-        """Return a still image from the camera stream."""
-        # Get a snapshot instead of the stream
-        snapshot_url = f"http://{self.coordinator.host}:8080/?action=snapshot"
-        
+        """Return a still image, scaled to the requested size off the event loop."""
+        if (image := await self._async_latest_image()) is None:
+            return None
+        return await self._scaler.async_scale(image, width, height)
+
+    async def _async_latest_image(self) -> bytes | None:
+        """Return a full-size still image, reusing recent frames where possible.
+
+        While the shared stream is open its latest frame is the freshest
+        image there is. Otherwise snapshots are cached for the configured
+        TTL, and concurrent callers share a single in-flight request so a
+        dashboard full of cards does not hit mjpg-streamer once per card.
+        """
+        now = time.monotonic()
+        stream = self.coordinator.camera_stream
+        if (
+            stream.streaming
+            and stream.latest_frame is not None
+            and now - stream.latest_frame_time <= self._snapshot_ttl
+        ):
+            return stream.latest_frame
+        if self._snapshot is not None and now - self._snapshot_time <= self._snapshot_ttl:
+            return self._snapshot
+
+        if self._snapshot_request is None:
+            self._snapshot_request = asyncio.create_task(self._async_fetch_snapshot())
+            self._snapshot_request.add_done_callback(self._async_clear_request)
+        # Shielded: one caller giving up must not cancel the request for the rest
+        return await asyncio.shield(self._snapshot_request)
+
+    def _async_clear_request(self, _task: asyncio.Task) -> None:
+        """Allow the next cache miss to start a new snapshot request."""
+        self._snapshot_request = None
+
+    async def _async_fetch_snapshot(self) -> bytes | None:
+        """Fetch a snapshot from the camera and cache it."""
         try:
-            websession = async_get_clientsession(self.hass)
-            async with websession.get(
-                snapshot_url, timeout=aiohttp.ClientTimeout(total=10)
-            ) as response:
-                if response.status == 200:
-                    return await response.read()
-                    
-                _LOGGER.warning("Error getting camera snapshot: HTTP %s", response.status)
-                return None
-                
+            status, body = await self.coordinator.async_http_get(
+                "/?action=snapshot", port=CAMERA_PORT
+            )
         except aiohttp.ClientError as err:
             _LOGGER.error("Error connecting to camera: %s", err)
             return None
@@ -79,6 +128,40 @@ class CrealityK1MaxCamera(Camera):
             _LOGGER.error("Timeout getting camera snapshot")
             return None
 
+        if status == 200:
+            self._snapshot = body
+            self._snapshot_time = time.monotonic()
+            return body
+
+        _LOGGER.warning("Error getting camera snapshot: HTTP %s", status)
+        return None
+
+    async def handle_async_mjpeg_stream(
+        self, request: web.Request
+    ) -> web.StreamResponse:
+        """Serve the printer's shared MJPEG stream to one viewer."""
+        response = web.StreamResponse()
+        response.content_type = f"multipart/x-mixed-replace;boundary={MJPEG_BOUNDARY}"
+        await response.prepare(request)
+
+        async with self.coordinator.camera_stream.async_subscribe() as frames:
+            try:
+                while True:
+                    frame = await asyncio.wait_for(frames.get(), MJPEG_READ_TIMEOUT)
+                    await response.write(
+                        f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(frame)}\r\n\r\n".encode()
+                        + frame
+                        + b"\r\n"
+                    )
+            except asyncio.TimeoutError:
+                _LOGGER.debug("No camera frames for %s seconds", MJPEG_READ_TIMEOUT)
+            except ConnectionResetError:
+                # The viewer went away
+                pass
+
+        return response
+
     @property
     def is_on(self) -> bool:
         """Return true if camera is streaming."""
@@ -0,0 +1,275 @@
+"""Command acknowledgement for Creality Connect.
+
+The printer never answers a ``set`` command. A command counts as applied
+once the telemetry it pushes reflects the requested value, so each command
+parameter maps to the data key that shows it and a predicate on that key.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    COMMAND_TIMEOUT,
+    PARAM_AUXILIARY_FAN,
+    PARAM_BED_TARGET_TEMP,
+    PARAM_CASE_FAN,
+    PARAM_FAN,
+    PARAM_LIGHT_SW,
+    PARAM_NOZZLE_TARGET_TEMP,
+    PARAM_PAUSE,
+    PARAM_STOP,
+    STATE_COMMAND_TIMEOUT,
+    STATE_PAUSED,
+    STATE_PRINTING,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+Predicate = Callable[[Any], bool]
+
+
+class CommandError(HomeAssistantError):
+    """Command could not be sent to the printer."""
+
+
+class CommandTimeoutError(CommandError):
+    """Printer telemetry did not reflect a command in time."""
+
+
+def _near(target: float, tolerance: float) -> Predicate:
+    return lambda value: value is not None and abs(float(value) - target) <= tolerance
+
+
+def _state_is(expected: Any) -> Predicate:
+    return lambda value: value == expected
+
+
+# Command parameter -> (data key, predicate factory taking the parameter value)
+COMMAND_EXPECTATIONS: dict[str, tuple[str, Callable[[Any], Predicate]]] = {
+    PARAM_FAN: ("fan_speed", lambda value: _near(int(value), 1)),
+    PARAM_AUXILIARY_FAN: ("auxiliary_fan", lambda value: _near(int(value), 1)),
+    PARAM_CASE_FAN: ("case_fan", lambda value: _near(int(value), 1)),
+    PARAM_NOZZLE_TARGET_TEMP: ("nozzle_target", lambda value: _near(float(value), 0.5)),
+    PARAM_BED_TARGET_TEMP: ("bed_target", lambda value: _near(float(value), 0.5)),
+    PARAM_LIGHT_SW: ("light_on", lambda value: _state_is(bool(int(value)))),
+    PARAM_PAUSE: (
+        "state",
+        lambda value: _state_is(STATE_PAUSED if int(value) else STATE_PRINTING),
+    ),
+    PARAM_STOP: (
+        "state",
+        lambda value: lambda state: state not in (STATE_PRINTING, STATE_PAUSED),
+    ),
+}
+
+# Command parameter -> (data key, value to show until the printer confirms it)
+OPTIMISTIC_VALUES: dict[str, tuple[str, Callable[[Any], Any]]] = {
+    PARAM_FAN: ("fan_speed", float),
+    PARAM_AUXILIARY_FAN: ("auxiliary_fan", float),
+    PARAM_CASE_FAN: ("case_fan", float),
+    PARAM_NOZZLE_TARGET_TEMP: ("nozzle_target", float),
+    PARAM_BED_TARGET_TEMP: ("bed_target", float),
+    PARAM_LIGHT_SW: ("light_on", lambda value: bool(int(value))),
+    PARAM_PAUSE: ("state", lambda value: STATE_PAUSED if int(value) else STATE_PRINTING),
+}
+
+# Print state changes wait for the current move to finish
+_STATE_PARAMS = frozenset({PARAM_PAUSE, PARAM_STOP})
+
+# Setpoints the printer accepts together in one "set" frame, latest value wins
+MERGEABLE_PARAMS: frozenset[str] = frozenset(
+    {
+        PARAM_FAN,
+        PARAM_AUXILIARY_FAN,
+        PARAM_CASE_FAN,
+        PARAM_LIGHT_SW,
+        PARAM_NOZZLE_TARGET_TEMP,
+        PARAM_BED_TARGET_TEMP,
+    }
+)
+
+
+class PendingCommand:
+    """Command sent to the printer, waiting for telemetry to reflect it.
+
+    Parameters without observable telemetry, such as raw G-code, have no
+    expectations and are acknowledged as soon as they are sent.
+    """
+
+    __slots__ = ("command_id", "params", "expected", "timeout", "sent_at", "future")
+
+    def __init__(self, command_id: int, params: dict[str, Any], sent_at: float) -> None:
+        """Initialize."""
+        self.command_id = command_id
+        self.params = params
+        self.sent_at = sent_at
+        self.expected: dict[str, Predicate] = {}
+        for param, value in params.items():
+            if param in COMMAND_EXPECTATIONS:
+                key, predicate = COMMAND_EXPECTATIONS[param]
+                self.expected[key] = predicate(value)
+        self.timeout = (
+            STATE_COMMAND_TIMEOUT
+            if _STATE_PARAMS.intersection(params)
+            else COMMAND_TIMEOUT
+        )
+        self.future: asyncio.Future[float] = asyncio.get_running_loop().create_future()
+
+    def is_satisfied(self, data: dict[str, Any]) -> bool:
+        """Return True if the data reflects every expected value."""
+        return all(matches(data.get(key)) for key, matches in self.expected.items())
+
+
+@dataclass
+class CommandStats:
+    """Acknowledgement statistics for one command parameter."""
+
+    sent: int = 0
+    acknowledged: int = 0
+    superseded: int = 0
+    timeouts: int = 0
+    last_latency: float | None = None
+    total_latency: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics with latencies in milliseconds."""
+        return {
+            "sent": self.sent,
+            "acknowledged": self.acknowledged,
+            "superseded": self.superseded,
+            "timeouts": self.timeouts,
+            "last_latency_ms": (
+                round(self.last_latency * 1000) if self.last_latency is not None else None
+            ),
+            "mean_latency_ms": (
+                round(self.total_latency / self.acknowledged * 1000)
+                if self.acknowledged
+                else None
+            ),
+        }
+
+
+class _OutgoingFrame:
+    """A "set" frame in the outbound queue, shared by every merged submission."""
+
+    __slots__ = ("params", "future", "sealed")
+
+    def __init__(self, params: dict[str, Any], sealed: bool) -> None:
+        """Initialize."""
+        self.params = params
+        self.future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self.sealed = sealed
+
+
+class CommandQueue:
+    """Ordered outbound command queue that merges setpoint parameters.
+
+    Mergeable parameters submitted within window seconds of the first one
+    go out as a single "set" frame, the latest value per key winning, so a
+    dragged slider sends one frame instead of dozens. Anything else (pause,
+    stop, G-code) is sent on its own and acts as a barrier: everything
+    submitted before it is sent first and everything after it later.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        send: Callable[[dict[str, Any]], Awaitable[bool]],
+        window: float,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._send = send
+        self._window = window
+        self._outbox: deque[_OutgoingFrame] = deque()
+        self._open: _OutgoingFrame | None = None
+        self._cancel_seal: CALLBACK_TYPE | None = None
+        self._sending = False
+        self.submitted = 0
+        self.frames_sent = 0
+
+    async def async_submit(self, params: dict[str, Any]) -> bool:
+        """Queue params and return whether the frame carrying them was sent."""
+        self.submitted += 1
+        if MERGEABLE_PARAMS.issuperset(params):
+            if self._open is None:
+                self._open = _OutgoingFrame(dict(params), sealed=False)
+                self._outbox.append(self._open)
+                self._cancel_seal = async_call_later(
+                    self.hass, self._window, self._async_seal
+                )
+            else:
+                self._open.params.update(params)
+            frame = self._open
+        else:
+            self._async_seal()
+            frame = _OutgoingFrame(dict(params), sealed=True)
+            self._outbox.append(frame)
+            self._async_pump()
+        # Shielded: one caller giving up must not cancel the frame for the rest
+        return await asyncio.shield(frame.future)
+
+    @callback
+    def _async_seal(self, _now: datetime | None = None) -> None:
+        """Close the open frame to further merges and let it be sent."""
+        if self._cancel_seal:
+            self._cancel_seal()
+            self._cancel_seal = None
+        if self._open is not None:
+            self._open.sealed = True
+            self._open = None
+            self._async_pump()
+
+    @callback
+    def _async_pump(self) -> None:
+        """Start draining the outbox if its head is ready to send."""
+        if not self._sending and self._outbox and self._outbox[0].sealed:
+            self._sending = True
+            self.hass.async_create_task(self._async_drain())
+
+    async def _async_drain(self) -> None:
+        """Send sealed frames in order until the head is still open.
+
+        A frame that fails to send resolves as not sent, and the frames
+        behind it are still sent.
+        """
+        try:
+            while self._outbox and self._outbox[0].sealed:
+                frame = self._outbox.popleft()
+                try:
+                    sent = await self._send(frame.params)
+                except asyncio.CancelledError:
+                    if not frame.future.done():
+                        frame.future.set_result(False)
+                    raise
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error sending command %s", frame.params)
+                    sent = False
+                else:
+                    self.frames_sent += 1
+                if not frame.future.done():
+                    frame.future.set_result(sent)
+        finally:
+            self._sending = False
+
+    @callback
+    def async_clear(self) -> None:
+        """Drop queued frames, failing their submissions."""
+        if self._cancel_seal:
+            self._cancel_seal()
+            self._cancel_seal = None
+        self._open = None
+        while self._outbox:
+            frame = self._outbox.popleft()
+            if not frame.future.done():
+                frame.future.set_result(False)
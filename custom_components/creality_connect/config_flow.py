@@ -8,11 +8,34 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import CONF_PORT, CONF_WS_PORT, DEFAULT_NAME, DEFAULT_PORT, DEFAULT_WS_PORT, DOMAIN
+from .const import (
+    CONF_IMAGE_MAX_WIDTH,
+    CONF_IMAGE_QUALITY,
+    CONF_PORT,
+    CONF_SNAPSHOT_TTL,
+    CONF_STALE_TIMEOUT,
+    CONF_TIMELAPSE_INTERVAL,
+    CONF_TIMELAPSE_KEEP,
+    CONF_TIMELAPSE_MODE,
+    CONF_WS_PORT,
+    DEFAULT_IMAGE_MAX_WIDTH,
+    DEFAULT_IMAGE_QUALITY,
+    DEFAULT_NAME,
+    DEFAULT_PORT,
+    DEFAULT_SNAPSHOT_TTL,
+    DEFAULT_STALE_TIMEOUT,
+    DEFAULT_TIMELAPSE_INTERVAL,
+    DEFAULT_TIMELAPSE_KEEP,
+    DEFAULT_TIMELAPSE_MODE,
+    DEFAULT_WS_PORT,
+    DOMAIN,
+    TIMELAPSE_MODES,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,39 +47,40 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     
     _LOGGER.debug(f"Attempting to connect to {host}:{port}")
     
-    async with aiohttp.ClientSession() as session:
-        endpoints_to_try = [
-            f"http://{host}:{port}/",
-            f"http://{host}:{port}/server/info",
-            f"http://{host}:{port}/printer/info",
-        ]
-        
-        for endpoint in endpoints_to_try:
-            try:
-                _LOGGER.debug(f"Testing endpoint: {endpoint}")
-                async with session.get(
-                    endpoint,
-                    timeout=aiohttp.ClientTimeout(total=5),
-                    ssl=False,
-                ) as response:
-                    _LOGGER.info(f"Printer responded with HTTP {response.status} - connection valid")
-                    return {"title": f"Creality Printer ({host})"}
-                    
-            except asyncio.TimeoutError:
-                _LOGGER.debug(f"Timeout on {endpoint}")
-                continue
-            except aiohttp.ClientError as err:
-                _LOGGER.debug(f"Error on {endpoint}: {err}")
-                continue
-            except Exception as err:
-                _LOGGER.debug(f"Unexpected error on {endpoint}: {err}")
-                continue
-        
-        _LOGGER.error(f"Cannot reach printer at {host}:{port}")
-        raise ConnectionError(
-            f"Cannot connect to printer at {host}:{port}. "
-            "Please check the IP address and ensure the printer is online."
-        )
+    # Probe through the shared session, also used by the connection manager
+    session = async_get_clientsession(hass)
+    endpoints_to_try = [
+        f"http://{host}:{port}/",
+        f"http://{host}:{port}/server/info",
+        f"http://{host}:{port}/printer/info",
+    ]
+    
+    for endpoint in endpoints_to_try:
+        try:
+            _LOGGER.debug(f"Testing endpoint: {endpoint}")
+            async with session.get(
+                endpoint,
+                timeout=aiohttp.ClientTimeout(total=5),
+                ssl=False,
+            ) as response:
+                _LOGGER.info(f"Printer responded with HTTP {response.status} - connection valid")
+                return {"title": f"Creality Printer ({host})"}
+                
+        except asyncio.TimeoutError:
+            _LOGGER.debug(f"Timeout on {endpoint}")
+            continue
+        except aiohttp.ClientError as err:
+            _LOGGER.debug(f"Error on {endpoint}: {err}")
+            continue
+        except Exception as err:
+            _LOGGER.debug(f"Unexpected error on {endpoint}: {err}")
+            continue
+    
+    _LOGGER.error(f"Cannot reach printer at {host}:{port}")
+    raise ConnectionError(
+        f"Cannot connect to printer at {host}:{port}. "
+        "Please check the IP address and ensure the printer is online."
+    )
 
 
 class CrealityK1MaxConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -64,6 +88,14 @@ class CrealityK1MaxConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return CrealityK1MaxOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -102,3 +134,56 @@ class CrealityK1MaxConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Handle import from configuration.yaml."""
         return await self.async_step_user(import_data)
 
+
+
+class CrealityK1MaxOptionsFlow(config_entries.OptionsFlow):
+    """Handle Creality Connect options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        data_schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_STALE_TIMEOUT,
+                    default=options.get(CONF_STALE_TIMEOUT, DEFAULT_STALE_TIMEOUT),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                vol.Optional(
+                    CONF_SNAPSHOT_TTL,
+                    default=options.get(CONF_SNAPSHOT_TTL, DEFAULT_SNAPSHOT_TTL),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                vol.Optional(
+                    CONF_IMAGE_MAX_WIDTH,
+                    default=options.get(CONF_IMAGE_MAX_WIDTH, DEFAULT_IMAGE_MAX_WIDTH),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=7680)),
+                vol.Optional(
+                    CONF_IMAGE_QUALITY,
+                    default=options.get(CONF_IMAGE_QUALITY, DEFAULT_IMAGE_QUALITY),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=95)),
+                vol.Optional(
+                    CONF_TIMELAPSE_MODE,
+                    default=options.get(CONF_TIMELAPSE_MODE, DEFAULT_TIMELAPSE_MODE),
+                ): vol.In(TIMELAPSE_MODES),
+                vol.Optional(
+                    CONF_TIMELAPSE_INTERVAL,
+                    default=options.get(
+                        CONF_TIMELAPSE_INTERVAL, DEFAULT_TIMELAPSE_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                vol.Optional(
+                    CONF_TIMELAPSE_KEEP,
+                    default=options.get(CONF_TIMELAPSE_KEEP, DEFAULT_TIMELAPSE_KEEP),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+            }
+        )
+
+        return self.async_show_form(step_id="init", data_schema=data_schema)
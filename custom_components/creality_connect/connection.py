@@ -0,0 +1,449 @@
+"""Shared connection management for Creality printers."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+import logging
+import random
+import time
+from typing import Any
+
+import aiohttp
+import websockets
+from websockets.client import WebSocketClientProtocol
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import (
+    BACKOFF_BASE,
+    BACKOFF_CAP,
+    CLOSE_TIMEOUT,
+    CONNECT_TIMEOUT,
+    DATA_CONNECTION_MANAGER,
+    DEFAULT_STALE_TIMEOUT,
+    HEALTHY_SESSION,
+    HEARTBEAT_INTERVAL,
+    HEARTBEAT_TIMEOUT,
+    LINK_DEADLINE,
+    MAX_CONCURRENT_CONNECTS,
+    MAX_CONCURRENT_HTTP,
+    RECONNECT_BURST,
+    RECONNECT_RATE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_connection_manager(hass: HomeAssistant) -> CrealityConnectionManager:
+    """Return the connection manager shared by every config entry."""
+    if DATA_CONNECTION_MANAGER not in hass.data:
+        hass.data[DATA_CONNECTION_MANAGER] = CrealityConnectionManager(hass)
+    return hass.data[DATA_CONNECTION_MANAGER]
+
+
+def backoff_delay(failures: int) -> float:
+    """Return a full-jitter backoff delay after failures consecutive failures."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** min(failures, 16)))
+
+
+class TokenBucket:
+    """Token bucket that makes callers wait for a token when it is empty."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize full."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    @property
+    def tokens(self) -> float:
+        """Return the tokens available now."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return self._tokens
+
+    async def async_acquire(self) -> None:
+        """Take one token, waiting for it to refill if needed."""
+        while (tokens := self.tokens) < 1:
+            await asyncio.sleep((1 - tokens) / self.rate)
+        self._tokens -= 1
+
+
+@dataclass
+class PrinterHealth:
+    """Connection health of one printer."""
+
+    url: str
+    state: str = "connecting"
+    connected: bool = False
+    connected_since: float | None = None
+    last_frame: float | None = None
+    frames: int = 0
+    bytes_received: int = 0
+    connects: int = 0
+    failures: int = 0
+    http_requests: int = 0
+    http_errors: int = 0
+    last_error: str | None = None
+    consecutive_failures: int = 0
+    backoff_delay: float = 0.0
+    retry_at: float | None = None
+    latency: float | None = None
+    last_pong: float | None = None
+    missed_heartbeats: int = 0
+    link_timeouts: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the health as a dict, with ages instead of monotonic times."""
+        now = time.monotonic()
+        health = asdict(self)
+        health["connected_for"] = (
+            round(now - self.connected_since, 1) if self.connected_since else None
+        )
+        health["seconds_since_last_frame"] = (
+            round(now - self.last_frame, 1) if self.last_frame else None
+        )
+        health["next_retry_in"] = (
+            round(max(0.0, self.retry_at - now), 1) if self.retry_at else None
+        )
+        health["backoff_delay"] = round(self.backoff_delay, 1)
+        health["latency_ms"] = (
+            round(self.latency * 1000, 1) if self.latency is not None else None
+        )
+        for key in ("connected_since", "last_frame", "retry_at", "latency", "last_pong"):
+            del health[key]
+        return health
+
+    @property
+    def last_seen(self) -> float | None:
+        """Return when the printer was last heard from: a frame or a pong."""
+        times = [t for t in (self.last_frame, self.last_pong, self.connected_since) if t]
+        return max(times) if times else None
+
+
+class PrinterConnection:
+    """WebSocket connection to one printer, kept alive by the manager."""
+
+    def __init__(
+        self,
+        manager: CrealityConnectionManager,
+        url: str,
+        on_message: Callable[[str], Awaitable[None]],
+        on_connect: Callable[[], Awaitable[None]],
+        on_latency: Callable[[float], None] | None = None,
+        stale_timeout: float = DEFAULT_STALE_TIMEOUT,
+    ) -> None:
+        """Initialize."""
+        self._manager = manager
+        self.url = url
+        # Seconds without a frame after which the printer counts as quiet
+        self.stale_timeout = stale_timeout
+        self.health = PrinterHealth(url)
+        self._on_message = on_message
+        self._on_connect = on_connect
+        self._on_latency = on_latency
+        self._websocket: WebSocketClientProtocol | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def connected(self) -> bool:
+        """Return True while the WebSocket is open."""
+        return self._websocket is not None
+
+    @callback
+    def async_start(self) -> None:
+        """Start the connection loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def async_stop(self) -> None:
+        """Close the WebSocket and stop reconnecting."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def async_send(self, message: str) -> bool:
+        """Send a text frame; return False if not connected or the send failed."""
+        if not self._websocket:
+            _LOGGER.error("WebSocket not connected to %s", self.url)
+            return False
+        try:
+            await self._websocket.send(message)
+        except websockets.exceptions.WebSocketException as err:
+            _LOGGER.error("Failed to send to %s: %s", self.url, err)
+            return False
+        return True
+
+    async def _run(self) -> None:
+        """Connect, read until the socket drops, and reconnect with backoff.
+
+        Reconnects wait a full-jitter exponential delay, so printers that
+        dropped together do not retry in lockstep, then take a token from
+        the manager's fleet-wide reconnect bucket. A session that stayed up
+        for HEALTHY_SESSION seconds resets the backoff.
+        """
+        health = self.health
+        reconnect = False
+        while True:
+            if reconnect:
+                health.state = "backoff"
+                health.backoff_delay = backoff_delay(health.consecutive_failures)
+                health.retry_at = time.monotonic() + health.backoff_delay
+                await asyncio.sleep(health.backoff_delay)
+                health.retry_at = None
+                health.state = "waiting_for_token"
+                await self._manager.async_acquire_reconnect()
+            reconnect = True
+
+            health.state = "connecting"
+            try:
+                websocket = await self._manager.async_connect(self.url)
+            except (
+                websockets.exceptions.WebSocketException,
+                OSError,
+                asyncio.TimeoutError,
+            ) as err:
+                self._record_failure(err)
+                health.consecutive_failures += 1
+                _LOGGER.warning("Cannot connect to %s: %s. Retrying...", self.url, err)
+                continue
+
+            self._websocket = websocket
+            health.state = "connected"
+            health.connected = True
+            health.connected_since = connected_since = time.monotonic()
+            health.connects += 1
+            _LOGGER.info("WebSocket connected to %s", self.url)
+            heartbeat = asyncio.create_task(self._heartbeat(websocket))
+            try:
+                await self._on_connect()
+                async for message in websocket:
+                    health.frames += 1
+                    health.bytes_received += len(message)
+                    health.last_frame = time.monotonic()
+                    await self._on_message(message)
+            except (websockets.exceptions.WebSocketException, OSError) as err:
+                self._record_failure(err)
+                _LOGGER.warning("WebSocket disconnected: %s. Reconnecting...", err)
+            except Exception as err:  # pylint: disable=broad-except
+                self._record_failure(err)
+                _LOGGER.exception("Unexpected error in WebSocket loop: %s", err)
+            finally:
+                heartbeat.cancel()
+                self._websocket = None
+                health.connected = False
+                health.connected_since = None
+                await websocket.close()
+
+            # A printer that accepts and then drops us right away backs off too
+            if time.monotonic() - connected_since >= HEALTHY_SESSION:
+                health.consecutive_failures = 0
+            else:
+                health.consecutive_failures += 1
+
+    async def _heartbeat(self, websocket: WebSocketClientProtocol) -> None:
+        """Ping the printer, measure the round trip and drop dead links.
+
+        A half-open TCP connection never errors on its own, so when neither
+        a frame nor a pong has arrived for LINK_DEADLINE seconds the
+        transport is aborted, which ends the read loop and reconnects.
+        """
+        health = self.health
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            sent = time.monotonic()
+            try:
+                pong_waiter = await websocket.ping()
+                await asyncio.wait_for(pong_waiter, HEARTBEAT_TIMEOUT)
+            except asyncio.TimeoutError:
+                health.missed_heartbeats += 1
+            except websockets.exceptions.WebSocketException:
+                return
+            else:
+                health.last_pong = time.monotonic()
+                health.latency = health.last_pong - sent
+                health.missed_heartbeats = 0
+                if self._on_latency:
+                    self._on_latency(health.latency)
+
+            last_seen = health.last_seen
+            if last_seen and time.monotonic() - last_seen > LINK_DEADLINE:
+                health.link_timeouts += 1
+                _LOGGER.warning(
+                    "No frames or pongs from %s for over %s seconds, reconnecting",
+                    self.url,
+                    LINK_DEADLINE,
+                )
+                websocket.transport.abort()
+                return
+
+    def _record_failure(self, err: Exception) -> None:
+        """Record a failed connect or dropped session."""
+        self.health.failures += 1
+        self.health.last_error = str(err) or type(err).__name__
+
+
+class CrealityConnectionManager:
+    """Own every printer's WebSocket and share HTTP access across entries.
+
+    Connection handshakes and HTTP requests are bounded fleet-wide, and
+    reconnects are rate limited by a token bucket, so a network outage
+    across a print farm does not turn into a reconnect storm, and a burst of
+    camera or thumbnail fetches cannot starve the event loop.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._connections: dict[str, PrinterConnection] = {}
+        self._connect_slots = asyncio.Semaphore(MAX_CONCURRENT_CONNECTS)
+        self._http_slots = asyncio.Semaphore(MAX_CONCURRENT_HTTP)
+        self._reconnect_bucket = TokenBucket(RECONNECT_RATE, RECONNECT_BURST)
+        self._connecting = 0
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session."""
+        return async_get_clientsession(self.hass)
+
+    @callback
+    def async_add_printer(
+        self,
+        url: str,
+        on_message: Callable[[str], Awaitable[None]],
+        on_connect: Callable[[], Awaitable[None]],
+        on_latency: Callable[[float], None] | None = None,
+        stale_timeout: float = DEFAULT_STALE_TIMEOUT,
+    ) -> PrinterConnection:
+        """Register a printer and start keeping its WebSocket connected."""
+        if url in self._connections:
+            raise ValueError(f"Printer {url} is already connected")
+        connection = PrinterConnection(
+            self, url, on_message, on_connect, on_latency, stale_timeout
+        )
+        self._connections[url] = connection
+        connection.async_start()
+        return connection
+
+    async def async_remove_printer(self, url: str) -> None:
+        """Disconnect a printer and forget it."""
+        if connection := self._connections.pop(url, None):
+            await connection.async_stop()
+
+    async def async_acquire_reconnect(self) -> None:
+        """Wait for a reconnect token from the fleet-wide bucket."""
+        await self._reconnect_bucket.async_acquire()
+
+    async def async_connect(self, url: str) -> WebSocketClientProtocol:
+        """Open a WebSocket, waiting for a fleet-wide connect slot first."""
+        async with self._connect_slots:
+            self._connecting += 1
+            try:
+                # Heartbeats are run by PrinterConnection, which measures them
+                return await websockets.connect(
+                    url,
+                    open_timeout=CONNECT_TIMEOUT,
+                    close_timeout=CLOSE_TIMEOUT,
+                    ping_interval=None,
+                )
+            finally:
+                self._connecting -= 1
+
+    async def async_http_get(
+        self, url: str, timeout: float, health: PrinterHealth | None = None
+    ) -> tuple[int, bytes]:
+        """GET url through the shared session; return status and body.
+
+        The body is only read for HTTP 200. aiohttp errors and timeouts
+        propagate to the caller, after being counted against health.
+        """
+        if health is None:
+            health = PrinterHealth(url)
+        async with self._http_slots:
+            health.http_requests += 1
+            try:
+                async with self.session.get(
+                    url, timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as response:
+                    if response.status != 200:
+                        health.http_errors += 1
+                        return response.status, b""
+                    return response.status, await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                health.http_errors += 1
+                raise
+
+    async def async_http_post(
+        self,
+        url: str,
+        data: Any,
+        headers: dict[str, str],
+        timeout: aiohttp.ClientTimeout,
+        health: PrinterHealth | None = None,
+    ) -> tuple[int, bytes]:
+        """POST data, which may be an async iterable, and return status and body.
+
+        Uploads do not take one of the fleet-wide HTTP slots: they can run
+        for minutes, and the uploader allows only one per printer.
+        """
+        if health is None:
+            health = PrinterHealth(url)
+        health.http_requests += 1
+        try:
+            async with self.session.post(
+                url, data=data, headers=headers, timeout=timeout
+            ) as response:
+                body = await response.read()
+                if response.status >= 300:
+                    health.http_errors += 1
+                return response.status, body
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            health.http_errors += 1
+            raise
+
+    @callback
+    def aggregate_health(self) -> dict[str, Any]:
+        """Return fleet-wide connection health."""
+        connections = list(self._connections.values())
+        now = time.monotonic()
+        quiet = sum(
+            1
+            for c in connections
+            if not c.health.last_frame
+            or now - c.health.last_frame > c.stale_timeout
+        )
+        return {
+            "printers": len(connections),
+            "connected": sum(c.connected for c in connections),
+            "connecting": self._connecting,
+            "backing_off": sum(c.health.state == "backoff" for c in connections),
+            "waiting_for_token": sum(
+                c.health.state == "waiting_for_token" for c in connections
+            ),
+            "reconnect_tokens": round(self._reconnect_bucket.tokens, 1),
+            "connects": sum(c.health.connects for c in connections),
+            "link_timeouts": sum(c.health.link_timeouts for c in connections),
+            "max_latency_ms": max(
+                (
+                    round(c.health.latency * 1000, 1)
+                    for c in connections
+                    if c.connected and c.health.latency is not None
+                ),
+                default=None,
+            ),
+            "frames": sum(c.health.frames for c in connections),
+            "bytes_received": sum(c.health.bytes_received for c in connections),
+            "failures": sum(c.health.failures for c in connections),
+            "http_requests": sum(c.health.http_requests for c in connections),
+            "http_errors": sum(c.health.http_errors for c in connections),
+            "without_recent_frames": quiet,
+        }
@@ -8,13 +8,142 @@ CONF_HOST: Final = "host"
 CONF_PORT: Final = "port"
 CONF_WS_PORT: Final = "ws_port"
 
+# Options
+CONF_STALE_TIMEOUT: Final = "stale_timeout"
+CONF_SNAPSHOT_TTL: Final = "snapshot_ttl"
+CONF_IMAGE_MAX_WIDTH: Final = "image_max_width"
+CONF_IMAGE_QUALITY: Final = "image_quality"
+CONF_TIMELAPSE_MODE: Final = "timelapse_mode"
+CONF_TIMELAPSE_INTERVAL: Final = "timelapse_interval"
+CONF_TIMELAPSE_KEEP: Final = "timelapse_keep"
+
 # Default values
 DEFAULT_PORT: Final = 9999
 DEFAULT_WS_PORT: Final = 9999
 DEFAULT_NAME: Final = "Creality K1 Max"
+DEFAULT_STALE_TIMEOUT: Final = 60  # seconds
+DEFAULT_SNAPSHOT_TTL: Final = 2.0  # seconds a camera snapshot may be reused
+DEFAULT_IMAGE_MAX_WIDTH: Final = 1280  # pixels, 0 serves images at source size
+DEFAULT_IMAGE_QUALITY: Final = 75  # JPEG quality of resized camera images
+DEFAULT_TIMELAPSE_MODE: Final = "off"
+DEFAULT_TIMELAPSE_INTERVAL: Final = 30  # seconds between frames in interval mode
+DEFAULT_TIMELAPSE_KEEP: Final = 10  # finished timelapses kept per printer
+
+# Update intervals (data is pushed over the WebSocket, there is no polling)
+WATCHDOG_INTERVAL: Final = 10  # seconds
+RESUBSCRIBE_DELAY: Final = 1  # seconds entity changes settle before re-subscribing
+
+# Connection management (shared by every printer in one Home Assistant)
+DATA_CONNECTION_MANAGER: Final = f"{DOMAIN}_connections"
+MAX_CONCURRENT_CONNECTS: Final = 4
+MAX_CONCURRENT_HTTP: Final = 8
+CONNECT_TIMEOUT: Final = 10  # seconds
+CLOSE_TIMEOUT: Final = 2  # seconds, so unloading a dead printer is quick
+HTTP_TIMEOUT: Final = 10  # seconds
+
+# Reconnect backoff: full jitter over min(cap, base * 2 ** failures)
+BACKOFF_BASE: Final = 1  # seconds
+BACKOFF_CAP: Final = 300  # seconds
+HEALTHY_SESSION: Final = 30  # seconds connected before the backoff resets
+RECONNECT_RATE: Final = 2  # reconnect attempts per second, across all printers
+RECONNECT_BURST: Final = 10
+
+# Heartbeat: a link with no frames or pongs for LINK_DEADLINE is torn down
+HEARTBEAT_INTERVAL: Final = 15  # seconds
+HEARTBEAT_TIMEOUT: Final = 10  # seconds
+LINK_DEADLINE: Final = 45  # seconds
+
+# Webcam (mjpg-streamer on a fixed port)
+CAMERA_PORT: Final = 8080
+MJPEG_BOUNDARY: Final = "frame"
+MJPEG_CLIENT_BUFFER: Final = 2  # frames queued per viewer before dropping stale ones
+MJPEG_IDLE_TIMEOUT: Final = 5  # seconds without viewers before the upstream closes
+MJPEG_READ_TIMEOUT: Final = 15  # seconds
+MJPEG_RETRY_DELAY: Final = 5  # seconds
+
+# Print preview thumbnails, cached on disk across restarts and printers
+DATA_THUMBNAIL_CACHE: Final = f"{DOMAIN}_thumbnails"
+THUMBNAIL_CACHE_DIR: Final = f"{DOMAIN}/thumbnails"  # relative to the config dir
+THUMBNAIL_CACHE_SIZE: Final = 50 * 1024 * 1024  # bytes kept before evicting
+THUMBNAIL_PATH: Final = "/downloads/original/current_print_image.png"
+
+# Timelapse capture; frames go straight to disk and are thinned past the caps
+TIMELAPSE_OFF: Final = "off"
+TIMELAPSE_LAYER: Final = "layer"
+TIMELAPSE_INTERVAL: Final = "interval"
+TIMELAPSE_MODES: Final = [TIMELAPSE_OFF, TIMELAPSE_LAYER, TIMELAPSE_INTERVAL]
+TIMELAPSE_DIR: Final = f"{DOMAIN}/timelapse"  # relative to the config dir
+TIMELAPSE_MAX_FRAMES: Final = 2000  # frames per print
+TIMELAPSE_MAX_BYTES: Final = 1024 * 1024 * 1024  # frame bytes per print
+TIMELAPSE_FPS: Final = 30
+TIMELAPSE_ANIMATION_WIDTH: Final = 640  # pixels, when assembled without ffmpeg
+EVENT_TIMELAPSE_COMPLETE: Final = f"{DOMAIN}_timelapse_complete"
+
+# Telemetry history: numeric keys kept in memory at decreasing resolution
+TELEMETRY_KEYS: Final = (
+    "nozzle_temp",
+    "nozzle_target",
+    "bed_temp",
+    "bed_target",
+    "speed",
+    "speed_factor",
+    "fan_speed",
+    "auxiliary_fan",
+    "case_fan",
+    "position_x",
+    "position_y",
+    "position_z",
+    "progress",
+    "current_layer",
+)
+# (seconds per sample, samples kept): 1 h at 1 s, 12 h at 10 s, 7 days at 1 min
+TELEMETRY_TIERS: Final = ((1, 3600), (10, 4320), (60, 10080))
+TELEMETRY_EXPORT_DIR: Final = f"{DOMAIN}/exports"  # relative to the config dir
+EVENT_TELEMETRY_EXPORTED: Final = f"{DOMAIN}_telemetry_exported"
+SERVICE_EXPORT_TELEMETRY: Final = "export_telemetry"
+
+# Print time estimate: print seconds over which the pace is averaged
+ETA_TIME_CONSTANT: Final = 600
+
+# Thermal anomaly detection
+THERMAL_EWMA_TIME: Final = 30  # seconds the deviation statistics average over
+THERMAL_SAMPLE_INTERVAL: Final = 1  # seconds between samples of the heaters
+THERMAL_SLOPE_WINDOW: Final = 30  # samples the slope is fitted to
+EVENT_THERMAL_ANOMALY: Final = f"{DOMAIN}_thermal_anomaly"
+ANOMALY_SENSOR_FAULT: Final = "sensor_fault"
+ANOMALY_HEATING_FAILED: Final = "heating_failed"
+ANOMALY_RUNAWAY: Final = "runaway"
+ANOMALY_UNSTABLE: Final = "unstable"
+
+# File upload; the file is streamed from disk in chunks, never held in memory
+UPLOAD_CHUNK_SIZE: Final = 1024 * 1024  # bytes read from disk at a time
+UPLOAD_ATTEMPTS: Final = 5  # tries before a dropped upload is given up
+UPLOAD_RETRY_DELAY: Final = 5  # seconds, doubled after every dropped attempt
+UPLOAD_STALL_TIMEOUT: Final = 60  # seconds without progress before a drop is assumed
+UPLOAD_PROGRESS_INTERVAL: Final = 2  # seconds between progress events
+SERVICE_UPLOAD_FILE: Final = "upload_file"
+SERVICE_CANCEL_UPLOAD: Final = "cancel_upload"
+EVENT_UPLOAD_PROGRESS: Final = f"{DOMAIN}_upload_progress"
+EVENT_UPLOAD_FINISHED: Final = f"{DOMAIN}_upload_finished"
+UPLOAD_COMPLETE: Final = "complete"
+UPLOAD_CANCELLED: Final = "cancelled"
+UPLOAD_FAILED: Final = "failed"
+
+# G-code metadata index; only the comment blocks at either end of a file are read
+DATA_GCODE_INDEX: Final = f"{DOMAIN}_gcode_index"
+GCODE_SUFFIXES: Final = (".gcode", ".gco", ".g")
+GCODE_HEADER_BYTES: Final = 256 * 1024  # scanned after any embedded thumbnails
+GCODE_FOOTER_BYTES: Final = 256 * 1024  # slicer config blocks end the file
+GCODE_MAX_THUMBNAIL_BYTES: Final = 2 * 1024 * 1024  # base64 text of one thumbnail
+GCODE_INDEX_SIZE: Final = 5000  # files kept in the index
+GCODE_EVENT_MAX_FILES: Final = 100  # files listed in an index event
+SERVICE_INDEX_GCODE: Final = "index_gcode"
+EVENT_GCODE_INDEXED: Final = f"{DOMAIN}_gcode_indexed"
 
-# Update intervals
-SCAN_INTERVAL: Final = 1  # seconds
+# Command acknowledgement: how long telemetry may take to reflect a command
+COMMAND_TIMEOUT: Final = 10  # seconds
+STATE_COMMAND_TIMEOUT: Final = 30  # seconds, pause and stop wait for the current move
+COMMAND_MERGE_WINDOW: Final = 0.25  # seconds setpoint commands are merged for
 
 # Printer states
 STATE_IDLE: Final = "idle"
@@ -28,9 +157,12 @@ STATE_ERROR: Final = "error"
 ENDPOINT_PRINTER_OBJECTS_QUERY: Final = "/printer/objects/query"
 ENDPOINT_PRINTER_INFO: Final = "/printer/info"
 ENDPOINT_SERVER_INFO: Final = "/server/info"
+ENDPOINT_FILES_UPLOAD: Final = "/server/files/upload"
+ENDPOINT_FILES_METADATA: Final = "/server/files/metadata"
+ENDPOINT_PRINT_START: Final = "/printer/print/start"
 
 # WebSocket message types
-WS_METHOD_NOTIFY: Final = "notify"
+WS_METHOD_NOTIFY: Final = "notify_status_update"
 WS_METHOD_SET: Final = "set"
 
 # Printer object keys
@@ -1,27 +1,117 @@
 """Data update coordinator for Creality Connect."""
 import asyncio
+import itertools
 import json
+from collections import ChainMap
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
 import logging
-from datetime import timedelta
-from typing import Any
+from datetime import datetime, timedelta
+import time
+from typing import TYPE_CHECKING, Any
 
-import aiohttp
-import websockets
-from websockets.client import WebSocketClientProtocol
-
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN, SCAN_INTERVAL, WS_METHOD_NOTIFY, WS_METHOD_SET
+from .commands import (
+    MERGEABLE_PARAMS,
+    OPTIMISTIC_VALUES,
+    CommandError,
+    CommandQueue,
+    CommandStats,
+    CommandTimeoutError,
+    PendingCommand,
+)
+from .connection import PrinterConnection, async_get_connection_manager
+from .const import (
+    CAMERA_PORT,
+    COMMAND_MERGE_WINDOW,
+    DEFAULT_STALE_TIMEOUT,
+    DOMAIN,
+    EVENT_THERMAL_ANOMALY,
+    HTTP_TIMEOUT,
+    RESUBSCRIBE_DELAY,
+    STATE_PAUSED,
+    STATE_PRINTING,
+    TELEMETRY_KEYS,
+    THERMAL_SAMPLE_INTERVAL,
+    WATCHDOG_INTERVAL,
+    WS_METHOD_NOTIFY,
+    WS_METHOD_SET,
+)
+from .decoder import (
+    CrealityFrameDecoder,
+    MoonrakerStatusDecoder,
+    is_creality_frame,
+    moonraker_subscription,
+)
+from .eta import ETA_INPUTS, ETA_KEYS, PrintEtaEstimator
+from .gcode import async_get_gcode_index
+from .mjpeg import MjpegStreamHub
+from .state import PrinterState
+from .telemetry import TelemetryHistory
+from .thermal import ThermalMonitor
+
+if TYPE_CHECKING:
+    import aiohttp
+
+    from .timelapse import TimelapseRecorder
+    from .upload import FileUploader
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class UpdateContext:
+    """Data keys an entity renders from and how often it may be updated.
+
+    min_interval caps the state write rate; changes inside the window are
+    coalesced into one write when it closes. deadband and relative_deadband
+    (a fraction of the last written value) suppress writes for numeric
+    changes that are too small to matter.
+    """
+
+    keys: tuple[str, ...]
+    min_interval: float = 0
+    deadband: float = 0
+    relative_deadband: float = 0
+
+    @property
+    def is_limited(self) -> bool:
+        """Return True if any rate limit or deadband applies."""
+        return bool(self.min_interval or self.deadband or self.relative_deadband)
+
+
+class _KeyedListener:
+    """Update callback indexed by data key, with its rate limit state."""
+
+    __slots__ = ("update_callback", "context", "last_write", "last_values", "cancel_flush")
+
+    def __init__(self, update_callback: CALLBACK_TYPE, context: UpdateContext) -> None:
+        """Initialize."""
+        self.update_callback = update_callback
+        self.context = context
+        self.last_write = 0.0
+        self.last_values: tuple[Any, ...] | None = None
+        self.cancel_flush: CALLBACK_TYPE | None = None
+
+
+def _is_number(value: Any) -> bool:
+    """Return True for int and float values, but not bools."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
 class CrealityK1MaxCoordinator(DataUpdateCoordinator):
     """Manage fetching Creality printer data."""
 
     def __init__(
-        self, hass: HomeAssistant, host: str, port: int, ws_port: int
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        ws_port: int,
+        stale_timeout: float = DEFAULT_STALE_TIMEOUT,
     ) -> None:
         """Initialize."""
         self.host = host
@@ -30,205 +120,433 @@ class CrealityK1MaxCoordinator(DataUpdateCoordinator):
         self.http_base = f"http://{host}:{port}"
         self.ws_url = f"ws://{host}:{ws_port}/websocket"
         
-        self._websocket: WebSocketClientProtocol | None = None
-        self._ws_task: asyncio.Task | None = None
-        self._running = False
+        # Sockets are owned by the shared manager so fleets connect politely
+        self.connections = async_get_connection_manager(hass)
+        self._connection: PrinterConnection | None = None
+        self.camera_stream = MjpegStreamHub(
+            self.connections, f"http://{host}:{CAMERA_PORT}/?action=stream"
+        )
+        self._decoder = CrealityFrameDecoder()
+        self._moonraker_decoder = MoonrakerStatusDecoder()
+        # Moonraker objects and fields subscribed to, with the connection's
+        # received byte count and time when the subscription was made
+        self._subscription: dict[str, list[str]] | None = None
+        self._subscription_start: tuple[float, int] | None = None
+        self._cancel_resubscribe: CALLBACK_TYPE | None = None
+        self.telemetry = TelemetryHistory()
+        self.eta = PrintEtaEstimator()
+        self.thermal = ThermalMonitor()
+        # Slicer metadata of the current file, if it has been indexed
+        self.gcode_index = async_get_gcode_index(hass)
+        self._unsub_gcode_index: CALLBACK_TYPE | None = None
+        # Set up by the config entry when timelapse capture is enabled
+        self.timelapse: TimelapseRecorder | None = None
+        # Set up by the config entry
+        self.uploader: FileUploader | None = None
+        self._unsub_watchdog: CALLBACK_TYPE | None = None
+        self._unsub_thermal: CALLBACK_TYPE | None = None
+
+        # Monotonic time of the last WebSocket frame, checked by the watchdog
+        self.stale_timeout = stale_timeout
+        self._last_frame_time: float | None = None
+
+        # Commands waiting for telemetry to reflect them, by correlation ID
+        self._command_ids = itertools.count(1)
+        self._pending_commands: dict[int, PendingCommand] = {}
+        self.command_stats: dict[str, CommandStats] = {}
+        self.command_queue = CommandQueue(hass, self.send_command, COMMAND_MERGE_WINDOW)
+
+        # Optimistic values: data key -> ID of the command showing its value,
+        # and the telemetry reported for those keys in the meantime
+        self._optimistic: dict[str, int] = {}
+        self._reported: dict[str, Any] = {}
+
+        # Data key -> {remove_listener: listener} for keyed listeners
+        self._key_listeners: dict[str, dict[CALLBACK_TYPE, _KeyedListener]] = {}
+        self._changed_keys: list[str] | None = None
         
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(seconds=SCAN_INTERVAL),
+        # No update_interval: updates are pushed by the WebSocket loop only
+        super().__init__(hass, _LOGGER, name=DOMAIN)
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates.
+
+        Entities pass the data keys they render from as their context, either
+        as a plain tuple of keys or as an UpdateContext carrying rate limits.
+        This indexes them so a frame only wakes the entities whose keys
+        changed. A context of None listens to every key.
+        """
+        remove_listener = super().async_add_listener(update_callback, context)
+        self._async_schedule_resubscribe()
+        if context is None:
+            return remove_listener
+
+        if not isinstance(context, UpdateContext):
+            context = UpdateContext(tuple(context))
+        listener = _KeyedListener(update_callback, context)
+        for key in context.keys:
+            self._key_listeners.setdefault(key, {})[remove_listener] = listener
+
+        @callback
+        def remove_key_listener() -> None:
+            """Remove update listener and its key index entries."""
+            remove_listener()
+            if listener.cancel_flush:
+                listener.cancel_flush()
+                listener.cancel_flush = None
+            for key in context.keys:
+                listeners = self._key_listeners.get(key)
+                if listeners is None:
+                    continue
+                listeners.pop(remove_listener, None)
+                if not listeners:
+                    del self._key_listeners[key]
+            self._async_schedule_resubscribe()
+
+        return remove_key_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update listeners, restricted to the changed keys when known."""
+        if self._changed_keys is None:
+            super().async_update_listeners()
+            # Every entity just wrote state, so restart their rate windows
+            now = time.monotonic()
+            for listeners in self._key_listeners.values():
+                for listener in listeners.values():
+                    self._async_mark_written(listener, now)
+            return
+
+        notified: set[CALLBACK_TYPE] = set()
+        for key in self._changed_keys:
+            for remove_listener, listener in list(
+                self._key_listeners.get(key, {}).items()
+            ):
+                if remove_listener not in notified:
+                    notified.add(remove_listener)
+                    self._async_notify_keyed(listener)
+
+        # Listeners without a key context see every change
+        for update_callback, context in list(self._listeners.values()):
+            if context is None:
+                update_callback()
+
+    @callback
+    def _async_notify_keyed(self, listener: _KeyedListener) -> None:
+        """Notify a keyed listener, applying its rate limit and deadband."""
+        context = listener.context
+        if not context.is_limited:
+            listener.update_callback()
+            return
+
+        # A pending flush reads the data when it fires, so the latest value wins
+        if listener.cancel_flush or self._within_deadband(listener):
+            return
+
+        now = time.monotonic()
+        wait = listener.last_write + context.min_interval - now
+        if wait <= 0:
+            self._async_mark_written(listener, now)
+            listener.update_callback()
+            return
+
+        @callback
+        def _async_flush(_now: datetime) -> None:
+            """Write the coalesced value once the rate window closes."""
+            listener.cancel_flush = None
+            if self._within_deadband(listener):
+                return
+            self._async_mark_written(listener, time.monotonic())
+            listener.update_callback()
+
+        listener.cancel_flush = async_call_later(self.hass, wait, _async_flush)
+
+    @callback
+    def _async_mark_written(self, listener: _KeyedListener, now: float) -> None:
+        """Record the values a keyed listener last wrote."""
+        data = self.data or {}
+        listener.last_write = now
+        listener.last_values = tuple(data.get(key) for key in listener.context.keys)
+
+    def _within_deadband(self, listener: _KeyedListener) -> bool:
+        """Return True if no key moved past the deadband since the last write."""
+        context = listener.context
+        last_values = listener.last_values
+        if last_values is None or not (context.deadband or context.relative_deadband):
+            return False
+
+        data = self.data or {}
+        for key, last in zip(context.keys, last_values):
+            value = data.get(key)
+            if value == last:
+                continue
+            if not _is_number(value) or not _is_number(last):
+                return False
+            band = max(context.deadband, context.relative_deadband * abs(last))
+            if abs(value - last) > band:
+                return False
+        return True
+
+    @callback
+    def async_set_updated_keys(self, updated_data: Mapping[str, Any]) -> None:
+        """Merge pushed telemetry and acknowledge commands it reflects.
+
+        Keys showing an optimistic value keep it; their telemetry is set
+        aside until the command that set them resolves.
+        """
+        eta_inputs_changed = not ETA_INPUTS.isdisjoint(updated_data)
+        if self._optimistic:
+            updated_data = self._async_set_aside_reported(updated_data)
+        self._async_publish(updated_data)
+        self._async_resolve_commands()
+        data = self._reported_data if self._reported else self.data
+        if eta_inputs_changed:
+            self._async_publish(self.eta.update(data))
+        if "filename" in updated_data:
+            self._async_update_gcode_metadata()
+        self.telemetry.record(data)
+
+    @callback
+    def _async_update_gcode_metadata(self) -> None:
+        """Publish the indexed metadata of the file being printed."""
+        if self.data is None:
+            return
+        self._async_publish(
+            {"gcode_metadata": self.gcode_index.async_lookup(self.data.filename)}
         )
 
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Update data via WebSocket."""
-        if self.data:
+    @callback
+    def _async_check_thermal(self, now: datetime) -> None:
+        """Feed the heaters' anomaly detection and report what it finds.
+
+        Runs on a timer rather than per frame: the decoders drop fields whose
+        value has not changed, so a heater stuck at one reading would
+        otherwise never be sampled again.
+        """
+        if self.data is None or not self.last_update_success:
+            return
+        data = self._reported_data if self._reported else self.data
+        changed = self.thermal.update(data, time.monotonic())
+        if not changed:
+            return
+        for heater in changed:
+            if heater.anomaly is None:
+                _LOGGER.info("%s %s temperature is back to normal", self.host, heater.name)
+                continue
+            _LOGGER.warning(
+                "%s %s temperature anomaly: %s", self.host, heater.name, heater.anomaly
+            )
+            self.hass.bus.async_fire(
+                EVENT_THERMAL_ANOMALY,
+                {
+                    "host": self.host,
+                    "target": data.get(heater.limits.target_key),
+                    **heater.as_dict(),
+                },
+            )
+        self._async_publish({"thermal_anomalies": self.thermal.anomalies})
+
+    @callback
+    def _async_publish(self, updated_data: Mapping[str, Any]) -> None:
+        """Apply partial data in place and notify only listeners of changed keys."""
+        data = self.data
+        if data is None or not self.last_update_success:
+            if data is None:
+                data = PrinterState()
+            data.update(updated_data)
+            self.async_set_updated_data(data)
+            return
+
+        changed = data.update(updated_data)
+        if not changed:
+            return
+
+        self._changed_keys = changed
+        try:
+            self.async_set_updated_data(data)
+        finally:
+            self._changed_keys = None
+
+    async def _async_update_data(self) -> PrinterState:
+        """Return the pushed data, or defaults before the first frame."""
+        if self._is_stale():
+            raise UpdateFailed(
+                f"No data received from printer for over {self.stale_timeout} seconds"
+            )
+
+        if self.data is not None:
             return self.data
-        
-        return {
-            "state": "idle",
-            "filename": "",
-            "print_duration": 0,
-            "print_time_remaining": 0,
-            "total_duration": 0,
-            "progress": 0,
-            "nozzle_temp": 0,
-            "nozzle_target": 0,
-            "bed_temp": 0,
-            "bed_target": 0,
-            "position_x": 0,
-            "position_y": 0,
-            "position_z": 0,
-            "speed": 0,
-            "speed_factor": 100,
-            "fan_speed": 0,
-            "auxiliary_fan": 0,
-            "case_fan": 0,
-            "current_layer": 0,
-            "total_layers": 0,
-            "light_on": False,
-        }
+        return PrinterState()
 
-    def _process_printer_data(self, status: dict[str, Any]) -> dict[str, Any]:
-        """Process printer data into structured format."""
-        print_stats = status.get("print_stats", {})
-        toolhead = status.get("toolhead", {})
-        extruder = status.get("extruder", {})
-        heater_bed = status.get("heater_bed", {})
-        fan_data = status.get("fan", {})
-        gcode_move = status.get("gcode_move", {})
-        virtual_sdcard = status.get("virtual_sdcard", {})
-        
-        return {
-            "state": print_stats.get("state", "idle"),
-            "filename": print_stats.get("filename", ""),
-            "print_duration": print_stats.get("print_duration", 0),
-            "total_duration": print_stats.get("total_duration", 0),
-            "progress": virtual_sdcard.get("progress", 0) * 100,
-            "nozzle_temp": round(extruder.get("temperature", 0), 1),
-            "nozzle_target": round(extruder.get("target", 0), 1),
-            "bed_temp": round(heater_bed.get("temperature", 0), 1),
-            "bed_target": round(heater_bed.get("target", 0), 1),
-            "position_x": round(toolhead.get("position", [0, 0, 0, 0])[0], 2),
-            "position_y": round(toolhead.get("position", [0, 0, 0, 0])[1], 2),
-            "position_z": round(toolhead.get("position", [0, 0, 0, 0])[2], 2),
-            "speed": round(gcode_move.get("speed", 0) / 60, 2),
-            "speed_factor": round(gcode_move.get("speed_factor", 1.0) * 100, 0),
-            "fan_speed": round(fan_data.get("speed", 0) * 100, 0),
-            "auxiliary_fan": 0,
-            "case_fan": 0,
-            "current_layer": status.get("current_layer", 0),
-            "total_layers": status.get("total_layers", 0),
-            "light_on": False,
-        }
+    def _is_stale(self) -> bool:
+        """Return True if no frame has arrived within the staleness window."""
+        return (
+            self._last_frame_time is not None
+            and time.monotonic() - self._last_frame_time > self.stale_timeout
+        )
+
+    @callback
+    def _async_check_stale(self, now: datetime) -> None:
+        """Mark entities unavailable when the printer stops sending frames."""
+        if not self.last_update_success or not self._is_stale():
+            return
+
+        _LOGGER.warning(
+            "No data received from %s for over %s seconds, marking unavailable",
+            self.host,
+            self.stale_timeout,
+        )
+        self.last_update_success = False
+        self.async_update_listeners()
+
+    @property
+    def connection_health(self) -> dict[str, Any]:
+        """Return the health of this printer's connection."""
+        if self._connection is None:
+            return {"url": self.ws_url, "connected": False}
+        return self._connection.health.as_dict()
 
     async def async_start_websocket(self) -> None:
-        """Start WebSocket connection."""
-        if self._running:
+        """Start WebSocket connection and the timers and listeners it feeds."""
+        if self._connection is not None:
             return
-            
-        self._running = True
-        self._ws_task = asyncio.create_task(self._websocket_loop())
-
-    async def _websocket_loop(self) -> None:
-        """WebSocket loop with auto-reconnect."""
-        while self._running:
-            try:
-                async with websockets.connect(self.ws_url) as websocket:
-                    self._websocket = websocket
-                    _LOGGER.info("WebSocket connected to %s", self.ws_url)
-                    
-                    await self._subscribe_to_updates()
-                    
-                    async for message in websocket:
-                        await self._handle_websocket_message(message)
-                        
-            except (websockets.exceptions.WebSocketException, OSError) as err:
-                _LOGGER.warning("WebSocket disconnected: %s. Reconnecting...", err)
-                self._websocket = None
-                await asyncio.sleep(5)
-                
-            except Exception as err:
-                _LOGGER.exception("Unexpected error in WebSocket loop: %s", err)
-                await asyncio.sleep(5)
 
-    async def _subscribe_to_updates(self) -> None:
-        """Subscribe to printer updates."""
-        if not self._websocket:
+        self._last_frame_time = time.monotonic()
+        self._connection = self.connections.async_add_printer(
+            self.ws_url,
+            self._handle_websocket_message,
+            self._async_on_connect,
+            self._async_handle_latency,
+            self.stale_timeout,
+        )
+        self._unsub_watchdog = async_track_time_interval(
+            self.hass, self._async_check_stale, timedelta(seconds=WATCHDOG_INTERVAL)
+        )
+        self._unsub_thermal = async_track_time_interval(
+            self.hass,
+            self._async_check_thermal,
+            timedelta(seconds=THERMAL_SAMPLE_INTERVAL),
+        )
+        self._unsub_gcode_index = self.gcode_index.async_add_listener(
+            self._async_update_gcode_metadata
+        )
+
+    async def _async_on_connect(self) -> None:
+        """Start from a clean slate on every (re)connect."""
+        self._decoder.reset()
+        self._moonraker_decoder.reset()
+        await self._subscribe_to_updates()
+
+    @callback
+    def _async_handle_latency(self, latency: float) -> None:
+        """Publish the heartbeat round-trip time, in milliseconds."""
+        # A pong alone must not make a printer that stopped sending frames available
+        if self.data and self.last_update_success:
+            self.async_set_updated_keys({"link_latency": round(latency * 1000, 1)})
+
+    def _subscription_keys(self) -> set[str] | None:
+        """Return the data keys listeners, the estimator and the history read.
+
+        Entities only listen while enabled, so this follows the entity
+        registry. None means a listener wants every key.
+        """
+        if any(context is None for _, context in self._listeners.values()):
+            return None
+        keys = {*self._key_listeners, *TELEMETRY_KEYS}
+        if not keys.isdisjoint(ETA_KEYS):
+            keys |= ETA_INPUTS
+        return keys
+
+    @property
+    def subscription(self) -> dict[str, Any]:
+        """Return the Moonraker subscription and the data rate since it was made."""
+        bytes_per_second = None
+        if self._subscription_start is not None and self._connection is not None:
+            started, received = self._subscription_start
+            if (elapsed := time.monotonic() - started) > 0:
+                bytes_per_second = round(
+                    (self._connection.health.bytes_received - received) / elapsed, 1
+                )
+        return {"objects": self._subscription, "bytes_per_second": bytes_per_second}
+
+    @callback
+    def _async_schedule_resubscribe(self) -> None:
+        """Re-subscribe once entities being enabled or disabled have settled."""
+        if self._connection is None or self._cancel_resubscribe is not None:
             return
-            
+
+        @callback
+        def _async_resubscribe(_now: datetime) -> None:
+            self._cancel_resubscribe = None
+            if (
+                self._connection is not None
+                and self._connection.health.connected
+                and moonraker_subscription(self._subscription_keys())
+                != self._subscription
+            ):
+                asyncio.create_task(self._subscribe_to_updates())
+
+        self._cancel_resubscribe = async_call_later(
+            self.hass, RESUBSCRIBE_DELAY, _async_resubscribe
+        )
+
+    async def _subscribe_to_updates(self) -> None:
+        """Subscribe to the fields that enabled entities need."""
+        objects = moonraker_subscription(self._subscription_keys())
         subscribe_msg = {
             "jsonrpc": "2.0",
             "method": "printer.objects.subscribe",
-            "params": {
-                "objects": {
-                    "print_stats": None,
-                    "toolhead": None,
-                    "extruder": None,
-                    "heater_bed": None,
-                    "fan": None,
-                    "gcode_move": None,
-                    "virtual_sdcard": None,
-                }
-            },
+            "params": {"objects": objects},
             "id": 1,
         }
         
-        try:
-            await self._websocket.send(json.dumps(subscribe_msg))
-        except Exception as err:
-            _LOGGER.error("Failed to subscribe to updates: %s", err)
+        if not await self._connection.async_send(json.dumps(subscribe_msg)):
+            _LOGGER.error("Failed to subscribe to updates from %s", self.host)
+            return
+
+        if self._subscription is not None:
+            _LOGGER.debug(
+                "Subscribed to %s fields of %s objects on %s, was %s fields at %s B/s",
+                sum(map(len, objects.values())),
+                len(objects),
+                self.host,
+                sum(map(len, self._subscription.values())),
+                self.subscription["bytes_per_second"],
+            )
+        self._subscription = objects
+        self._subscription_start = (
+            time.monotonic(),
+            self._connection.health.bytes_received,
+        )
 
     async def _handle_websocket_message(self, message: str) -> None:
         """Handle WebSocket messages."""
+        self._last_frame_time = time.monotonic()
         try:
             data = json.loads(message)
             
-            if "nozzleTemp" in data or "bedTemp0" in data or "TotalLayer" in data:
+            if is_creality_frame(data):
                 _LOGGER.debug("Received Creality format data")
-                updated_data = {}
-                
-                if "nozzleTemp" in data:
-                    updated_data["nozzle_temp"] = round(float(data["nozzleTemp"]), 1)
-                if "bedTemp0" in data:
-                    updated_data["bed_temp"] = round(float(data["bedTemp0"]), 1)
-                if "targetNozzleTemp" in data:
-                    updated_data["nozzle_target"] = round(float(data["targetNozzleTemp"]), 1)
-                if "targetBedTemp0" in data:
-                    updated_data["bed_target"] = round(float(data["targetBedTemp0"]), 1)
-                
-                if "printProgress" in data:
-                    updated_data["progress"] = round(float(data["printProgress"]), 1)
-                if "printJobTime" in data:
-                    updated_data["print_duration"] = int(data["printJobTime"])
-                if "printLeftTime" in data:
-                    updated_data["print_time_remaining"] = int(data["printLeftTime"])
-                    if "printJobTime" in data:
-                        updated_data["total_duration"] = int(data["printJobTime"]) + int(data["printLeftTime"])
-                
-                if "printFileName" in data:
-                    updated_data["filename"] = str(data["printFileName"]).split("/")[-1]
-                if "state" in data or "deviceState" in data:
-                    state_code = data.get("deviceState", data.get("state", 0))
-                    state_map = {0: "idle", 1: "printing", 2: "paused", 3: "complete"}
-                    updated_data["state"] = state_map.get(state_code, "idle")
-                
-                if "curPosition" in data:
-                    pos_str = data["curPosition"]
-                    x_match = pos_str.split("X:")[1].split()[0] if "X:" in pos_str else "0"
-                    y_match = pos_str.split("Y:")[1].split()[0] if "Y:" in pos_str else "0"
-                    z_match = pos_str.split("Z:")[1].split()[0] if "Z:" in pos_str else "0"
-                    updated_data["position_x"] = round(float(x_match), 2)
-                    updated_data["position_y"] = round(float(y_match), 2)
-                    updated_data["position_z"] = round(float(z_match), 2)
-                
-                if "realTimeSpeed" in data:
-                    updated_data["speed"] = round(float(data["realTimeSpeed"]), 2)
-                if "curFeedratePct" in data:
-                    updated_data["speed_factor"] = round(float(data["curFeedratePct"]), 0)
-                
-                if "layer" in data:
-                    updated_data["current_layer"] = int(data["layer"])
-                if "TotalLayer" in data:
-                    updated_data["total_layers"] = int(data["TotalLayer"])
-                
-                if self.data:
-                    self.async_set_updated_data({**self.data, **updated_data})
-                else:
-                    self.async_set_updated_data(updated_data)
-                    
+                self.async_set_updated_keys(self._decoder.decode(data))
                 return
             
             if data.get("method") == WS_METHOD_NOTIFY:
-                params = data.get("params", [{}])
-                if params:
-                    status = params[0]
-                    
-                    if self.data:
-                        updated_data = self._process_printer_data(status)
-                        self.async_set_updated_data({**self.data, **updated_data})
-                        
+                params = data.get("params")
+                if params and isinstance(params[0], dict):
+                    self.async_set_updated_keys(
+                        self._moonraker_decoder.decode(params[0])
+                    )
+                return
+
+            # The subscription is answered with the full status of its objects
+            result = data.get("result")
+            if isinstance(result, dict) and isinstance(result.get("status"), dict):
+                self.async_set_updated_keys(
+                    self._moonraker_decoder.decode(result["status"])
+                )
         except json.JSONDecodeError:
             _LOGGER.warning("Failed to decode WebSocket message: %s", message)
         except Exception as err:
@@ -236,37 +554,208 @@ class CrealityK1MaxCoordinator(DataUpdateCoordinator):
 
     async def send_command(self, params: dict[str, Any]) -> bool:
         """Send command to printer."""
-        if not self._websocket:
+        if self._connection is None:
             _LOGGER.error("WebSocket not connected")
             return False
-            
-        try:
-            msg = {
-                "method": WS_METHOD_SET,
-                "params": params,
-            }
-            
-            await self._websocket.send(json.dumps(msg))
-            _LOGGER.debug("Sent command: %s", msg)
-            return True
-            
-        except Exception as err:
-            _LOGGER.error("Failed to send command: %s", err)
+
+        msg = {
+            "method": WS_METHOD_SET,
+            "params": params,
+        }
+        if not await self._connection.async_send(json.dumps(msg)):
             return False
+        _LOGGER.debug("Sent command: %s", msg)
+        return True
+
+    async def async_send_command(self, params: dict[str, Any]) -> float:
+        """Send a command and wait until the printer's telemetry reflects it.
+
+        Commands go through the outbound queue, so setpoints submitted close
+        together share one frame. Returns the latency in seconds from
+        submission to acknowledgement. Raises CommandError if the command
+        could not be sent and CommandTimeoutError if the telemetry did not
+        reflect it in time.
+        """
+        command = PendingCommand(next(self._command_ids), params, time.monotonic())
+        for param in params:
+            self.command_stats.setdefault(param, CommandStats()).sent += 1
+        self._async_supersede(command)
+        self._pending_commands[command.command_id] = command
+        self._async_show_optimistic(command)
+
+        try:
+            if not await self.command_queue.async_submit(params):
+                raise CommandError(f"Could not send command {params} to {self.host}")
+            _LOGGER.debug(
+                "Command %s sent to %s: %s", command.command_id, self.host, params
+            )
+
+            if not command.future.done() and command.is_satisfied(self._reported_data):
+                self._async_acknowledge(command)
+
+            return await asyncio.wait_for(command.future, command.timeout)
+        except asyncio.TimeoutError as err:
+            for param in params:
+                self.command_stats[param].timeouts += 1
+            raise CommandTimeoutError(
+                f"{self.host} did not apply {params} within {command.timeout} seconds"
+            ) from err
+        finally:
+            self._pending_commands.pop(command.command_id, None)
+            # Confirmed or not, show what the printer reports from now on
+            self._async_release_optimistic(command)
+
+    @property
+    def _reported_data(self) -> ChainMap:
+        """Return the data as last reported by the printer, without optimism."""
+        return ChainMap(self._reported, self.data or {})
+
+    @callback
+    def _async_show_optimistic(self, command: PendingCommand) -> None:
+        """Show the commanded values right away, before the printer confirms."""
+        if not self.data or not self.last_update_success:
+            return
+        optimistic = {}
+        for param, value in command.params.items():
+            if param not in OPTIMISTIC_VALUES:
+                continue
+            key, to_value = OPTIMISTIC_VALUES[param]
+            # Pausing or resuming only shows once a print is running
+            if key == "state" and self.data.state not in (
+                STATE_PRINTING,
+                STATE_PAUSED,
+            ):
+                continue
+            if key not in self._optimistic:
+                self._reported[key] = self.data.get(key)
+            self._optimistic[key] = command.command_id
+            optimistic[key] = to_value(value)
+        if optimistic:
+            self._async_publish(optimistic)
+
+    @callback
+    def _async_release_optimistic(self, command: PendingCommand) -> None:
+        """Replace a command's optimistic values with the reported ones.
+
+        After an acknowledgement this is the confirmed value; after a
+        timeout or failed send it rolls the entity back.
+        """
+        released = {
+            key: self._reported.pop(key)
+            for key, command_id in list(self._optimistic.items())
+            if command_id == command.command_id
+        }
+        if not released:
+            return
+        for key in released:
+            del self._optimistic[key]
+        self._async_publish(released)
+
+    @callback
+    def _async_set_aside_reported(self, updated_data: dict[str, Any]) -> dict[str, Any]:
+        """Record telemetry for optimistic keys instead of publishing it."""
+        held = self._optimistic.keys() & updated_data.keys()
+        if not held:
+            return updated_data
+        updated_data = dict(updated_data)
+        for key in held:
+            self._reported[key] = updated_data.pop(key)
+        return updated_data
+
+    @callback
+    def _async_resolve_commands(self) -> None:
+        """Acknowledge pending commands that the data now reflects."""
+        if not self._pending_commands:
+            return
+        reported = self._reported_data
+        for command in list(self._pending_commands.values()):
+            if command.is_satisfied(reported):
+                del self._pending_commands[command.command_id]
+                self._async_acknowledge(command)
+
+    @callback
+    def _async_supersede(self, command: PendingCommand) -> None:
+        """Resolve pending setpoint commands whose keys a newer command overrides.
+
+        A dragged slider submits every intermediate value; they are merged
+        into one frame and the printer only ever reports the last, so the
+        earlier submissions resolve when the newer one is submitted.
+        """
+        if not MERGEABLE_PARAMS.issuperset(command.params):
+            return
+        for pending in list(self._pending_commands.values()):
+            if command.params.keys() >= pending.params.keys():
+                del self._pending_commands[pending.command_id]
+                for param in pending.params:
+                    self.command_stats[param].superseded += 1
+                if not pending.future.done():
+                    pending.future.set_result(time.monotonic() - pending.sent_at)
+
+    @callback
+    def _async_acknowledge(self, command: PendingCommand) -> None:
+        """Resolve a command and record its latency."""
+        latency = time.monotonic() - command.sent_at
+        for param in command.params:
+            stats = self.command_stats[param]
+            stats.acknowledged += 1
+            stats.last_latency = latency
+            stats.total_latency += latency
+        if not command.future.done():
+            command.future.set_result(latency)
+        _LOGGER.debug(
+            "Command %s acknowledged by %s in %.0f ms",
+            command.command_id,
+            self.host,
+            latency * 1000,
+        )
+
+    async def async_http_get(self, path: str, port: int | None = None) -> tuple[int, bytes]:
+        """GET a path from the printer's web server through the shared session."""
+        url = f"http://{self.host}{f':{port}' if port else ''}{path}"
+        health = self._connection.health if self._connection else None
+        return await self.connections.async_http_get(url, HTTP_TIMEOUT, health)
+
+    async def async_http_post(
+        self,
+        path: str,
+        data: Any,
+        headers: dict[str, str],
+        timeout: "aiohttp.ClientTimeout",
+    ) -> tuple[int, bytes]:
+        """POST to a path of the printer's API through the shared session."""
+        health = self._connection.health if self._connection else None
+        return await self.connections.async_http_post(
+            f"{self.http_base}{path}", data, headers, timeout, health
+        )
 
     async def async_shutdown(self) -> None:
         """Shutdown WebSocket connection."""
-        self._running = False
+
+        if self._unsub_watchdog:
+            self._unsub_watchdog()
+            self._unsub_watchdog = None
+        if self._unsub_thermal:
+            self._unsub_thermal()
+            self._unsub_thermal = None
+        if self._cancel_resubscribe:
+            self._cancel_resubscribe()
+            self._cancel_resubscribe = None
+        if self._unsub_gcode_index:
+            self._unsub_gcode_index()
+            self._unsub_gcode_index = None
         
-        if self._websocket:
-            await self._websocket.close()
-            self._websocket = None
-            
-        if self._ws_task:
-            self._ws_task.cancel()
-            try:
-                await self._ws_task
-            except asyncio.CancelledError:
-                pass
-            self._ws_task = None
+        if self._connection:
+            await self.connections.async_remove_printer(self.ws_url)
+            self._connection = None
+
+        if self.timelapse:
+            await self.timelapse.async_stop()
+        if self.uploader:
+            await self.uploader.async_stop()
+        await self.camera_stream.async_stop()
+        self.command_queue.async_clear()
+        for command in self._pending_commands.values():
+            if not command.future.done():
+                command.future.set_exception(CommandError("Integration is shutting down"))
+        self._pending_commands.clear()
 
@@ -0,0 +1,276 @@
+"""Decoders for Creality and Moonraker WebSocket frames."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from .const import (
+    STATE_CANCELLED,
+    STATE_COMPLETE,
+    STATE_ERROR,
+    STATE_IDLE,
+    STATE_PAUSED,
+    STATE_PRINTING,
+)
+
+# Fields whose presence marks a frame as Creality format rather than Moonraker
+CREALITY_MARKER_FIELDS: frozenset[str] = frozenset(
+    {"nozzleTemp", "bedTemp0", "TotalLayer"}
+)
+
+DEVICE_STATES: dict[int, str] = {
+    0: STATE_IDLE,
+    1: STATE_PRINTING,
+    2: STATE_PAUSED,
+    3: STATE_COMPLETE,
+}
+
+# Source field -> (coordinator data key, converter, decimal places or None)
+CREALITY_FIELDS: dict[str, tuple[str, Callable[[Any], Any], int | None]] = {
+    "nozzleTemp": ("nozzle_temp", float, 1),
+    "bedTemp0": ("bed_temp", float, 1),
+    "targetNozzleTemp": ("nozzle_target", float, 1),
+    "targetBedTemp0": ("bed_target", float, 1),
+    "printProgress": ("progress", float, 1),
+    "printJobTime": ("print_duration", int, None),
+    "printLeftTime": ("print_time_remaining", int, None),
+    "printFileName": ("filename", lambda value: str(value).rpartition("/")[2], None),
+    "deviceState": ("state", lambda value: DEVICE_STATES.get(value, STATE_IDLE), None),
+    "state": ("state", lambda value: DEVICE_STATES.get(value, STATE_IDLE), None),
+    "realTimeSpeed": ("speed", float, 2),
+    "curFeedratePct": ("speed_factor", float, 0),
+    "layer": ("current_layer", int, None),
+    "TotalLayer": ("total_layers", int, None),
+    # Not read by the if-chain this table replaced, which left the fans and
+    # light at their defaults on Creality firmware
+    "modelFanPct": ("fan_speed", float, 0),
+    "auxiliaryFanPct": ("auxiliary_fan", float, 0),
+    "caseFanPct": ("case_fan", float, 0),
+    "lightSw": ("light_on", lambda value: bool(int(value)), None),
+}
+
+# Fields decoded outside the one-to-one table
+_POSITION_FIELD = "curPosition"
+_MAPPED_FIELDS: frozenset[str] = frozenset(CREALITY_FIELDS) | {_POSITION_FIELD}
+
+_MISSING = object()
+
+
+def _decode_position(value: str, out: dict[str, Any]) -> None:
+    """Decode a "X:1.00 Y:2.00 Z:3.00" position string in a single pass."""
+    x = y = z = 0.0
+    for token in value.split():
+        axis, _, number = token.partition(":")
+        if axis == "X":
+            x = float(number)
+        elif axis == "Y":
+            y = float(number)
+        elif axis == "Z":
+            z = float(number)
+    out["position_x"] = round(x, 2)
+    out["position_y"] = round(y, 2)
+    out["position_z"] = round(z, 2)
+
+
+def is_creality_frame(frame: dict[str, Any]) -> bool:
+    """Return True if a decoded JSON frame uses the Creality format."""
+    return any(field in frame for field in CREALITY_MARKER_FIELDS)
+
+
+class CrealityFrameDecoder:
+    """Decode Creality frames into coordinator data keys.
+
+    The printer repeats most fields unchanged from frame to frame, so the
+    raw value of each mapped field is remembered and only fields whose raw
+    value changed are converted and returned.
+    """
+
+    __slots__ = ("_last_raw",)
+
+    def __init__(self) -> None:
+        """Initialize the decoder."""
+        self._last_raw: dict[str, Any] = {}
+
+    def reset(self) -> None:
+        """Forget remembered raw values, so the next frame decodes in full."""
+        self._last_raw.clear()
+
+    def decode(self, frame: dict[str, Any]) -> dict[str, Any]:
+        """Decode the changed fields present in a frame."""
+        out: dict[str, Any] = {}
+        last_raw = self._last_raw
+        for field, value in frame.items():
+            if field not in _MAPPED_FIELDS or last_raw.get(field, _MISSING) == value:
+                continue
+            last_raw[field] = value
+
+            if field == _POSITION_FIELD:
+                _decode_position(value, out)
+                continue
+            key, convert, ndigits = CREALITY_FIELDS[field]
+            if ndigits is None:
+                out[key] = convert(value)
+            else:
+                out[key] = round(convert(value), ndigits)
+
+        # deviceState takes precedence over the older state field
+        if "state" in out and "deviceState" in frame:
+            out["state"] = DEVICE_STATES.get(frame["deviceState"], STATE_IDLE)
+        if (
+            "print_duration" in out or "print_time_remaining" in out
+        ) and "printJobTime" in frame and "printLeftTime" in frame:
+            out["total_duration"] = int(frame["printJobTime"]) + int(
+                frame["printLeftTime"]
+            )
+        return out
+
+
+# Moonraker print_stats states; Klipper's "standby" is idle
+MOONRAKER_STATES: dict[str, str] = {
+    "standby": STATE_IDLE,
+    "printing": STATE_PRINTING,
+    "paused": STATE_PAUSED,
+    "complete": STATE_COMPLETE,
+    "cancelled": STATE_CANCELLED,
+    "error": STATE_ERROR,
+}
+
+
+_FieldDecoder = Callable[[Any, dict[str, Any]], None]
+
+
+def _field(
+    key: str, convert: Callable[[Any], Any], ndigits: int | None = None
+) -> tuple[tuple[str, ...], _FieldDecoder]:
+    """Return a decoder writing one converted field to a coordinator data key."""
+    if ndigits is None:
+
+        def decode(value: Any, out: dict[str, Any]) -> None:
+            out[key] = convert(value)
+
+    else:
+
+        def decode(value: Any, out: dict[str, Any]) -> None:
+            out[key] = round(convert(value), ndigits)
+
+    return (key,), decode
+
+
+def _decode_toolhead_position(value: list[float], out: dict[str, Any]) -> None:
+    """Decode a toolhead [x, y, z, e] position."""
+    out["position_x"] = round(float(value[0]), 2)
+    out["position_y"] = round(float(value[1]), 2)
+    out["position_z"] = round(float(value[2]), 2)
+
+
+def _decode_print_info(value: dict[str, Any], out: dict[str, Any]) -> None:
+    """Decode the layer counts of print_stats.info, when the slicer set them."""
+    if value.get("current_layer") is not None:
+        out["current_layer"] = int(value["current_layer"])
+    if value.get("total_layer") is not None:
+        out["total_layers"] = int(value["total_layer"])
+
+
+# Moonraker object -> field -> (coordinator data keys it holds, decoder)
+MOONRAKER_FIELDS: dict[str, dict[str, tuple[tuple[str, ...], _FieldDecoder]]] = {
+    "print_stats": {
+        "state": _field("state", lambda value: MOONRAKER_STATES.get(value, STATE_IDLE)),
+        "filename": _field("filename", lambda value: str(value).rpartition("/")[2]),
+        "print_duration": _field("print_duration", int),
+        "total_duration": _field("total_duration", int),
+        "info": (("current_layer", "total_layers"), _decode_print_info),
+    },
+    "virtual_sdcard": {
+        "progress": _field("progress", lambda value: float(value) * 100, 1),
+    },
+    "extruder": {
+        "temperature": _field("nozzle_temp", float, 1),
+        "target": _field("nozzle_target", float, 1),
+    },
+    "heater_bed": {
+        "temperature": _field("bed_temp", float, 1),
+        "target": _field("bed_target", float, 1),
+    },
+    "toolhead": {
+        "position": (
+            ("position_x", "position_y", "position_z"),
+            _decode_toolhead_position,
+        ),
+    },
+    "gcode_move": {
+        "speed": _field("speed", lambda value: float(value) / 60, 2),
+        "speed_factor": _field("speed_factor", lambda value: float(value) * 100, 0),
+    },
+    "fan": {
+        "speed": _field("fan_speed", lambda value: float(value) * 100, 0),
+    },
+}
+
+
+def moonraker_subscription(keys: Iterable[str] | None = None) -> dict[str, list[str]]:
+    """Return the Moonraker objects and fields holding the given data keys.
+
+    None selects every field the decoder reads. Keys Moonraker does not
+    report are ignored.
+    """
+    wanted = None if keys is None else set(keys)
+    objects: dict[str, list[str]] = {}
+    for name, fields in MOONRAKER_FIELDS.items():
+        selected = [
+            field
+            for field, (field_keys, _) in fields.items()
+            if wanted is None or not wanted.isdisjoint(field_keys)
+        ]
+        if selected:
+            objects[name] = selected
+    return objects
+
+
+def _merge(cached: dict[str, Any], delta: dict[str, Any]) -> list[str]:
+    """Deep-merge a delta into cached in place; return the fields that changed."""
+    changed = []
+    for field, value in delta.items():
+        current = cached.get(field, _MISSING)
+        if isinstance(value, dict) and isinstance(current, dict):
+            if _merge(current, value):
+                changed.append(field)
+        elif current != value:
+            cached[field] = value
+            changed.append(field)
+    return changed
+
+
+class MoonrakerStatusDecoder:
+    """Decode Moonraker status updates into coordinator data keys.
+
+    notify_status_update only carries the fields that changed since the
+    last update, so the objects are cached and every delta is merged into
+    them. Only keys derived from fields that actually changed are decoded
+    and returned; keys whose source was never reported are left alone
+    instead of being reset to defaults.
+    """
+
+    __slots__ = ("_objects",)
+
+    def __init__(self) -> None:
+        """Initialize the decoder."""
+        self._objects: dict[str, dict[str, Any]] = {}
+
+    def reset(self) -> None:
+        """Forget the cached objects, before the full status of a subscription."""
+        self._objects.clear()
+
+    def decode(self, status: dict[str, Any]) -> dict[str, Any]:
+        """Merge a full or partial status and decode what changed."""
+        out: dict[str, Any] = {}
+        objects = self._objects
+        for name, delta in status.items():
+            decoders = MOONRAKER_FIELDS.get(name)
+            if decoders is None or not isinstance(delta, dict):
+                continue
+            cached = objects.setdefault(name, {})
+            for field in _merge(cached, delta):
+                decoder = decoders.get(field)
+                if decoder is not None and (value := cached[field]) is not None:
+                    decoder[1](value, out)
+        return out
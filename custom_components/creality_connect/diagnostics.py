@@ -0,0 +1,46 @@
+"""Diagnostics support for Creality Connect."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import CrealityK1MaxCoordinator
+from .thumbnails import async_get_thumbnail_cache
+
+TO_REDACT = {CONF_HOST, "url"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: CrealityK1MaxCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "data": coordinator.data.as_dict(),
+        "connection": async_redact_data(coordinator.connection_health, TO_REDACT),
+        "subscription": coordinator.subscription,
+        "eta": coordinator.eta.as_dict(),
+        "thermal": coordinator.thermal.as_dict(),
+        "commands": {
+            param: stats.as_dict() for param, stats in coordinator.command_stats.items()
+        },
+        "command_queue": {
+            "submitted": coordinator.command_queue.submitted,
+            "frames_sent": coordinator.command_queue.frames_sent,
+        },
+        "fleet": async_redact_data(
+            coordinator.connections.aggregate_health(), TO_REDACT
+        ),
+        "telemetry": coordinator.telemetry.as_dict(),
+        "thumbnails": async_get_thumbnail_cache(hass).as_dict(),
+        "gcode_index": coordinator.gcode_index.as_dict(),
+        "timelapse": coordinator.timelapse.as_dict() if coordinator.timelapse else None,
+        "uploads": coordinator.uploader.as_dict() if coordinator.uploader else None,
+    }
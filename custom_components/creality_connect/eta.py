@@ -0,0 +1,137 @@
+"""Online print time estimate for Creality Connect."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime, timezone
+import math
+import time
+from typing import Any
+
+from .const import ETA_TIME_CONSTANT, STATE_PAUSED, STATE_PRINTING
+
+# Data keys the estimator publishes, and the keys it derives them from
+ETA_KEYS: tuple[str, ...] = ("print_eta", "print_finish_time")
+ETA_INPUTS: frozenset[str] = frozenset(
+    {"state", "filename", "progress", "current_layer", "total_layers", "print_duration"}
+)
+
+
+def _fraction(data: Mapping[str, Any]) -> float:
+    """Return how much of the print is done, from 0 to 1.
+
+    Progress follows the file position and the layer count follows the
+    model; averaging them gives a finer grained signal than either, since
+    K1 firmware reports progress in whole percent.
+    """
+    fraction = (data.get("progress") or 0) / 100
+    total_layers = data.get("total_layers") or 0
+    if total_layers > 0:
+        layers = min(data.get("current_layer") or 0, total_layers) / total_layers
+        fraction = (fraction + layers) / 2
+    return min(max(fraction, 0.0), 1.0)
+
+
+class PrintEtaEstimator:
+    """Estimate the remaining print time from the live progress stream.
+
+    The pace of the print, in print seconds per whole print, is the ratio
+    of two exponentially decayed sums: print time elapsed and fraction
+    done between successive progress advances. Summing both sides rather
+    than averaging per-advance ratios keeps progress and layer steps
+    arriving unevenly from biasing it. The decay follows print time, so
+    the estimate does not depend on the frame rate. Between advances the
+    estimate counts down with the print duration. Each sample costs O(1)
+    and nothing is kept but a few floats.
+    """
+
+    __slots__ = (
+        "time_constant",
+        "_filename",
+        "_fraction",
+        "_duration",
+        "_elapsed_sum",
+        "_fraction_sum",
+        "_finish_minute",
+        "remaining",
+        "finish_time",
+    )
+
+    def __init__(self, time_constant: float = ETA_TIME_CONSTANT) -> None:
+        """Initialize."""
+        self.time_constant = time_constant
+        self._filename: str | None = None
+        self._fraction: float | None = None
+        self._duration = 0.0
+        self._elapsed_sum = 0.0
+        self._fraction_sum = 0.0
+        self._finish_minute: int | None = None
+        self.remaining: int | None = None
+        self.finish_time: datetime | None = None
+
+    def reset(self) -> None:
+        """Forget the current print."""
+        self._filename = None
+        self._fraction = None
+        self._duration = 0.0
+        self._elapsed_sum = 0.0
+        self._fraction_sum = 0.0
+        self._finish_minute = None
+        self.remaining = None
+        self.finish_time = None
+
+    def update(self, data: Mapping[str, Any], now: float | None = None) -> dict[str, Any]:
+        """Add a sample and return the print_eta and print_finish_time data keys."""
+        if data.get("state") not in (STATE_PRINTING, STATE_PAUSED):
+            if self._filename is not None:
+                self.reset()
+            return {"print_eta": None, "print_finish_time": None}
+
+        filename = data.get("filename") or ""
+        fraction = _fraction(data)
+        duration = float(data.get("print_duration") or 0)
+        if filename != self._filename or (
+            self._fraction is not None and fraction < self._fraction
+        ):
+            # A new print, or the same file started over
+            self.reset()
+            self._filename = filename
+
+        if self._fraction is None:
+            # Joining a print underway: its average pace so far is the prior
+            self._fraction, self._duration = fraction, duration
+            self._elapsed_sum, self._fraction_sum = duration, fraction
+        elif fraction > self._fraction and duration > self._duration:
+            elapsed = duration - self._duration
+            decay = math.exp(-elapsed / self.time_constant)
+            self._elapsed_sum = self._elapsed_sum * decay + elapsed
+            self._fraction_sum = self._fraction_sum * decay + fraction - self._fraction
+            self._fraction, self._duration = fraction, duration
+
+        if self._fraction_sum <= 0 or self._elapsed_sum <= 0:
+            self.remaining = None
+            self.finish_time = None
+            self._finish_minute = None
+        else:
+            pace = self._elapsed_sum / self._fraction_sum
+            self.remaining = round(
+                max(0.0, (1 - self._fraction) * pace - (duration - self._duration))
+            )
+            # Whole minutes, so the finish time only changes when it moves
+            if now is None:
+                now = time.time()
+            minute = round((now + self.remaining) / 60)
+            if minute != self._finish_minute:
+                self._finish_minute = minute
+                self.finish_time = datetime.fromtimestamp(minute * 60, timezone.utc)
+        return {"print_eta": self.remaining, "print_finish_time": self.finish_time}
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the estimator state for diagnostics."""
+        return {
+            "fraction": self._fraction,
+            "seconds_per_print": (
+                self._elapsed_sum / self._fraction_sum if self._fraction_sum else None
+            ),
+            "remaining": self.remaining,
+            "finish_time": self.finish_time.isoformat() if self.finish_time else None,
+        }
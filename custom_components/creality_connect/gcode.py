@@ -0,0 +1,393 @@
+"""G-code metadata index for Creality Connect."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import logging
+import mmap
+import os
+from pathlib import Path, PurePosixPath
+import re
+import time
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import (
+    DATA_GCODE_INDEX,
+    GCODE_FOOTER_BYTES,
+    GCODE_HEADER_BYTES,
+    GCODE_INDEX_SIZE,
+    GCODE_MAX_THUMBNAIL_BYTES,
+    GCODE_SUFFIXES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(rb"(\d+)\s*([dhms])", re.IGNORECASE)
+_DURATION_UNITS = {b"d": 86400, b"h": 3600, b"m": 60, b"s": 1}
+
+
+def _duration(value: bytes) -> int:
+    """Parse "1d 2h 3m 4s" (PrusaSlicer, OrcaSlicer) or plain seconds (Cura)."""
+    parts = _DURATION_PART.findall(value)
+    if parts:
+        return sum(int(amount) * _DURATION_UNITS[unit.lower()] for amount, unit in parts)
+    return round(float(value))
+
+
+def _total(value: bytes) -> float:
+    """Sum the per-extruder values of a comma separated list."""
+    return round(sum(float(part) for part in value.split(b",") if part.strip()), 2)
+
+
+def _meters(value: bytes) -> float:
+    """Parse Cura's "1.234m" filament length into millimetres."""
+    return round(_total(value.replace(b"m", b"")) * 1000, 2)
+
+
+def _text(value: bytes) -> str:
+    return value.decode("utf-8", errors="replace").strip()
+
+
+# Comment key -> (metadata field, parser); for a field reported under several
+# keys, the first key in this table that a file has wins
+_KEYS: dict[str, tuple[str, Callable[[bytes], Any]]] = {
+    "estimated printing time (normal mode)": ("estimated_time", _duration),
+    "total estimated time": ("estimated_time", _duration),
+    "time": ("estimated_time", _duration),
+    "filament used [mm]": ("filament_length", _total),
+    "filament used": ("filament_length", _meters),
+    "filament used [g]": ("filament_weight", _total),
+    "total layers count": ("layer_count", int),
+    "total layer number": ("layer_count", int),
+    "layer_count": ("layer_count", int),
+    "layer_height": ("layer_height", float),
+    "layer height": ("layer_height", float),
+    "max_z_height": ("object_height", float),
+    "maxz": ("object_height", float),
+    "filament_type": ("filament_type", _text),
+}
+
+# "; key = value" or ";key:value" at the start of a line or after another
+# value on it, as in "; model printing time: 1h; total estimated time: 1h 5m"
+_METADATA = re.compile(
+    rb"(?:^|;)[ \t]*("
+    + b"|".join(re.escape(key.encode()) for key in sorted(_KEYS, key=len, reverse=True))
+    + rb")[ \t]*[:=][ \t]*([^;\r\n]*)",
+    re.IGNORECASE | re.MULTILINE,
+)
+_SLICER = re.compile(
+    rb"^;[ \t]*generated (?:by|with)[ \t]+([^\r\n]+)", re.IGNORECASE | re.MULTILINE
+)
+_SLICER_DATE = re.compile(rb" (?:on|at) \d")
+_THUMBNAIL_BEGIN = re.compile(
+    rb"^;[ \t]*(thumbnail(?:_(PNG|JPG|QOI))?) begin (\d+)x(\d+) \d+[^\n]*\n", re.MULTILINE
+)
+
+
+@dataclass(frozen=True)
+class GcodeThumbnail:
+    """Where an embedded thumbnail's base64 text lies in a G-code file."""
+
+    width: int
+    height: int
+    format: str
+    offset: int
+    length: int
+
+
+@dataclass(frozen=True)
+class GcodeMetadata:
+    """Slicer metadata of one G-code file."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    slicer: str | None = None
+    estimated_time: int | None = None  # seconds
+    filament_length: float | None = None  # mm
+    filament_weight: float | None = None  # g
+    layer_count: int | None = None
+    layer_height: float | None = None  # mm
+    object_height: float | None = None  # mm
+    filament_type: str | None = None
+    thumbnails: tuple[GcodeThumbnail, ...] = ()
+
+    @property
+    def filename(self) -> str:
+        """Return the file's name without its directory."""
+        return os.path.basename(self.path)
+
+    @property
+    def preview(self) -> GcodeThumbnail | None:
+        """Return the largest PNG thumbnail."""
+        return max(
+            (thumbnail for thumbnail in self.thumbnails if thumbnail.format == "png"),
+            key=lambda thumbnail: thumbnail.width * thumbnail.height,
+            default=None,
+        )
+
+    def attributes(self) -> dict[str, Any]:
+        """Return the slicer metadata as entity attributes."""
+        return {
+            "slicer": self.slicer,
+            "estimated_time": self.estimated_time,
+            "filament_length": self.filament_length,
+            "filament_weight": self.filament_weight,
+            "layer_count": self.layer_count,
+            "layer_height": self.layer_height,
+            "object_height": self.object_height,
+            "filament_type": self.filament_type,
+            "thumbnails": [
+                f"{thumbnail.width}x{thumbnail.height} {thumbnail.format}"
+                for thumbnail in self.thumbnails
+            ],
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metadata for events and diagnostics."""
+        return {"path": self.path, "size": self.size, **self.attributes()}
+
+
+def _find_thumbnails(mm: mmap.mmap) -> tuple[list[GcodeThumbnail], int]:
+    """Return the embedded thumbnails and where the header window ends.
+
+    Thumbnails come first in the file and can outgrow the header window,
+    so the window is extended past each one found.
+    """
+    thumbnails: list[GcodeThumbnail] = []
+    end = min(len(mm), GCODE_HEADER_BYTES)
+    position = 0
+    while match := _THUMBNAIL_BEGIN.search(mm, position, end):
+        body = match.end()
+        close = mm.find(match[1] + b" end", body, body + GCODE_MAX_THUMBNAIL_BYTES)
+        if close < 0:
+            break
+        # Back to the ";" that starts the end marker's line
+        close = mm.rfind(b";", body, close)
+        thumbnails.append(
+            GcodeThumbnail(
+                int(match[3]),
+                int(match[4]),
+                (match[2] or b"png").decode().lower(),
+                body,
+                close - body,
+            )
+        )
+        position = close
+        end = min(len(mm), max(end, close + GCODE_HEADER_BYTES))
+    return thumbnails, end
+
+
+def parse_gcode(path: Path) -> GcodeMetadata:
+    """Read a G-code file's slicer metadata; runs in the executor.
+
+    The file is memory mapped and only its two ends are scanned, with
+    regular expressions running straight over the mapping, so the pages in
+    between are never read from disk however large the file is.
+    """
+    with path.open("rb") as file:
+        stat = os.fstat(file.fileno())
+        if not stat.st_size:
+            return GcodeMetadata(str(path), 0, stat.st_mtime_ns)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            thumbnails, header_end = _find_thumbnails(mm)
+            found: dict[str, bytes] = {}
+            for start, end in (
+                (0, header_end),
+                (max(header_end, size - GCODE_FOOTER_BYTES), size),
+            ):
+                for match in _METADATA.finditer(mm, start, end):
+                    found.setdefault(match[1].lower().decode(), match[2].strip())
+            slicer = _SLICER.search(mm, 0, min(size, GCODE_HEADER_BYTES))
+            generator = slicer[1] if slicer else None
+
+    values: dict[str, Any] = {}
+    for key, (field, parse) in _KEYS.items():
+        if field in values or key not in found:
+            continue
+        try:
+            values[field] = parse(found[key])
+        except ValueError:
+            continue
+    if generator:
+        values["slicer"] = _text(_SLICER_DATE.split(generator)[0])
+    return GcodeMetadata(
+        str(path), stat.st_size, stat.st_mtime_ns, thumbnails=tuple(thumbnails), **values
+    )
+
+
+def read_thumbnail(metadata: GcodeMetadata, thumbnail: GcodeThumbnail) -> bytes:
+    """Decode an embedded thumbnail; runs in the executor."""
+    with open(metadata.path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        text = mm[thumbnail.offset : thumbnail.offset + thumbnail.length]
+    return base64.b64decode(text.translate(None, b"; \t\r\n"), validate=True)
+
+
+def _gcode_files(paths: Iterable[Path]) -> Iterable[Path]:
+    """Yield the given files and the G-code files under the given directories."""
+    for path in paths:
+        if not path.is_dir():
+            yield path
+            continue
+        for directory, _, filenames in os.walk(path):
+            for filename in sorted(filenames):
+                if filename.lower().endswith(GCODE_SUFFIXES):
+                    yield Path(directory, filename)
+
+
+def _index_files(
+    paths: list[Path], known: dict[str, tuple[int, int]]
+) -> tuple[list[GcodeMetadata | str], list[str]]:
+    """Parse the files that are new or changed; runs in the executor.
+
+    Returns parsed metadata, or the path of a file known to be unchanged,
+    for each file in order, and the errors of files that could not be read.
+    """
+    results: list[GcodeMetadata | str] = []
+    errors: list[str] = []
+    for path in _gcode_files(paths):
+        key = str(path)
+        try:
+            stat = path.stat()
+            if known.get(key) == (stat.st_size, stat.st_mtime_ns):
+                results.append(key)
+            else:
+                results.append(parse_gcode(path))
+        except (OSError, ValueError) as err:
+            errors.append(f"{path}: {err}")
+    return results, errors
+
+
+@callback
+def async_get_gcode_index(hass: HomeAssistant) -> GcodeIndex:
+    """Return the G-code index shared by every config entry."""
+    if DATA_GCODE_INDEX not in hass.data:
+        hass.data[DATA_GCODE_INDEX] = GcodeIndex(hass, GCODE_INDEX_SIZE)
+    return hass.data[DATA_GCODE_INDEX]
+
+
+class GcodeIndex:
+    """Slicer metadata of local G-code files, looked up by file name.
+
+    Entries are keyed by path and hold the size and modification time they
+    were parsed at, so indexing a directory again only parses the files
+    that are new or have changed. A printer reports the file it prints by
+    name, so each entry is also found by its file name; when two files
+    share one, the one indexed last wins. Thumbnails are decoded from the
+    file when asked for, and only their position is kept.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_entries: int) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, GcodeMetadata] = OrderedDict()
+        self._by_name: dict[str, GcodeMetadata] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._lock = asyncio.Lock()
+        self.parsed = 0
+        self.reused = 0
+        self.errors = 0
+        self.last_duration: float | None = None
+
+    async def async_index(self, paths: Iterable[Path]) -> list[GcodeMetadata]:
+        """Index files and directories; return the metadata of every file found."""
+        async with self._lock:
+            known = {
+                path: (entry.size, entry.mtime_ns) for path, entry in self._entries.items()
+            }
+            start = time.monotonic()
+            results, errors = await self.hass.async_add_executor_job(
+                _index_files, list(paths), known
+            )
+            self.last_duration = time.monotonic() - start
+
+            indexed: list[GcodeMetadata] = []
+            for result in results:
+                if isinstance(result, str):
+                    metadata = self._entries[result]
+                    self.reused += 1
+                else:
+                    metadata = result
+                    self.parsed += 1
+                self._entries[metadata.path] = metadata
+                self._entries.move_to_end(metadata.path)
+                self._by_name[metadata.filename] = metadata
+                indexed.append(metadata)
+        for error in errors:
+            _LOGGER.warning("Cannot index %s", error)
+        self.errors += len(errors)
+        self._async_evict()
+        if indexed:
+            for listener in list(self._listeners):
+                listener()
+        return indexed
+
+    @callback
+    def async_alias(self, filename: str, metadata: GcodeMetadata) -> None:
+        """Find metadata under another file name, such as an upload's."""
+        self._by_name[filename] = metadata
+        for listener in list(self._listeners):
+            listener()
+
+    @callback
+    def async_lookup(self, filename: str) -> GcodeMetadata | None:
+        """Return the metadata of a file the printer reports by name or path."""
+        if not filename:
+            return None
+        return self._by_name.get(PurePosixPath(filename).name)
+
+    @callback
+    def async_add_listener(self, listener: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call listener whenever files are indexed; return a remover."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the listener; calling this again does nothing."""
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove_listener
+
+    async def async_thumbnail(self, metadata: GcodeMetadata) -> bytes | None:
+        """Return the largest PNG thumbnail embedded in a file, if any."""
+        if (thumbnail := metadata.preview) is None:
+            return None
+        try:
+            return await self.hass.async_add_executor_job(
+                read_thumbnail, metadata, thumbnail
+            )
+        except (OSError, ValueError, binascii.Error) as err:
+            _LOGGER.debug("Cannot read the thumbnail of %s: %s", metadata.path, err)
+            return None
+
+    @callback
+    def _async_evict(self) -> None:
+        """Drop the least recently indexed files beyond max_entries."""
+        while len(self._entries) > self.max_entries:
+            _, metadata = self._entries.popitem(last=False)
+            if self._by_name.get(metadata.filename) is metadata:
+                del self._by_name[metadata.filename]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return index statistics for diagnostics."""
+        return {
+            "files": len(self._entries),
+            "names": len(self._by_name),
+            "parsed": self.parsed,
+            "reused": self.reused,
+            "errors": self.errors,
+            "last_duration": (
+                round(self.last_duration, 3) if self.last_duration is not None else None
+            ),
+        }
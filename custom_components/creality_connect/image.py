@@ -3,19 +3,32 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime
+import json
 import logging
+from urllib.parse import quote
 
 import aiohttp
 
 from homeassistant.components.image import ImageEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-
-from .const import DOMAIN
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_IMAGE_MAX_WIDTH,
+    CONF_IMAGE_QUALITY,
+    DEFAULT_IMAGE_MAX_WIDTH,
+    DEFAULT_IMAGE_QUALITY,
+    DOMAIN,
+    ENDPOINT_FILES_METADATA,
+    THUMBNAIL_PATH,
+)
 from .coordinator import CrealityK1MaxCoordinator
+from .gcode import GcodeMetadata
+from .imaging import ScaledImageCache
+from .thumbnails import async_get_thumbnail_cache
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,11 +41,25 @@ async def async_setup_entry(
     """Set up Creality K1 Max image based on a config entry."""
     coordinator: CrealityK1MaxCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    async_add_entities([CrealityK1MaxPrintPreview(coordinator, entry)])
+    scaler = ScaledImageCache(
+        hass,
+        entry.options.get(CONF_IMAGE_MAX_WIDTH, DEFAULT_IMAGE_MAX_WIDTH),
+        entry.options.get(CONF_IMAGE_QUALITY, DEFAULT_IMAGE_QUALITY),
+    )
+
+    async_add_entities([CrealityK1MaxPrintPreview(coordinator, entry, scaler)])
 
 
 class CrealityK1MaxPrintPreview(CoordinatorEntity, ImageEntity):
-    """Representation of the current print preview thumbnail."""
+    """Representation of the current print preview thumbnail.
+
+    Thumbnails are fetched once per version of a print file, named by its
+    size and modification time, and kept in the shared disk cache, so repeat
+    prints are served without asking the printer. image_last_updated is
+    when the entity loaded different bytes, so it only changes, and the
+    frontend only re-downloads, when they do. The original is cached; it is
+    scaled to the configured width when served.
+    """
 
     _attr_has_entity_name = True
     _attr_name = "Print Preview"
@@ -41,10 +68,13 @@ class CrealityK1MaxPrintPreview(CoordinatorEntity, ImageEntity):
         self,
         coordinator: CrealityK1MaxCoordinator,
         entry: ConfigEntry,
+        scaler: ScaledImageCache,
     ) -> None:
         """Initialize the image entity."""
         super().__init__(coordinator)
-        CoordinatorEntity.__init__(self, coordinator)
+        CoordinatorEntity.__init__(
+            self, coordinator, context=("filename", "gcode_metadata")
+        )
         ImageEntity.__init__(self, coordinator.hass)
         
         self._attr_unique_id = f"{entry.entry_id}_print_preview"
@@ -55,53 +85,143 @@ class CrealityK1MaxPrintPreview(CoordinatorEntity, ImageEntity):
             "model": "K1 Max",
         }
         
+        self._entry_id = entry.entry_id
+        self._cache = async_get_thumbnail_cache(coordinator.hass)
+        self._scaler = scaler
         self._last_image: bytes | None = None
-        self._last_filename: str = ""
+        # File name and indexed metadata of the loaded and loading thumbnails
+        self._image_file: tuple[str, GcodeMetadata | None] | None = None
+        self._load_task: asyncio.Task | None = None
+        self._loading_file: tuple[str, GcodeMetadata | None] | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Load the thumbnail of the file already loaded on the printer."""
+        await super().async_added_to_hass()
+        self._async_load_thumbnail()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Load the new file's thumbnail when the file or its metadata changes."""
+        self._async_load_thumbnail()
+        super()._handle_coordinator_update()
 
     async def async_image(self) -> bytes | None:
-        """Return bytes of image."""
-        # Only fetch if a file is currently printing or loaded
-        filename = self.coordinator.data.get("filename", "")
-        
+        """Return bytes of image, scaled down to the configured width."""
+        # A failed fetch is retried when the frontend next asks for the image
+        if task := self._async_load_thumbnail():
+            await asyncio.shield(task)
+        if self._last_image is None:
+            return None
+        return await self._scaler.async_scale(self._last_image)
+
+    @callback
+    def _async_current_file(self) -> tuple[str, GcodeMetadata | None] | None:
+        """Return the current file and its indexed metadata, if a file is loaded."""
+        filename = self.coordinator.data.filename
         if not filename:
-            return self._last_image
-            
-        # Check if we need to fetch a new thumbnail
-        if filename != self._last_filename:
-            self._last_filename = filename
-            await self._fetch_thumbnail()
-            
-        return self._last_image
-
-    async def _fetch_thumbnail(self) -> None:
+            return None
+        return filename, self.coordinator.gcode_index.async_lookup(filename)
+
+    @callback
+    def _async_load_thumbnail(self) -> asyncio.Task | None:
+        """Start loading the current file's thumbnail unless it is loaded."""
+        current = self._async_current_file()
+        if current is None or current == self._image_file:
+            return None
+        if current != self._loading_file or self._load_task is None:
+            self._loading_file = current
+            self._load_task = self.hass.async_create_task(self._async_load(*current))
+        return self._load_task
+
+    async def _async_load(self, filename: str, metadata: GcodeMetadata | None) -> None:
+        """Load a thumbnail from the cache, or from the file or printer on a miss."""
+        try:
+            key = await self._async_cache_key(filename, metadata)
+            if key and (cached := await self._cache.async_get(key)):
+                image = cached[0]
+            else:
+                # A thumbnail embedded in the indexed file saves asking the printer
+                image = None
+                if metadata is not None:
+                    image = await self.coordinator.gcode_index.async_thumbnail(metadata)
+                if image is None:
+                    image = await self._fetch_thumbnail()
+                    if image is None or self._is_stale_fetch(filename, metadata, image):
+                        return
+                if key:
+                    await self._cache.async_put(key, image)
+        finally:
+            if self._loading_file == (filename, metadata):
+                self._load_task = None
+                self._loading_file = None
+
+        # The printer may have moved on to another file in the meantime
+        if (filename, metadata) != self._async_current_file():
+            return
+        self._image_file = (filename, metadata)
+        if image != self._last_image:
+            self._last_image = image
+            self._attr_image_last_updated = dt_util.utcnow()
+            self.async_write_ha_state()
+
+    def _is_stale_fetch(
+        self, filename: str, metadata: GcodeMetadata | None, image: bytes
+    ) -> bool:
+        """Return True if the printer's image may not be the file's preview.
+
+        The printer only serves the current file's preview, and replaces it
+        some time after the file changes. An image fetched while the file
+        changed, or still the last file's, is neither cached nor shown; the
+        next request for the image fetches it again.
+        """
+        if (filename, metadata) != self._async_current_file():
+            return True
+        return (
+            self._image_file is not None
+            and self._image_file[0] != filename
+            and image == self._last_image
+        )
+
+    async def _async_cache_key(
+        self, filename: str, metadata: GcodeMetadata | None
+    ) -> str | None:
+        """Return a cache key naming the file's content, None if it is unknown.
+
+        The key carries the file's size and modification time, so a file
+        sliced again under the same name is not served its old thumbnail.
+        """
+        if metadata is not None:
+            return f"{self._entry_id}/{filename}:{metadata.size}:{metadata.mtime_ns}"
+        try:
+            status, body = await self.coordinator.async_http_get(
+                f"{ENDPOINT_FILES_METADATA}?filename={quote(filename)}",
+                self.coordinator.port,
+            )
+            result = json.loads(body)["result"] if status == 200 else None
+            if result is None:
+                return None
+            return f"{self._entry_id}/{filename}:{result['size']}:{result['modified']}"
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError, TypeError):
+            return None
+
+    async def _fetch_thumbnail(self) -> bytes | None:
         """Fetch the print preview thumbnail."""
         # Creality stores current print image at this path
         # Add timestamp to bypass cache
-        thumbnail_url = (
-            f"http://{self.coordinator.host}/downloads/original/current_print_image.png"
-            f"?date={datetime.now().isoformat()}"
-        )
-        
+        thumbnail_path = f"{THUMBNAIL_PATH}?date={datetime.now().isoformat()}"
+
         try:
-            websession = async_get_clientsession(self.hass)
-            async with websession.get(
-                thumbnail_url, timeout=aiohttp.ClientTimeout(total=10)
-            ) as response:
-                if response.status == 200:
-                    self._last_image = await response.read()
-                    _LOGGER.debug("Fetched print preview thumbnail")
-                else:
-                    _LOGGER.warning(
-                        "Error getting print preview: HTTP %s", response.status
-                    )
-                    
+            status, body = await self.coordinator.async_http_get(thumbnail_path)
         except aiohttp.ClientError as err:
             _LOGGER.error("Error fetching print preview: %s", err)
+            return None
         except asyncio.TimeoutError:
             _LOGGER.error("Timeout fetching print preview")
+            return None
 
-    @property
-    def image_last_updated(self) -> datetime:
-        """Return the timestamp of the last image update."""
-        return datetime.now()
+        if status == 200:
+            _LOGGER.debug("Fetched print preview thumbnail")
+            return body
 
+        _LOGGER.warning("Error getting print preview: HTTP %s", status)
+        return None
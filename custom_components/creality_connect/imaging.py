@@ -0,0 +1,131 @@
+"""Resizing of camera frames and print previews for Creality Connect."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import io
+import logging
+
+from homeassistant.core import HomeAssistant
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow ships with Home Assistant, but may be missing
+    Image = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sizes kept per source image; dashboards ask for a handful of card widths
+SCALED_CACHE_SIZE = 4
+
+
+def target_size(
+    source: tuple[int, int],
+    width: int | None,
+    height: int | None,
+    max_width: int,
+) -> tuple[int, int] | None:
+    """Return the size to scale source to, or None to keep it as it is.
+
+    The aspect ratio is kept, images are never enlarged and never wider
+    than max_width.
+    """
+    source_width, source_height = source
+    scale = 1.0
+    if width:
+        scale = min(scale, width / source_width)
+    if height:
+        scale = min(scale, height / source_height)
+    if max_width:
+        scale = min(scale, max_width / source_width)
+    if scale >= 1.0:
+        return None
+    return max(1, round(source_width * scale)), max(1, round(source_height * scale))
+
+
+def scale_image(
+    data: bytes,
+    width: int | None,
+    height: int | None,
+    max_width: int,
+    quality: int,
+) -> bytes:
+    """Scale an image down and re-encode it in its own format.
+
+    Runs in the executor. Returns data unchanged if it already fits, or if
+    Pillow is unavailable or cannot read it.
+    """
+    if Image is None:
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if (size := target_size(image.size, width, height, max_width)) is None:
+                return data
+            image_format = image.format
+            if image_format == "JPEG":
+                # Let the decoder skip to the nearest power-of-two scale first
+                image.draft("RGB", size)
+            scaled = image.resize(size, Image.Resampling.BILINEAR)
+    except (OSError, ValueError) as err:
+        _LOGGER.debug("Serving image unscaled: %s", err)
+        return data
+
+    output = io.BytesIO()
+    if image_format == "JPEG":
+        scaled.save(output, "JPEG", quality=quality)
+    else:
+        scaled.save(output, image_format, optimize=True)
+    return output.getvalue()
+
+
+class ScaledImageCache:
+    """Scaled copies of the latest source image, one per requested size.
+
+    Camera cards on a dashboard poll the same frame at the same width, so
+    each source image is scaled at most once per size. Scaling runs in the
+    executor, and concurrent requests for a size share one job. The cache
+    is dropped as soon as a different source image is scaled.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_width: int, quality: int) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.max_width = max_width
+        self.quality = quality
+        self._source: bytes | None = None
+        self._scaled: OrderedDict[
+            tuple[int | None, int | None], asyncio.Future[bytes]
+        ] = OrderedDict()
+        self.scaled = 0
+        self.hits = 0
+
+    async def async_scale(
+        self, data: bytes, width: int | None = None, height: int | None = None
+    ) -> bytes:
+        """Return data scaled to fit width and height and the size limit."""
+        if Image is None or not (width or height or self.max_width):
+            return data
+        if data is not self._source:
+            self._source = data
+            self._scaled.clear()
+
+        key = (width, height)
+        if (future := self._scaled.get(key)) is not None:
+            self._scaled.move_to_end(key)
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        future = self.hass.async_add_executor_job(
+            scale_image, data, width, height, self.max_width, self.quality
+        )
+        self._scaled[key] = future
+        if len(self._scaled) > SCALED_CACHE_SIZE:
+            self._scaled.popitem(last=False)
+        self.scaled += 1
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            # Don't cache the failure; the next request tries again
+            if self._scaled.get(key) is future:
+                del self._scaled[key]
+            raise
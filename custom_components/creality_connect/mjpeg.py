@@ -0,0 +1,192 @@
+"""Shared MJPEG stream for Creality printer webcams."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+import contextlib
+from datetime import datetime
+import logging
+import re
+import time
+
+import aiohttp
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
+
+from .connection import CrealityConnectionManager
+from .const import (
+    MJPEG_CLIENT_BUFFER,
+    MJPEG_IDLE_TIMEOUT,
+    MJPEG_READ_TIMEOUT,
+    MJPEG_RETRY_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_CONTENT_LENGTH = re.compile(rb"content-length:\s*(\d+)", re.IGNORECASE)
+_HEADER_END = b"\r\n\r\n"
+_JPEG_START = b"\xff\xd8"
+_JPEG_END = b"\xff\xd9"
+_MAX_HEADER_SIZE = 4096
+
+
+class MjpegParser:
+    """Incremental parser for multipart/x-mixed-replace JPEG bodies.
+
+    Parts are sized by their Content-Length header, which mjpg-streamer
+    sends. Parts without one are cut at the JPEG end-of-image marker.
+    """
+
+    __slots__ = ("_buffer", "_length")
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._buffer = bytearray()
+        self._length: int | None = None
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Add received bytes and return the frames they completed."""
+        buffer = self._buffer
+        buffer += data
+        frames = []
+        while True:
+            if self._length is None:
+                end = buffer.find(_HEADER_END)
+                if end < 0:
+                    if len(buffer) > _MAX_HEADER_SIZE:
+                        del buffer[:-len(_HEADER_END)]
+                    break
+                match = _CONTENT_LENGTH.search(buffer, 0, end)
+                self._length = int(match.group(1)) if match else -1
+                del buffer[: end + len(_HEADER_END)]
+
+            if self._length >= 0:
+                if len(buffer) < self._length:
+                    break
+                frame = bytes(buffer[: self._length])
+                del buffer[: self._length]
+            else:
+                end = buffer.find(_JPEG_END)
+                if end < 0:
+                    break
+                frame = bytes(buffer[: end + len(_JPEG_END)])
+                del buffer[: end + len(_JPEG_END)]
+
+            self._length = None
+            if frame.startswith(_JPEG_START):
+                frames.append(frame)
+        return frames
+
+
+class MjpegStreamHub:
+    """Hold one upstream MJPEG connection and fan its frames out to viewers.
+
+    The K1's mjpg-streamer falls over beyond two or three clients, so all
+    viewers share one upstream connection. Each viewer gets a small queue;
+    when a slow viewer's queue is full its oldest frame is dropped, so it
+    always catches up to the live image instead of falling behind. The
+    upstream connection is opened by the first viewer and closed once the
+    last one has been gone for MJPEG_IDLE_TIMEOUT seconds.
+    """
+
+    def __init__(self, connections: CrealityConnectionManager, url: str) -> None:
+        """Initialize."""
+        self._connections = connections
+        self.url = url
+        self._clients: set[asyncio.Queue[bytes]] = set()
+        self._task: asyncio.Task | None = None
+        self._cancel_idle: CALLBACK_TYPE | None = None
+        self.latest_frame: bytes | None = None
+        self.latest_frame_time: float | None = None
+        self.frames = 0
+        self.dropped_frames = 0
+        self.upstream_connects = 0
+
+    @property
+    def viewers(self) -> int:
+        """Return the number of subscribed viewers."""
+        return len(self._clients)
+
+    @property
+    def streaming(self) -> bool:
+        """Return True while the upstream connection is being kept open."""
+        return self._task is not None and not self._task.done()
+
+    @contextlib.asynccontextmanager
+    async def async_subscribe(self) -> AsyncIterator[asyncio.Queue[bytes]]:
+        """Subscribe a viewer and yield its frame queue."""
+        queue: asyncio.Queue[bytes] = asyncio.Queue(MJPEG_CLIENT_BUFFER)
+        self._clients.add(queue)
+        if self._cancel_idle:
+            self._cancel_idle()
+            self._cancel_idle = None
+        if not self.streaming:
+            self._task = asyncio.create_task(self._async_run())
+        try:
+            yield queue
+        finally:
+            self._clients.discard(queue)
+            if not self._clients and self._cancel_idle is None:
+                self._cancel_idle = async_call_later(
+                    self._connections.hass, MJPEG_IDLE_TIMEOUT, self._async_stop_if_idle
+                )
+
+    @callback
+    def _async_stop_if_idle(self, _now: datetime) -> None:
+        """Close the upstream connection if nobody is watching."""
+        self._cancel_idle = None
+        if not self._clients and self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def async_stop(self) -> None:
+        """Close the upstream connection."""
+        if self._cancel_idle:
+            self._cancel_idle()
+            self._cancel_idle = None
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    @callback
+    def _async_publish(self, frame: bytes) -> None:
+        """Hand a frame to every viewer, dropping stale frames for slow ones."""
+        self.latest_frame = frame
+        self.latest_frame_time = time.monotonic()
+        self.frames += 1
+        for queue in self._clients:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped_frames += 1
+            queue.put_nowait(frame)
+
+    async def _async_run(self) -> None:
+        """Read the upstream stream, reconnecting while anyone is watching."""
+        timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=MJPEG_READ_TIMEOUT, sock_read=MJPEG_READ_TIMEOUT
+        )
+        while self._clients:
+            try:
+                async with self._connections.session.get(
+                    self.url, timeout=timeout
+                ) as response:
+                    if response.status != 200:
+                        _LOGGER.warning(
+                            "Error opening camera stream: HTTP %s", response.status
+                        )
+                    else:
+                        self.upstream_connects += 1
+                        parser = MjpegParser()
+                        async for chunk in response.content.iter_any():
+                            for frame in parser.feed(chunk):
+                                self._async_publish(frame)
+            except aiohttp.ClientError as err:
+                _LOGGER.warning("Camera stream interrupted: %s", err)
+            except asyncio.TimeoutError:
+                _LOGGER.warning("Timeout reading camera stream")
+
+            if self._clients:
+                await asyncio.sleep(MJPEG_RETRY_DELAY)
@@ -21,13 +21,15 @@ from .const import (
     PARAM_NOZZLE_TARGET_TEMP,
 )
 from .coordinator import CrealityK1MaxCoordinator
+from .state import PrinterState
 
 
 @dataclass
 class CrealityK1MaxNumberEntityDescription(NumberEntityDescription):
     """Describes Creality K1 Max number entity."""
 
-    value_fn: Callable[[dict[str, Any]], float] | None = None
+    value_fn: Callable[[PrinterState], float] | None = None
+    data_keys: tuple[str, ...] | None = None
     set_value_params: Callable[[float], dict[str, Any]] | None = None
 
 
@@ -42,7 +44,8 @@ NUMBERS: tuple[CrealityK1MaxNumberEntityDescription, ...] = (
         native_max_value=100,
         native_step=1,
         mode=NumberMode.SLIDER,
-        value_fn=lambda data: data.get("fan_speed", 0),
+        value_fn=lambda data: data.fan_speed,
+        data_keys=("fan_speed",),
         set_value_params=lambda value: {PARAM_FAN: int(value)},
     ),
     CrealityK1MaxNumberEntityDescription(
@@ -54,7 +57,8 @@ NUMBERS: tuple[CrealityK1MaxNumberEntityDescription, ...] = (
         native_max_value=100,
         native_step=1,
         mode=NumberMode.SLIDER,
-        value_fn=lambda data: data.get("auxiliary_fan", 0),
+        value_fn=lambda data: data.auxiliary_fan,
+        data_keys=("auxiliary_fan",),
         set_value_params=lambda value: {PARAM_AUXILIARY_FAN: int(value)},
     ),
     CrealityK1MaxNumberEntityDescription(
@@ -66,7 +70,8 @@ NUMBERS: tuple[CrealityK1MaxNumberEntityDescription, ...] = (
         native_max_value=100,
         native_step=1,
         mode=NumberMode.SLIDER,
-        value_fn=lambda data: data.get("case_fan", 0),
+        value_fn=lambda data: data.case_fan,
+        data_keys=("case_fan",),
         set_value_params=lambda value: {PARAM_CASE_FAN: int(value)},
     ),
     # Temperature setpoints
@@ -79,7 +84,8 @@ NUMBERS: tuple[CrealityK1MaxNumberEntityDescription, ...] = (
         native_max_value=300,
         native_step=1,
         mode=NumberMode.BOX,
-        value_fn=lambda data: data.get("nozzle_target", 0),
+        value_fn=lambda data: data.nozzle_target,
+        data_keys=("nozzle_target",),
         set_value_params=lambda value: {PARAM_NOZZLE_TARGET_TEMP: int(value)},
     ),
     CrealityK1MaxNumberEntityDescription(
@@ -91,7 +97,8 @@ NUMBERS: tuple[CrealityK1MaxNumberEntityDescription, ...] = (
         native_max_value=120,
         native_step=1,
         mode=NumberMode.BOX,
-        value_fn=lambda data: data.get("bed_target", 0),
+        value_fn=lambda data: data.bed_target,
+        data_keys=("bed_target",),
         set_value_params=lambda value: {PARAM_BED_TARGET_TEMP: int(value)},
     ),
 )
@@ -123,7 +130,7 @@ class CrealityK1MaxNumber(CoordinatorEntity, NumberEntity):
         entry: ConfigEntry,
     ) -> None:
         """Initialize the number entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=description.data_keys)
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
         self._attr_device_info = {
@@ -144,6 +151,5 @@ class CrealityK1MaxNumber(CoordinatorEntity, NumberEntity):
         """Set new value."""
         if self.entity_description.set_value_params:
             params = self.entity_description.set_value_params(value)
-            await self.coordinator.send_command(params)
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_send_command(params)
 
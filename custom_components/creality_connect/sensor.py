@@ -14,6 +14,7 @@ from homeassistant.components.sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     PERCENTAGE,
+    EntityCategory,
     UnitOfLength,
     UnitOfSpeed,
     UnitOfTemperature,
@@ -24,7 +25,8 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
-from .coordinator import CrealityK1MaxCoordinator
+from .coordinator import CrealityK1MaxCoordinator, UpdateContext
+from .state import PrinterState
 
 
 def _format_time(seconds: float | int | None) -> str:
@@ -44,7 +46,14 @@ def _format_time(seconds: float | int | None) -> str:
 class CrealityK1MaxSensorEntityDescription(SensorEntityDescription):
     """Describes Creality K1 Max sensor entity."""
 
-    value_fn: Callable[[dict[str, Any]], Any] | None = None
+    value_fn: Callable[[PrinterState], Any] | None = None
+    attributes_fn: Callable[[PrinterState], dict[str, Any] | None] | None = None
+    data_keys: tuple[str, ...] | None = None
+    # Write state at most once per interval (seconds), latest value wins
+    min_update_interval: float = 0
+    # Skip writes for changes within an absolute or relative (fraction) band
+    deadband: float = 0
+    relative_deadband: float = 0
 
 
 SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
@@ -54,7 +63,10 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        value_fn=lambda data: data.get("nozzle_temp"),
+        value_fn=lambda data: data.nozzle_temp,
+        data_keys=("nozzle_temp",),
+        min_update_interval=5,
+        deadband=0.5,
         icon="mdi:printer-3d-nozzle",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -63,7 +75,8 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        value_fn=lambda data: data.get("nozzle_target"),
+        value_fn=lambda data: data.nozzle_target,
+        data_keys=("nozzle_target",),
         icon="mdi:printer-3d-nozzle",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -72,7 +85,10 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        value_fn=lambda data: data.get("bed_temp"),
+        value_fn=lambda data: data.bed_temp,
+        data_keys=("bed_temp",),
+        min_update_interval=5,
+        deadband=0.5,
         icon="mdi:radiator",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -81,7 +97,8 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        value_fn=lambda data: data.get("bed_target"),
+        value_fn=lambda data: data.bed_target,
+        data_keys=("bed_target",),
         icon="mdi:radiator",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -89,7 +106,8 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         name="Print Progress",
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
-        value_fn=lambda data: round(data.get("progress", 0), 1),
+        value_fn=lambda data: round(data.progress, 1),
+        data_keys=("progress",),
         icon="mdi:progress-clock",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -98,13 +116,15 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.DURATION,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTime.SECONDS,
-        value_fn=lambda data: round(data.get("print_duration", 0)),
+        value_fn=lambda data: round(data.print_duration),
+        data_keys=("print_duration",),
         icon="mdi:timer",
     ),
     CrealityK1MaxSensorEntityDescription(
         key="print_duration_formatted",
         name="Print Duration (Formatted)",
-        value_fn=lambda data: _format_time(data.get("print_duration", 0)),
+        value_fn=lambda data: _format_time(data.print_duration),
+        data_keys=("print_duration",),
         icon="mdi:timer",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -113,25 +133,52 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.DURATION,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTime.SECONDS,
-        value_fn=lambda data: round(data.get("print_time_remaining", 0)),
+        value_fn=lambda data: round(data.print_time_remaining),
+        data_keys=("print_time_remaining",),
         icon="mdi:timer-sand",
     ),
     CrealityK1MaxSensorEntityDescription(
         key="print_time_remaining_formatted",
         name="Print Time Remaining (Formatted)",
-        value_fn=lambda data: _format_time(data.get("print_time_remaining", 0)),
+        value_fn=lambda data: _format_time(data.print_time_remaining),
+        data_keys=("print_time_remaining",),
         icon="mdi:timer-sand",
     ),
+    CrealityK1MaxSensorEntityDescription(
+        key="print_eta",
+        name="Estimated Time Remaining",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        value_fn=lambda data: data.print_eta,
+        data_keys=("print_eta",),
+        min_update_interval=10,
+        icon="mdi:timer-sand-complete",
+    ),
+    CrealityK1MaxSensorEntityDescription(
+        key="print_finish_time",
+        name="Estimated Finish Time",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda data: data.print_finish_time,
+        data_keys=("print_finish_time",),
+        icon="mdi:clock-end",
+    ),
     CrealityK1MaxSensorEntityDescription(
         key="filename",
         name="Current File",
-        value_fn=lambda data: data.get("filename", "None"),
+        value_fn=lambda data: data.filename,
+        # Slicer metadata, once the file has been indexed
+        attributes_fn=lambda data: (
+            data.gcode_metadata.attributes() if data.gcode_metadata else None
+        ),
+        data_keys=("filename", "gcode_metadata"),
         icon="mdi:file",
     ),
     CrealityK1MaxSensorEntityDescription(
         key="state",
         name="Printer State",
-        value_fn=lambda data: data.get("state", "idle"),
+        value_fn=lambda data: data.state,
+        data_keys=("state",),
         icon="mdi:printer-3d",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -140,7 +187,10 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.DISTANCE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfLength.MILLIMETERS,
-        value_fn=lambda data: data.get("position_x"),
+        value_fn=lambda data: data.position_x,
+        data_keys=("position_x",),
+        min_update_interval=10,
+        deadband=1,
         icon="mdi:axis-x-arrow",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -149,7 +199,10 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.DISTANCE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfLength.MILLIMETERS,
-        value_fn=lambda data: data.get("position_y"),
+        value_fn=lambda data: data.position_y,
+        data_keys=("position_y",),
+        min_update_interval=10,
+        deadband=1,
         icon="mdi:axis-y-arrow",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -158,7 +211,10 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.DISTANCE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfLength.MILLIMETERS,
-        value_fn=lambda data: data.get("position_z"),
+        value_fn=lambda data: data.position_z,
+        data_keys=("position_z",),
+        min_update_interval=10,
+        deadband=0.1,
         icon="mdi:axis-z-arrow",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -167,7 +223,10 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.SPEED,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=f"{UnitOfLength.MILLIMETERS}/s",
-        value_fn=lambda data: data.get("speed"),
+        value_fn=lambda data: data.speed,
+        data_keys=("speed",),
+        min_update_interval=5,
+        relative_deadband=0.05,
         icon="mdi:speedometer",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -175,7 +234,8 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         name="Speed Factor",
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
-        value_fn=lambda data: data.get("speed_factor"),
+        value_fn=lambda data: data.speed_factor,
+        data_keys=("speed_factor",),
         icon="mdi:speedometer",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -183,7 +243,8 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         name="Model Fan Speed",
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
-        value_fn=lambda data: round(data.get("fan_speed", 0)),
+        value_fn=lambda data: round(data.fan_speed),
+        data_keys=("fan_speed",),
         icon="mdi:fan",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -191,7 +252,8 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         name="Auxiliary Fan Speed",
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
-        value_fn=lambda data: round(data.get("auxiliary_fan", 0)),
+        value_fn=lambda data: round(data.auxiliary_fan),
+        data_keys=("auxiliary_fan",),
         icon="mdi:fan",
     ),
     CrealityK1MaxSensorEntityDescription(
@@ -199,23 +261,38 @@ SENSORS: tuple[CrealityK1MaxSensorEntityDescription, ...] = (
         name="Case Fan Speed",
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
-        value_fn=lambda data: round(data.get("case_fan", 0)),
+        value_fn=lambda data: round(data.case_fan),
+        data_keys=("case_fan",),
         icon="mdi:fan",
     ),
     CrealityK1MaxSensorEntityDescription(
         key="current_layer",
         name="Current Layer",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: data.get("current_layer", 0),
+        value_fn=lambda data: data.current_layer,
+        data_keys=("current_layer",),
         icon="mdi:layers",
     ),
     CrealityK1MaxSensorEntityDescription(
         key="total_layers",
         name="Total Layers",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: data.get("total_layers", 0),
+        value_fn=lambda data: data.total_layers,
+        data_keys=("total_layers",),
         icon="mdi:layers",
     ),
+    CrealityK1MaxSensorEntityDescription(
+        key="link_latency",
+        name="Link Latency",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: data.link_latency,
+        data_keys=("link_latency",),
+        relative_deadband=0.25,
+        icon="mdi:lan-pending",
+    ),
 )
 
 
@@ -245,7 +322,15 @@ class CrealityK1MaxSensor(CoordinatorEntity, SensorEntity):
         entry: ConfigEntry,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        context = None
+        if description.data_keys is not None:
+            context = UpdateContext(
+                description.data_keys,
+                min_interval=description.min_update_interval,
+                deadband=description.deadband,
+                relative_deadband=description.relative_deadband,
+            )
+        super().__init__(coordinator, context=context)
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
         self._attr_device_info = {
@@ -262,3 +347,9 @@ class CrealityK1MaxSensor(CoordinatorEntity, SensorEntity):
             return self.entity_description.value_fn(self.coordinator.data)
         return None
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the state attributes."""
+        if self.entity_description.attributes_fn:
+            return self.entity_description.attributes_fn(self.coordinator.data)
+        return None
@@ -0,0 +1,278 @@
+"""Services for Creality Connect."""
+from __future__ import annotations
+
+import csv
+from datetime import datetime
+import json
+import logging
+import math
+from pathlib import Path
+import re
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    EVENT_GCODE_INDEXED,
+    EVENT_TELEMETRY_EXPORTED,
+    GCODE_EVENT_MAX_FILES,
+    SERVICE_CANCEL_UPLOAD,
+    SERVICE_EXPORT_TELEMETRY,
+    SERVICE_INDEX_GCODE,
+    SERVICE_UPLOAD_FILE,
+    TELEMETRY_EXPORT_DIR,
+    TELEMETRY_KEYS,
+)
+from .gcode import async_get_gcode_index
+from .telemetry import downsample
+from .upload import FileUploader
+
+if TYPE_CHECKING:
+    from .coordinator import CrealityK1MaxCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_RESOLUTION = "resolution"
+ATTR_KEYS = "keys"
+ATTR_FORMAT = "format"
+ATTR_PATH = "path"
+ATTR_FILENAME = "filename"
+ATTR_START_PRINT = "start_print"
+
+FORMAT_CSV = "csv"
+FORMAT_JSON = "json"
+
+# A file name the printer will store in its gcodes directory
+_REMOTE_FILENAME = re.compile(r'[^/\\"\r\n]+')
+
+EXPORT_TELEMETRY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_RESOLUTION): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(ATTR_KEYS): vol.All(cv.ensure_list, [vol.In(TELEMETRY_KEYS)]),
+        vol.Optional(ATTR_FORMAT, default=FORMAT_CSV): vol.In([FORMAT_CSV, FORMAT_JSON]),
+    }
+)
+
+
+UPLOAD_FILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_FILENAME): cv.string,
+        vol.Optional(ATTR_START_PRINT, default=False): cv.boolean,
+    }
+)
+
+CANCEL_UPLOAD_SCHEMA = vol.Schema({vol.Required(ATTR_ENTRY_ID): cv.string})
+
+INDEX_GCODE_SCHEMA = vol.Schema({vol.Required(ATTR_PATH): cv.string})
+
+
+def _get_coordinator(hass: HomeAssistant, entry_id: str) -> CrealityK1MaxCoordinator:
+    """Return the coordinator of a loaded config entry."""
+    if (coordinator := hass.data.get(DOMAIN, {}).get(entry_id)) is None:
+        raise HomeAssistantError(f"No loaded Creality printer with entry ID {entry_id}")
+    return coordinator
+
+
+def _get_uploader(hass: HomeAssistant, entry_id: str) -> FileUploader:
+    """Return the file uploader of a loaded config entry."""
+    if (uploader := _get_coordinator(hass, entry_id).uploader) is None:
+        raise HomeAssistantError(f"Printer {entry_id} is not ready for uploads")
+    return uploader
+
+
+def _allowed_path(hass: HomeAssistant, value: str) -> Path:
+    """Return a service path, relative to the config directory, if it may be read."""
+    path = Path(value)
+    if not path.is_absolute():
+        path = Path(hass.config.path(str(path)))
+    if not hass.config.is_allowed_path(str(path)):
+        raise HomeAssistantError(
+            f"{path} is not in a directory listed in allowlist_external_dirs"
+        )
+    return path
+
+
+def _timestamp(value: datetime | None, default: float) -> float:
+    """Return a service datetime as epoch seconds, naive meaning local time."""
+    return dt_util.as_utc(value).timestamp() if value else default
+
+
+def _write_export(
+    path: Path,
+    export_format: str,
+    times: list[float],
+    columns: dict[str, list[float]],
+    step: int,
+) -> None:
+    """Write exported samples as CSV or JSON; runs in the executor."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    stamps = [dt_util.utc_from_timestamp(when).isoformat() for when in times]
+
+    def cell(value: float) -> float | None:
+        return None if math.isnan(value) else round(value, 3)
+
+    with path.open("w", newline="", encoding="utf-8") as file:
+        if export_format == FORMAT_CSV:
+            writer = csv.writer(file)
+            writer.writerow(["time", *columns])
+            for index, stamp in enumerate(stamps):
+                writer.writerow(
+                    [stamp, *(cell(column[index]) for column in columns.values())]
+                )
+            return
+        json.dump(
+            {
+                "resolution": step,
+                "time": stamps,
+                **{
+                    key: [cell(value) for value in column]
+                    for key, column in columns.items()
+                },
+            },
+            file,
+        )
+
+
+async def _async_export_telemetry(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Export a window of a printer's telemetry history to a file."""
+    entry_id = call.data[ATTR_ENTRY_ID]
+    history = _get_coordinator(hass, entry_id).telemetry
+    now = dt_util.utcnow().timestamp()
+    start = _timestamp(call.data.get(ATTR_START), 0.0)
+    end = _timestamp(call.data.get(ATTR_END), now)
+    resolution = call.data.get(ATTR_RESOLUTION)
+    export_format = call.data[ATTR_FORMAT]
+
+    # Copy the window on the event loop; everything else runs in the executor
+    step, times, columns = history.window(
+        start, end, resolution, call.data.get(ATTR_KEYS)
+    )
+    if not times:
+        raise HomeAssistantError("No telemetry recorded in the requested window")
+
+    first = dt_util.utc_from_timestamp(times[0])
+    path = Path(
+        hass.config.path(
+            TELEMETRY_EXPORT_DIR, f"{entry_id}_{first:%Y%m%d-%H%M%S}.{export_format}"
+        )
+    )
+
+    def export() -> int:
+        if resolution and resolution > step:
+            out_times, out_columns = downsample(times, columns, resolution)
+        else:
+            out_times, out_columns = list(times), columns
+        _write_export(
+            path, export_format, out_times, out_columns, max(resolution or 0, step)
+        )
+        return len(out_times)
+
+    rows = await hass.async_add_executor_job(export)
+    _LOGGER.info("Exported %s telemetry samples to %s", rows, path)
+    hass.bus.async_fire(
+        EVENT_TELEMETRY_EXPORTED,
+        {ATTR_ENTRY_ID: entry_id, "path": str(path), "rows": rows},
+    )
+
+
+async def _async_upload_file(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Start streaming a local file to a printer."""
+    uploader = _get_uploader(hass, call.data[ATTR_ENTRY_ID])
+    path = _allowed_path(hass, call.data[ATTR_PATH])
+    filename = call.data.get(ATTR_FILENAME) or path.name
+    if not _REMOTE_FILENAME.fullmatch(filename):
+        raise HomeAssistantError(f"{filename!r} cannot be used as a file name on the printer")
+
+    def file_size() -> int | None:
+        return path.stat().st_size if path.is_file() else None
+
+    if (size := await hass.async_add_executor_job(file_size)) is None:
+        raise HomeAssistantError(f"{path} is not a file")
+    uploader.async_start(path, filename, size, call.data[ATTR_START_PRINT])
+    _LOGGER.info(
+        "Uploading %s (%s bytes) to %s as %s",
+        path,
+        size,
+        uploader.coordinator.host,
+        filename,
+    )
+
+
+async def _async_cancel_upload(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Cancel a printer's running upload."""
+    if not _get_uploader(hass, call.data[ATTR_ENTRY_ID]).async_cancel():
+        raise HomeAssistantError("No upload is running")
+
+
+async def _async_index_gcode(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Index the slicer metadata of a G-code file or directory."""
+    path = _allowed_path(hass, call.data[ATTR_PATH])
+    if not await hass.async_add_executor_job(path.exists):
+        raise HomeAssistantError(f"{path} does not exist")
+    index = async_get_gcode_index(hass)
+    parsed = index.parsed
+    indexed = await index.async_index([path])
+    _LOGGER.info(
+        "Indexed %s G-code files under %s (%s parsed) in %.2f s",
+        len(indexed),
+        path,
+        index.parsed - parsed,
+        index.last_duration,
+    )
+    hass.bus.async_fire(
+        EVENT_GCODE_INDEXED,
+        {
+            "path": str(path),
+            "files": len(indexed),
+            "parsed": index.parsed - parsed,
+            "metadata": [
+                metadata.as_dict() for metadata in indexed[:GCODE_EVENT_MAX_FILES]
+            ],
+        },
+    )
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def async_export_telemetry(call: ServiceCall) -> None:
+        await _async_export_telemetry(hass, call)
+
+    async def async_upload_file(call: ServiceCall) -> None:
+        await _async_upload_file(hass, call)
+
+    async def async_cancel_upload(call: ServiceCall) -> None:
+        await _async_cancel_upload(hass, call)
+
+    async def async_index_gcode(call: ServiceCall) -> None:
+        await _async_index_gcode(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_TELEMETRY,
+        async_export_telemetry,
+        schema=EXPORT_TELEMETRY_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_UPLOAD_FILE, async_upload_file, schema=UPLOAD_FILE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_CANCEL_UPLOAD, async_cancel_upload, schema=CANCEL_UPLOAD_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_INDEX_GCODE, async_index_gcode, schema=INDEX_GCODE_SCHEMA
+    )
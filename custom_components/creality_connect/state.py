@@ -0,0 +1,112 @@
+"""Printer state model for Creality Connect."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from .const import STATE_IDLE
+
+# Field -> value before the printer has reported it
+FIELDS: dict[str, Any] = {
+    "state": STATE_IDLE,
+    "filename": "",
+    "print_duration": 0,
+    "print_time_remaining": 0,
+    "total_duration": 0,
+    "progress": 0,
+    "nozzle_temp": 0,
+    "nozzle_target": 0,
+    "bed_temp": 0,
+    "bed_target": 0,
+    "position_x": 0,
+    "position_y": 0,
+    "position_z": 0,
+    "speed": 0,
+    "speed_factor": 100,
+    "fan_speed": 0,
+    "auxiliary_fan": 0,
+    "case_fan": 0,
+    "current_layer": 0,
+    "total_layers": 0,
+    "light_on": False,
+    "link_latency": None,
+    "print_eta": None,
+    "print_finish_time": None,
+    "thermal_anomalies": (),
+    "gcode_metadata": None,
+}
+
+_INDEX: dict[str, int] = {field: index for index, field in enumerate(FIELDS)}
+
+
+class PrinterState(Mapping[str, Any]):
+    """Latest telemetry of one printer, updated in place.
+
+    A coordinator keeps a single instance for its whole life, so applying a
+    frame allocates nothing beyond the list of changed keys. Entities read
+    fields as attributes (state.nozzle_temp); the read-only Mapping
+    interface serves code that works with keys, such as listener contexts,
+    command acknowledgement and diagnostics.
+
+    Each field has a version that is bumped whenever its value changes, and
+    version counts the updates that changed anything, so a consumer can
+    tell whether a field changed since it last looked without keeping a
+    copy of the value.
+    """
+
+    __slots__ = (*FIELDS, "versions", "version")
+
+    def __init__(self) -> None:
+        """Initialize every field to its default."""
+        for field, default in FIELDS.items():
+            setattr(self, field, default)
+        self.versions = array("Q", bytes(8 * len(FIELDS)))
+        self.version = 0
+
+    def __getitem__(self, key: str) -> Any:
+        """Return a field by key."""
+        if key not in _INDEX:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        """Return True if key is a field."""
+        return key in _INDEX
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the field names."""
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        """Return the number of fields."""
+        return len(FIELDS)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field by key, or default if there is no such field."""
+        return getattr(self, key) if key in _INDEX else default
+
+    def version_of(self, key: str) -> int:
+        """Return how many times a field has changed."""
+        return self.versions[_INDEX[key]]
+
+    def update(self, values: Mapping[str, Any]) -> list[str]:
+        """Apply values in place and return the keys whose value changed.
+
+        Keys that are not fields are ignored.
+        """
+        changed = []
+        for key, value in values.items():
+            if key in _INDEX and getattr(self, key) != value:
+                setattr(self, key, value)
+                changed.append(key)
+        if changed:
+            versions = self.versions
+            for key in changed:
+                versions[_INDEX[key]] += 1
+            self.version += 1
+        return changed
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a copy of the fields as a dict."""
+        return {field: getattr(self, field) for field in FIELDS}
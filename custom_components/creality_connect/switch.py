@@ -17,13 +17,15 @@ from .const import (
     PARAM_PAUSE,
 )
 from .coordinator import CrealityK1MaxCoordinator
+from .state import PrinterState
 
 
 @dataclass
 class CrealityK1MaxSwitchEntityDescription(SwitchEntityDescription):
     """Describes Creality K1 Max switch entity."""
 
-    value_fn: Callable[[dict[str, Any]], bool] | None = None
+    value_fn: Callable[[PrinterState], bool] | None = None
+    data_keys: tuple[str, ...] | None = None
     turn_on_params: Callable[[], dict[str, Any]] | None = None
     turn_off_params: Callable[[], dict[str, Any]] | None = None
 
@@ -33,7 +35,8 @@ SWITCHES: tuple[CrealityK1MaxSwitchEntityDescription, ...] = (
         key="led_light",
         name="LED Light",
         icon="mdi:lightbulb",
-        value_fn=lambda data: data.get("light_on", False),
+        value_fn=lambda data: data.light_on,
+        data_keys=("light_on",),
         turn_on_params=lambda: {PARAM_LIGHT_SW: 1},
         turn_off_params=lambda: {PARAM_LIGHT_SW: 0},
     ),
@@ -41,7 +44,8 @@ SWITCHES: tuple[CrealityK1MaxSwitchEntityDescription, ...] = (
         key="pause_resume",
         name="Pause/Resume Print",
         icon="mdi:pause",
-        value_fn=lambda data: data.get("state") == "paused",
+        value_fn=lambda data: data.state == "paused",
+        data_keys=("state",),
         turn_on_params=lambda: {PARAM_PAUSE: 1},  # Pause
         turn_off_params=lambda: {PARAM_PAUSE: 0},  # Resume
     ),
@@ -74,7 +78,7 @@ class CrealityK1MaxSwitch(CoordinatorEntity, SwitchEntity):
         entry: ConfigEntry,
     ) -> None:
         """Initialize the switch."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=description.data_keys)
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
         self._attr_device_info = {
@@ -95,13 +99,11 @@ class CrealityK1MaxSwitch(CoordinatorEntity, SwitchEntity):
         """Turn the switch on."""
         if self.entity_description.turn_on_params:
             params = self.entity_description.turn_on_params()
-            await self.coordinator.send_command(params)
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_send_command(params)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
         if self.entity_description.turn_off_params:
             params = self.entity_description.turn_off_params()
-            await self.coordinator.send_command(params)
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_send_command(params)
 
@@ -0,0 +1,241 @@
+"""Fixed-memory telemetry history for Creality Connect."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Mapping, Sequence
+import math
+import time
+from typing import Any
+
+from .const import TELEMETRY_KEYS, TELEMETRY_TIERS
+
+_NAN = math.nan
+
+
+class _Ring:
+    """Samples at one resolution in preallocated typed arrays.
+
+    Times are float64 epoch seconds; values are float32, NaN where a key
+    had no value. The oldest sample is overwritten once the ring is full.
+    """
+
+    __slots__ = ("step", "capacity", "times", "columns", "start", "count")
+
+    def __init__(self, step: int, capacity: int, width: int) -> None:
+        """Initialize."""
+        self.step = step
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.columns = [array("f", bytes(4 * capacity)) for _ in range(width)]
+        self.start = 0
+        self.count = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by the arrays."""
+        return self.capacity * (8 + 4 * len(self.columns))
+
+    @property
+    def oldest(self) -> float | None:
+        """Return the time of the oldest sample."""
+        return self.times[self.start] if self.count else None
+
+    def append(self, when: float, row: Sequence[float]) -> None:
+        """Add a sample, overwriting the oldest one if full."""
+        if self.count < self.capacity:
+            index = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            index = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.times[index] = when
+        for column, value in zip(self.columns, row):
+            column[index] = value
+
+    def _ordered(self, values: array) -> array:
+        """Return a copy of a column, oldest sample first."""
+        if self.count < self.capacity:
+            return values[: self.count]
+        return values[self.start :] + values[: self.start]
+
+    def window(
+        self, start: float, end: float, columns: Iterable[int]
+    ) -> tuple[array, list[array]]:
+        """Return copies of the times and columns between start and end."""
+        times = self._ordered(self.times)
+        first = bisect_left(times, start)
+        last = bisect_right(times, end)
+        return times[first:last], [
+            self._ordered(self.columns[column])[first:last] for column in columns
+        ]
+
+
+class _Accumulator:
+    """Per-bucket sums feeding the mean of a coarser ring."""
+
+    __slots__ = ("ring", "bucket", "sums", "counts")
+
+    def __init__(self, ring: _Ring) -> None:
+        """Initialize."""
+        self.ring = ring
+        self.bucket: int | None = None
+        width = len(ring.columns)
+        self.sums = [0.0] * width
+        self.counts = [0] * width
+
+    def add(self, when: float, row: Sequence[float]) -> tuple[float, list[float]] | None:
+        """Add a sample; return the mean of the previous bucket once it closes."""
+        bucket = int(when // self.ring.step)
+        flushed = None
+        if bucket != self.bucket:
+            if self.bucket is not None:
+                flushed = (
+                    float(self.bucket * self.ring.step),
+                    [
+                        total / count if count else _NAN
+                        for total, count in zip(self.sums, self.counts)
+                    ],
+                )
+                self.ring.append(*flushed)
+            self.bucket = bucket
+            self.sums = [0.0] * len(self.sums)
+            self.counts = [0] * len(self.counts)
+        for index, value in enumerate(row):
+            if value == value:  # not NaN
+                self.sums[index] += value
+                self.counts[index] += 1
+        return flushed
+
+
+class TelemetryHistory:
+    """Recent numeric telemetry of one printer, in fixed memory.
+
+    The finest ring holds point samples taken at most once per its step
+    from the pushed telemetry. Each coarser ring holds the means of the
+    samples of the ring before it, so the history reaches back days while
+    its memory is allocated once, up front.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str] = TELEMETRY_KEYS,
+        tiers: Sequence[tuple[int, int]] = TELEMETRY_TIERS,
+    ) -> None:
+        """Initialize."""
+        self.keys = tuple(keys)
+        self.rings = [_Ring(step, capacity, len(self.keys)) for step, capacity in tiers]
+        self._accumulators = [_Accumulator(ring) for ring in self.rings[1:]]
+        # Monotonic time the next sample is due, and wall time of the last
+        self._next_sample = 0.0
+        self._last_time = 0.0
+        self.samples = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by all rings."""
+        return sum(ring.nbytes for ring in self.rings)
+
+    def record(
+        self,
+        data: Mapping[str, Any],
+        now: float | None = None,
+        monotonic: float | None = None,
+    ) -> None:
+        """Sample data if the finest ring's step has passed since the last sample.
+
+        Sampling is paced by the monotonic clock, so a wall clock stepped
+        back does not stop it. Samples are stamped with the wall time, but
+        never earlier than the last one, so the rings stay in time order.
+        """
+        if monotonic is None:
+            monotonic = time.monotonic()
+        if monotonic < self._next_sample:
+            return
+        finest = self.rings[0]
+        self._next_sample = (monotonic // finest.step + 1) * finest.step
+        if now is None:
+            now = time.time()
+        now = self._last_time = max(now, self._last_time)
+        row = []
+        for key in self.keys:
+            value = data.get(key)
+            row.append(_NAN if value is None else float(value))
+        finest.append(now, row)
+        self.samples += 1
+
+        sample: tuple[float, list[float]] | None = (now, row)
+        for accumulator in self._accumulators:
+            if sample is None:
+                break
+            sample = accumulator.add(*sample)
+
+    def ring_for(self, start: float, resolution: float | None = None) -> _Ring:
+        """Return the finest ring reaching back to start, at resolution or finer."""
+        candidates = [
+            ring for ring in self.rings if not resolution or ring.step <= resolution
+        ] or self.rings[:1]
+        for ring in candidates:
+            if ring.oldest is not None and ring.oldest <= start:
+                return ring
+        # Nothing reaches back that far; use the one holding the oldest data
+        return min(
+            (ring for ring in self.rings if ring.count),
+            key=lambda ring: ring.oldest,
+            default=self.rings[0],
+        )
+
+    def window(
+        self,
+        start: float,
+        end: float,
+        resolution: float | None = None,
+        keys: Sequence[str] | None = None,
+    ) -> tuple[int, array, dict[str, array]]:
+        """Return the step, times and columns of samples between start and end.
+
+        Only copies are returned, so the result can be downsampled and
+        formatted off the event loop while recording carries on.
+        """
+        keys = tuple(keys or self.keys)
+        ring = self.ring_for(start, resolution)
+        times, columns = ring.window(start, end, (self.keys.index(key) for key in keys))
+        return ring.step, times, dict(zip(keys, columns))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return history statistics for diagnostics."""
+        return {
+            "samples": self.samples,
+            "bytes": self.nbytes,
+            "tiers": [
+                {
+                    "step": ring.step,
+                    "samples": ring.count,
+                    "capacity": ring.capacity,
+                    "oldest": ring.oldest,
+                }
+                for ring in self.rings
+            ],
+        }
+
+
+def downsample(
+    times: Sequence[float],
+    columns: Mapping[str, Sequence[float]],
+    resolution: float,
+) -> tuple[list[float], dict[str, list[float]]]:
+    """Average samples into resolution second buckets, ignoring NaN."""
+    out_times: list[float] = []
+    out_columns: dict[str, list[float]] = {key: [] for key in columns}
+    first, total = 0, len(times)
+    while first < total:
+        bucket = times[first] // resolution
+        last = first + 1
+        while last < total and times[last] // resolution == bucket:
+            last += 1
+        out_times.append(bucket * resolution)
+        for key, column in columns.items():
+            values = [value for value in column[first:last] if value == value]
+            out_columns[key].append(sum(values) / len(values) if values else _NAN)
+        first = last
+    return out_times, out_columns
@@ -0,0 +1,254 @@
+"""Streaming thermal anomaly detection for Creality Connect."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass
+import math
+from typing import Any
+
+from .const import (
+    ANOMALY_HEATING_FAILED,
+    ANOMALY_RUNAWAY,
+    ANOMALY_SENSOR_FAULT,
+    ANOMALY_UNSTABLE,
+    THERMAL_EWMA_TIME,
+    THERMAL_SAMPLE_INTERVAL,
+    THERMAL_SLOPE_WINDOW,
+)
+
+
+@dataclass(frozen=True)
+class HeaterLimits:
+    """What counts as abnormal for one heater."""
+
+    temperature_key: str
+    target_key: str
+    # Degrees from target that count as off target
+    band: float
+    # Readings outside min_reading..max_reading mean a thermistor fault
+    max_reading: float
+    # Degrees per second a working heater manages while far below target
+    heat_rate: float
+    # Seconds a deviation must last before it is reported
+    persist: float
+    min_reading: float = -5.0
+
+
+HEATERS: dict[str, HeaterLimits] = {
+    "nozzle": HeaterLimits(
+        "nozzle_temp",
+        "nozzle_target",
+        band=15,
+        max_reading=350,
+        heat_rate=0.5,
+        persist=20,
+    ),
+    "bed": HeaterLimits(
+        "bed_temp",
+        "bed_target",
+        band=10,
+        max_reading=150,
+        heat_rate=0.02,
+        persist=60,
+    ),
+}
+
+# A rise faster than this while above target is a runaway, not noise
+_RUNAWAY_RATE = 0.02  # degrees per second
+
+
+class HeaterMonitor:
+    """Streaming statistics and anomaly state of one heater.
+
+    Keeps an EWMA of the mean and variance of the deviation from target,
+    weighted by elapsed time and taken only while the heater is within its
+    band of target, so heating up does not read as instability. Samples are
+    taken every THERMAL_SAMPLE_INTERVAL seconds, whether or not the reading
+    changed, so persistence is measured in wall time. The slope is a
+    least-squares fit over the last THERMAL_SLOPE_WINDOW samples, held in a
+    fixed ring. Memory is constant and a sample costs O(1): the slope's
+    running sums are updated as samples enter and leave the ring.
+    """
+
+    __slots__ = (
+        "name",
+        "limits",
+        "mean",
+        "variance",
+        "_tracking",
+        "slope",
+        "_last_time",
+        "_last_temperature",
+        "_ring",
+        "_next",
+        "_count",
+        "_sum",
+        "_weighted_sum",
+        "_candidate",
+        "_candidate_since",
+        "anomaly",
+    )
+
+    def __init__(self, name: str, limits: HeaterLimits) -> None:
+        """Initialize."""
+        self.name = name
+        self.limits = limits
+        self.mean = 0.0
+        self.variance = 0.0
+        self._tracking = False
+        self.slope = 0.0
+        self._last_time: float | None = None
+        self._last_temperature = 0.0
+        self._ring = array("d", bytes(8 * THERMAL_SLOPE_WINDOW))
+        self._next = 0
+        self._count = 0
+        self._sum = 0.0
+        self._weighted_sum = 0.0
+        self._candidate: str | None = None
+        self._candidate_since = 0.0
+        self.anomaly: str | None = None
+
+    def _add_slot(self, temperature: float) -> None:
+        """Push a sample into the ring and update the slope.
+
+        With samples x = 0..n-1 oldest first, S = sum(y) and W = sum(x*y);
+        dropping the oldest shifts every x down by one, so W loses S and the
+        new sample enters at x = n-1.
+        """
+        ring, size = self._ring, THERMAL_SLOPE_WINDOW
+        if self._count < size:
+            self._weighted_sum += self._count * temperature
+            self._sum += temperature
+            self._count += 1
+        else:
+            oldest = ring[self._next]
+            self._weighted_sum += (size - 1) * temperature - (self._sum - oldest)
+            self._sum += temperature - oldest
+        ring[self._next] = temperature
+        self._next = (self._next + 1) % size
+        # Start over from the ring once per lap, so rounding cannot build up
+        if self._next == 0 and self._count == size:
+            self._sum = math.fsum(ring[self._next :]) + math.fsum(ring[: self._next])
+            self._weighted_sum = sum(
+                index * ring[(self._next + index) % size] for index in range(size)
+            )
+
+        n = self._count
+        if n > 1:
+            # sum((x - mean_x)^2) for x = 0..n-1
+            spread = n * (n * n - 1) / 12
+            self.slope = (
+                (self._weighted_sum - (n - 1) / 2 * self._sum)
+                / spread
+                / THERMAL_SAMPLE_INTERVAL
+            )
+
+    def _classify(self, temperature: float, target: float) -> str | None:
+        """Return the anomaly the current sample shows, if any."""
+        limits = self.limits
+        if not limits.min_reading <= temperature <= limits.max_reading:
+            return ANOMALY_SENSOR_FAULT
+        # The slope needs half a window of samples to be trusted
+        if self._count < THERMAL_SLOPE_WINDOW // 2:
+            return None
+        if temperature > target + limits.band and self.slope > _RUNAWAY_RATE:
+            return ANOMALY_RUNAWAY
+        if target > 0 and temperature < target - limits.band:
+            if self.slope < limits.heat_rate:
+                return ANOMALY_HEATING_FAILED
+            return None
+        if (
+            target > 0
+            and self._tracking
+            and math.sqrt(self.variance) > limits.band / 3
+        ):
+            return ANOMALY_UNSTABLE
+        return None
+
+    def update(self, temperature: float, target: float, now: float) -> bool:
+        """Add a sample; return True if the reported anomaly changed.
+
+        Called once every THERMAL_SAMPLE_INTERVAL seconds.
+        """
+        deviation = temperature - target
+        if abs(deviation) > self.limits.band:
+            self._tracking = False
+        elif not self._tracking:
+            # Back within band: start the statistics afresh
+            self._tracking = True
+            self.mean = deviation
+            self.variance = 0.0
+        elif self._last_time is not None:
+            # Time-weighted EWMA of the deviation from target
+            elapsed = max(now - self._last_time, 0.0)
+            weight = 1 - math.exp(-elapsed / THERMAL_EWMA_TIME)
+            difference = deviation - self.mean
+            increment = weight * difference
+            self.mean += increment
+            self.variance = (1 - weight) * (self.variance + difference * increment)
+
+        self._add_slot(temperature)
+        if self._last_time is None:
+            self._last_time = now
+            self._last_temperature = temperature
+            return False
+
+        candidate = self._classify(temperature, target)
+        self._last_time = now
+        self._last_temperature = temperature
+
+        if candidate != self._candidate:
+            self._candidate = candidate
+            self._candidate_since = now
+        # Faults are debounced by a few seconds; other anomalies, and the
+        # return to normal, must persist
+        persist = 2.0 if candidate == ANOMALY_SENSOR_FAULT else self.limits.persist
+        if candidate == self.anomaly or now - self._candidate_since < persist:
+            return False
+        self.anomaly = candidate
+        return True
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for diagnostics and events."""
+        return {
+            "heater": self.name,
+            "anomaly": self.anomaly,
+            "temperature": self._last_temperature,
+            "mean_deviation": round(self.mean, 2),
+            "deviation_stddev": round(math.sqrt(self.variance), 2),
+            "slope": round(self.slope, 3),
+        }
+
+
+class ThermalMonitor:
+    """Anomaly detection for every heater of a printer."""
+
+    __slots__ = ("heaters",)
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.heaters = [HeaterMonitor(name, limits) for name, limits in HEATERS.items()]
+
+    def update(self, data: Mapping[str, Any], now: float) -> list[HeaterMonitor]:
+        """Sample every heater and return those whose anomaly changed."""
+        changed = []
+        for heater in self.heaters:
+            temperature = data.get(heater.limits.temperature_key)
+            target = data.get(heater.limits.target_key)
+            if temperature is None or target is None:
+                continue
+            if heater.update(float(temperature), float(target), now):
+                changed.append(heater)
+        return changed
+
+    @property
+    def anomalies(self) -> tuple[str, ...]:
+        """Return the active anomalies as "<heater>_<anomaly>" strings."""
+        return tuple(
+            f"{heater.name}_{heater.anomaly}" for heater in self.heaters if heater.anomaly
+        )
+
+    def as_dict(self) -> list[dict[str, Any]]:
+        """Return the statistics of every heater."""
+        return [heater.as_dict() for heater in self.heaters]
@@ -0,0 +1,196 @@
+"""Disk cache for print preview thumbnails."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import logging
+import os
+from pathlib import Path
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_THUMBNAIL_CACHE,
+    DOMAIN,
+    THUMBNAIL_CACHE_DIR,
+    THUMBNAIL_CACHE_SIZE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.thumbnails"
+SAVE_DELAY = 10  # seconds
+
+
+@callback
+def async_get_thumbnail_cache(hass: HomeAssistant) -> ThumbnailCache:
+    """Return the thumbnail cache shared by every config entry."""
+    if DATA_THUMBNAIL_CACHE not in hass.data:
+        hass.data[DATA_THUMBNAIL_CACHE] = ThumbnailCache(
+            hass, Path(hass.config.path(THUMBNAIL_CACHE_DIR)), THUMBNAIL_CACHE_SIZE
+        )
+    return hass.data[DATA_THUMBNAIL_CACHE]
+
+
+@dataclass
+class CachedThumbnail:
+    """A cached thumbnail and when its content was first stored."""
+
+    digest: str
+    size: int
+    stored: float
+
+    @property
+    def filename(self) -> str:
+        """Return the name of the file holding the thumbnail."""
+        return f"{self.digest}.png"
+
+
+class ThumbnailCache:
+    """Content-addressed thumbnail store with LRU eviction by total size.
+
+    Thumbnails are written once per SHA-256 digest, so the same G-code
+    printed on several printers, or under several names, is stored once.
+    An index maps each key (entry and print filename) to its digest in
+    least recently used order and is persisted, so repeat prints after a
+    restart are served from disk without asking the printer.
+    """
+
+    def __init__(self, hass: HomeAssistant, directory: Path, max_size: int) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.directory = directory
+        self.max_size = max_size
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._index: OrderedDict[str, CachedThumbnail] = OrderedDict()
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def total_size(self) -> int:
+        """Return the bytes used by distinct cached thumbnails."""
+        return sum({entry.digest: entry.size for entry in self._index.values()}.values())
+
+    async def async_get(self, key: str) -> tuple[bytes, CachedThumbnail] | None:
+        """Return the thumbnail cached for key, marking it recently used."""
+        await self._async_load()
+        if (entry := self._index.get(key)) is None:
+            self.misses += 1
+            return None
+        try:
+            data = await self.hass.async_add_executor_job(
+                (self.directory / entry.filename).read_bytes
+            )
+        except OSError as err:
+            _LOGGER.debug("Dropping unreadable cached thumbnail for %s: %s", key, err)
+            del self._index[key]
+            self._async_schedule_save()
+            self.misses += 1
+            return None
+        self._index.move_to_end(key)
+        self._async_schedule_save()
+        self.hits += 1
+        return data, entry
+
+    async def async_put(self, key: str, data: bytes) -> CachedThumbnail:
+        """Store a thumbnail for key and return its cache entry."""
+        await self._async_load()
+        digest = hashlib.sha256(data).hexdigest()
+        entry = self._index.get(key)
+        if entry is None or entry.digest != digest:
+            # Keep the original timestamp when other keys already share the bytes
+            entry = next(
+                (cached for cached in self._index.values() if cached.digest == digest),
+                None,
+            ) or CachedThumbnail(digest, len(data), time.time())
+            await self.hass.async_add_executor_job(self._write, entry.filename, data)
+        self._index[key] = entry
+        self._index.move_to_end(key)
+        await self._async_evict()
+        self._async_schedule_save()
+        return entry
+
+    async def _async_evict(self) -> None:
+        """Drop least recently used keys until the cache fits max_size."""
+        removed: list[str] = []
+        while len(self._index) > 1 and self.total_size > self.max_size:
+            _key, entry = self._index.popitem(last=False)
+            if all(cached.digest != entry.digest for cached in self._index.values()):
+                removed.append(entry.filename)
+        if removed:
+            await self.hass.async_add_executor_job(self._remove, removed)
+
+    async def _async_load(self) -> None:
+        """Load the index once, dropping entries whose file is gone."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            stored = await self._store.async_load() or {}
+            present = await self.hass.async_add_executor_job(self._list_files)
+            for key, digest, size, stored_at in stored.get("entries", []):
+                if f"{digest}.png" in present:
+                    self._index[key] = CachedThumbnail(digest, size, stored_at)
+            orphans = present - {entry.filename for entry in self._index.values()}
+            if orphans:
+                await self.hass.async_add_executor_job(self._remove, list(orphans))
+            self._loaded = True
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Persist the index soon, batching bursts of changes."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the index in least recently used order."""
+        return {
+            "entries": [
+                [key, entry.digest, entry.size, entry.stored]
+                for key, entry in self._index.items()
+            ]
+        }
+
+    def _list_files(self) -> set[str]:
+        """Return the names of the cached files."""
+        if not self.directory.is_dir():
+            return set()
+        return set(os.listdir(self.directory))
+
+    def _write(self, filename: str, data: bytes) -> None:
+        """Write a thumbnail atomically, unless it is already on disk."""
+        path = self.directory / filename
+        if path.exists():
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".part")
+        partial.write_bytes(data)
+        partial.replace(path)
+
+    def _remove(self, filenames: list[str]) -> None:
+        """Delete evicted thumbnails."""
+        for filename in filenames:
+            try:
+                (self.directory / filename).unlink()
+            except FileNotFoundError:
+                pass
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return cache statistics for diagnostics."""
+        return {
+            "entries": len(self._index),
+            "files": len({entry.digest for entry in self._index.values()}),
+            "bytes": self.total_size,
+            "max_bytes": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
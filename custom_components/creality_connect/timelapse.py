@@ -0,0 +1,479 @@
+"""Timelapse capture for Creality Connect."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterator
+from datetime import datetime, timedelta
+import logging
+from pathlib import Path
+import re
+import shutil
+import time
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CAMERA_PORT,
+    EVENT_TIMELAPSE_COMPLETE,
+    STATE_COMPLETE,
+    STATE_PAUSED,
+    STATE_PRINTING,
+    TIMELAPSE_ANIMATION_WIDTH,
+    TIMELAPSE_DIR,
+    TIMELAPSE_FPS,
+    TIMELAPSE_INTERVAL,
+    TIMELAPSE_LAYER,
+    TIMELAPSE_MAX_BYTES,
+    TIMELAPSE_MAX_FRAMES,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import CrealityK1MaxCoordinator
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow ships with Home Assistant, but may be missing
+    Image = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Stream frames older than this are not used; a snapshot is fetched instead
+FRAME_MAX_AGE = 2  # seconds
+# Pillow holds every frame of an animation in memory, so without ffmpeg
+# the timelapse is subsampled to this many small frames
+ANIMATION_MAX_FRAMES = 240
+OUTPUT_SUFFIXES = (".mp4", ".webp")
+
+
+class TimelapseError(HomeAssistantError):
+    """Timelapse could not be assembled."""
+
+
+def _safe_name(filename: str) -> str:
+    """Return a print filename usable as a file or directory name."""
+    return re.sub(r"[^\w.-]+", "_", Path(filename).stem)[:80] or "print"
+
+
+def _scan_frames(frames_dir: Path) -> tuple[int, int, int]:
+    """Return the frame count, their total size and the next frame number."""
+    frames = sorted(frames_dir.glob("*.jpg"))
+    if not frames:
+        return 0, 0, 0
+    return (
+        len(frames),
+        sum(path.stat().st_size for path in frames),
+        int(frames[-1].stem) + 1,
+    )
+
+
+def _prepare_frames_dir(
+    frames_dir: Path, assembling: frozenset[Path]
+) -> tuple[int, int, int]:
+    """Create the frame directory of a print, dropping those of other prints.
+
+    Frames of the same print survive a restart and are resumed. Directories
+    still being assembled are left to their assembly, which deletes them.
+    """
+    for other in frames_dir.parent.glob("*"):
+        if other != frames_dir and other not in assembling:
+            shutil.rmtree(other, ignore_errors=True)
+    frames_dir.mkdir(parents=True, exist_ok=True)
+    return _scan_frames(frames_dir)
+
+
+def _write_frame(path: Path, frame: bytes) -> None:
+    """Write one frame; fails if the print's directory is already gone."""
+    path.write_bytes(frame)
+
+
+def _thin_frames(frames_dir: Path) -> tuple[int, int]:
+    """Delete every other frame and return the remaining count and size."""
+    for path in sorted(frames_dir.glob("*.jpg"))[1::2]:
+        path.unlink(missing_ok=True)
+    count, size, _ = _scan_frames(frames_dir)
+    return count, size
+
+
+def _assemble_animation(frames_dir: Path, output: Path) -> int:
+    """Assemble frames into an animated WebP with Pillow; return its frame count."""
+    if Image is None:
+        raise TimelapseError("Neither ffmpeg nor Pillow is available")
+    frames = sorted(frames_dir.glob("*.jpg"))
+    if not frames:
+        raise TimelapseError("No frames were captured")
+    step = max(1, -(-len(frames) // ANIMATION_MAX_FRAMES))
+    frames = frames[::step]
+
+    def load(path: Path) -> Image.Image:
+        with Image.open(path) as image:
+            image.draft("RGB", (TIMELAPSE_ANIMATION_WIDTH, TIMELAPSE_ANIMATION_WIDTH))
+            image.thumbnail((TIMELAPSE_ANIMATION_WIDTH, TIMELAPSE_ANIMATION_WIDTH))
+            return image.convert("RGB")
+
+    def rest() -> Iterator[Image.Image]:
+        for path in frames[1:]:
+            yield load(path)
+
+    load(frames[0]).save(
+        output,
+        "WEBP",
+        save_all=True,
+        append_images=rest(),
+        duration=round(1000 / TIMELAPSE_FPS),
+        quality=70,
+    )
+    return len(frames)
+
+
+def _prune_outputs(directory: Path, keep: int) -> None:
+    """Delete all but the newest keep timelapses."""
+    outputs = sorted(
+        (path for path in directory.iterdir() if path.suffix in OUTPUT_SUFFIXES),
+        key=lambda path: path.stat().st_mtime,
+    )
+    for path in outputs[:-keep] if keep else outputs:
+        path.unlink(missing_ok=True)
+
+
+class TimelapseRecorder:
+    """Capture camera frames while printing and assemble them into a video.
+
+    A frame is grabbed on every layer change, or every interval seconds,
+    and written straight to disk, so nothing accumulates in memory. Once a
+    print passes TIMELAPSE_MAX_FRAMES or TIMELAPSE_MAX_BYTES, every other
+    frame is deleted and the capture rate halves, so a 20 hour print is
+    still covered end to end within the caps. When the print completes
+    the frames are assembled with ffmpeg, or with Pillow into an animated
+    WebP if ffmpeg is not installed, off the event loop; the frames are
+    then deleted and only the newest keep timelapses are retained.
+    Frames of a cancelled print are deleted without assembling them.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: CrealityK1MaxCoordinator,
+        entry_id: str,
+        mode: str,
+        interval: float,
+        keep: int,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.entry_id = entry_id
+        self.mode = mode
+        self.interval = interval
+        self.keep = keep
+        self.directory = Path(hass.config.path(TIMELAPSE_DIR, entry_id))
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+        # The print being recorded
+        self._filename = ""
+        self._frames_dir: Path | None = None
+        self._preparing: asyncio.Task | None = None
+        # Last job creating or deleting frame directories; they run in order
+        self._frames_job: asyncio.Task | None = None
+        self._next_index = 0
+        self._frame_count = 0
+        self._frame_bytes = 0
+        self._triggers = 0
+        self._stride = 1
+        self._last_layer: int | None = None
+        self._capturing = False
+
+        # Frame directories of finished prints being assembled
+        self._assemblies: dict[Path, asyncio.Task] = {}
+        self.frames_captured = 0
+        self.frames_skipped = 0
+        self.timelapses = 0
+        self.last_timelapse: str | None = None
+        self.last_error: str | None = None
+
+    async def async_start(self) -> None:
+        """Start following the printer."""
+        self._unsubs.append(
+            self.coordinator.async_add_listener(
+                self._async_handle_update, ("state", "filename", "current_layer")
+            )
+        )
+        if self.mode == TIMELAPSE_INTERVAL:
+            self._unsubs.append(
+                async_track_time_interval(
+                    self.hass, self._async_interval, timedelta(seconds=self.interval)
+                )
+            )
+        self._async_handle_update()
+
+    async def async_stop(self) -> None:
+        """Stop capturing; frames of a running print are kept for a restart."""
+        while self._unsubs:
+            self._unsubs.pop()()
+        for task in (self._preparing, *self._assemblies.values()):
+            if task is not None and not task.done():
+                task.cancel()
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Start, feed or finish the recording as the print progresses."""
+        data = self.coordinator.data
+        if data is None:
+            return
+        state = data.state
+        if state in (STATE_PRINTING, STATE_PAUSED):
+            filename = data.filename
+            if self._preparing is None and self._frames_dir is None:
+                self._async_begin(filename)
+            elif filename != self._filename:
+                # A new print started without the last one finishing
+                self._async_finish(complete=False)
+                self._async_begin(filename)
+            if self.mode == TIMELAPSE_LAYER and state == STATE_PRINTING:
+                layer = data.current_layer
+                if layer and layer != self._last_layer:
+                    self._last_layer = layer
+                    self._async_trigger()
+        elif self._frames_dir is not None or self._preparing is not None:
+            self._async_finish(complete=state == STATE_COMPLETE)
+
+    @callback
+    def _async_interval(self, _now: datetime) -> None:
+        """Capture a frame on the interval while printing."""
+        if self.coordinator.data.state == STATE_PRINTING:
+            self._async_trigger()
+
+    @callback
+    def _async_begin(self, filename: str) -> None:
+        """Prepare the frame directory of a newly seen print."""
+        self._filename = filename
+        self._last_layer = None
+        self._triggers = 0
+        self._stride = 1
+        self._preparing = self.hass.async_create_task(
+            self._async_prepare(self.directory / "frames" / _safe_name(filename))
+        )
+
+    async def _async_prepare(self, frames_dir: Path) -> None:
+        """Create or resume the frame directory."""
+        try:
+            # The same file printed again waits for its last timelapse
+            if assembly := self._assemblies.get(frames_dir):
+                await asyncio.wait((assembly,))
+            count, size, next_index = await asyncio.shield(
+                self._async_frames_job(
+                    _prepare_frames_dir, frames_dir, frozenset(self._assemblies)
+                )
+            )
+        except OSError as err:
+            _LOGGER.error("Cannot store timelapse frames in %s: %s", frames_dir, err)
+            self.last_error = str(err)
+            return
+        finally:
+            # A cancelled prepare must not clear the next print's
+            if self._preparing is asyncio.current_task():
+                self._preparing = None
+        self._frames_dir = frames_dir
+        self._frame_count, self._frame_bytes, self._next_index = count, size, next_index
+
+    @callback
+    def _async_frames_job(self, target: Callable[..., Any], *args: Any) -> asyncio.Task:
+        """Run a job on the frame directories once the jobs before it are done.
+
+        Cancelling a prepare does not stop its executor job, so the jobs are
+        chained: a prepare given up on finishes before the next print's
+        runs, and cannot delete the newer print's directory.
+        """
+        previous = self._frames_job
+
+        async def _async_run() -> Any:
+            if previous is not None:
+                await asyncio.wait((previous,))
+            return await self.hass.async_add_executor_job(target, *args)
+
+        self._frames_job = self.hass.async_create_task(_async_run())
+        return self._frames_job
+
+    @callback
+    def _async_trigger(self) -> None:
+        """Capture a frame unless thinning or a slow capture skips it."""
+        if self._frames_dir is None:
+            return
+        self._triggers += 1
+        if (self._triggers - 1) % self._stride:
+            return
+        if self._capturing:
+            self.frames_skipped += 1
+            return
+        self._capturing = True
+        self.hass.async_create_task(
+            self._async_capture(self._frames_dir, self._next_index)
+        )
+        self._next_index += 1
+
+    async def _async_capture(self, frames_dir: Path, index: int) -> None:
+        """Grab one frame, write it to disk and thin the frames past the caps."""
+        try:
+            if (frame := await self._async_grab_frame()) is None:
+                self.frames_skipped += 1
+                return
+            try:
+                await self.hass.async_add_executor_job(
+                    _write_frame, frames_dir / f"{index:06d}.jpg", frame
+                )
+            except OSError as err:
+                # The print may have finished while the frame was in flight
+                _LOGGER.debug("Dropped timelapse frame: %s", err)
+                return
+            if frames_dir != self._frames_dir:
+                return
+            self.frames_captured += 1
+            self._frame_count += 1
+            self._frame_bytes += len(frame)
+            if (
+                self._frame_count > TIMELAPSE_MAX_FRAMES
+                or self._frame_bytes > TIMELAPSE_MAX_BYTES
+            ):
+                self._frame_count, self._frame_bytes = (
+                    await self.hass.async_add_executor_job(_thin_frames, frames_dir)
+                )
+                self._stride *= 2
+                _LOGGER.debug(
+                    "Thinned timelapse of %s, now capturing every %s triggers",
+                    self._filename,
+                    self._stride,
+                )
+        finally:
+            self._capturing = False
+
+    async def _async_grab_frame(self) -> bytes | None:
+        """Return the live stream's latest frame, or a fresh snapshot."""
+        stream = self.coordinator.camera_stream
+        if (
+            stream.streaming
+            and stream.latest_frame is not None
+            and time.monotonic() - stream.latest_frame_time <= FRAME_MAX_AGE
+        ):
+            return stream.latest_frame
+        try:
+            status, body = await self.coordinator.async_http_get(
+                "/?action=snapshot", port=CAMERA_PORT
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Could not capture timelapse frame: %s", err)
+            return None
+        return body if status == 200 else None
+
+    @callback
+    def _async_finish(self, complete: bool) -> None:
+        """Assemble the finished print's frames, or delete a cancelled print's."""
+        if self._preparing is not None:
+            self._preparing.cancel()
+            self._preparing = None
+        frames_dir, filename = self._frames_dir, self._filename
+        captured = self._frame_count
+        self._frames_dir = None
+        self._filename = ""
+        self._frame_count = self._frame_bytes = 0
+        if frames_dir is None:
+            return
+        if complete and captured:
+            self._assemblies[frames_dir] = self.hass.async_create_task(
+                self._async_assemble(frames_dir, filename)
+            )
+        else:
+            self._async_frames_job(shutil.rmtree, frames_dir, True)
+
+    async def _async_assemble(self, frames_dir: Path, filename: str) -> None:
+        """Assemble frames into a timelapse, off the event loop."""
+        stem = f"{dt_util.now():%Y%m%d-%H%M%S}_{_safe_name(filename)}"
+        try:
+            if ffmpeg := shutil.which("ffmpeg"):
+                output = self.directory / f"{stem}.mp4"
+                frames = await self._async_run_ffmpeg(ffmpeg, frames_dir, output)
+            else:
+                output = self.directory / f"{stem}.webp"
+                frames = await self.hass.async_add_executor_job(
+                    _assemble_animation, frames_dir, output
+                )
+            await self.hass.async_add_executor_job(_prune_outputs, self.directory, self.keep)
+        except (OSError, TimelapseError) as err:
+            _LOGGER.error("Could not assemble timelapse of %s: %s", filename, err)
+            self.last_error = str(err)
+            return
+        finally:
+            try:
+                await self.hass.async_add_executor_job(shutil.rmtree, frames_dir, True)
+            finally:
+                self._assemblies.pop(frames_dir, None)
+
+        self.timelapses += 1
+        self.last_timelapse = str(output)
+        _LOGGER.debug("Assembled %s frames into %s", frames, output)
+        self.hass.bus.async_fire(
+            EVENT_TIMELAPSE_COMPLETE,
+            {
+                "entry_id": self.entry_id,
+                "filename": filename,
+                "path": str(output),
+                "frames": frames,
+            },
+        )
+
+    async def _async_run_ffmpeg(self, ffmpeg: str, frames_dir: Path, output: Path) -> int:
+        """Encode the frames with ffmpeg, which reads them from disk itself."""
+        count, _, _ = await self.hass.async_add_executor_job(_scan_frames, frames_dir)
+        process = await asyncio.create_subprocess_exec(
+            ffmpeg,
+            "-y",
+            "-loglevel",
+            "error",
+            "-framerate",
+            str(TIMELAPSE_FPS),
+            "-pattern_type",
+            "glob",
+            "-i",
+            str(frames_dir / "*.jpg"),
+            "-vf",
+            "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+            "-c:v",
+            "libx264",
+            "-pix_fmt",
+            "yuv420p",
+            "-movflags",
+            "+faststart",
+            str(output),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+        if process.returncode:
+            raise TimelapseError(
+                f"ffmpeg exited with {process.returncode}: {stderr.decode().strip()}"
+            )
+        return count
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return recorder statistics for diagnostics."""
+        return {
+            "mode": self.mode,
+            "recording": self._frames_dir is not None,
+            "frames": self._frame_count,
+            "frame_bytes": self._frame_bytes,
+            "stride": self._stride,
+            "frames_captured": self.frames_captured,
+            "frames_skipped": self.frames_skipped,
+            "timelapses": self.timelapses,
+            "last_timelapse": self.last_timelapse,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,435 @@
+"""File upload to Creality printers."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+import json
+import logging
+from pathlib import Path
+import secrets
+import time
+from typing import IO, TYPE_CHECKING, Any
+from urllib.parse import quote
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    ENDPOINT_FILES_METADATA,
+    ENDPOINT_FILES_UPLOAD,
+    ENDPOINT_PRINT_START,
+    EVENT_UPLOAD_FINISHED,
+    EVENT_UPLOAD_PROGRESS,
+    HTTP_TIMEOUT,
+    UPLOAD_ATTEMPTS,
+    UPLOAD_CANCELLED,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_COMPLETE,
+    UPLOAD_FAILED,
+    UPLOAD_PROGRESS_INTERVAL,
+    UPLOAD_RETRY_DELAY,
+    UPLOAD_STALL_TIMEOUT,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import CrealityK1MaxCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Responses of a proxy or a server that is restarting, worth another try
+_RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class UploadError(HomeAssistantError):
+    """File could not be uploaded."""
+
+
+class UploadDropped(Exception):
+    """The connection dropped or stalled during an upload attempt."""
+
+
+def _multipart(filename: str, start_print: bool) -> tuple[str, bytes, bytes]:
+    """Return the boundary and the form data around the file's content.
+
+    The form is built by hand rather than with aiohttp's MultipartWriter so
+    the request has a Content-Length: the printer's web server need not
+    support chunked transfer encoding.
+    """
+    boundary = f"CrealityConnect{secrets.token_hex(16)}"
+    fields = {"root": "gcodes", "print": "true" if start_print else "false"}
+    head = "".join(
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+        f"{value}\r\n"
+        for name, value in fields.items()
+    )
+    head += (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    )
+    return boundary, head.encode(), f"\r\n--{boundary}--\r\n".encode()
+
+
+class FileUpload:
+    """Progress of one file being sent to a printer."""
+
+    def __init__(self, path: Path, filename: str, size: int, start_print: bool) -> None:
+        """Initialize."""
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.start_print = start_print
+        self.attempt = 0
+        self.sent = 0
+        self.started = time.monotonic()
+        self.attempt_started = self.started
+        self.last_progress = self.started
+        self.result: str | None = None
+        self.error: str | None = None
+        self.print_started = False
+        # Whether a dropped attempt may count as done if the printer turns
+        # out to have the whole file, and the modification time of the file
+        # this upload replaces, so that one is not taken for it
+        self.check_stored = False
+        self.replaced_modified: float | None = None
+        # Set when reading the local file fails, which aiohttp reports as a
+        # connection error
+        self.read_error: UploadError | None = None
+
+    @property
+    def percent(self) -> float:
+        """Return how much of the file the current attempt has sent."""
+        return round(self.sent / self.size * 100, 1) if self.size else 100.0
+
+    @property
+    def rate(self) -> float:
+        """Return the current attempt's average rate in bytes per second."""
+        elapsed = time.monotonic() - self.attempt_started
+        return round(self.sent / elapsed) if elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the upload's progress for events and diagnostics."""
+        return {
+            "filename": self.filename,
+            "bytes_sent": self.sent,
+            "total_bytes": self.size,
+            "progress": self.percent,
+            "bytes_per_second": self.rate,
+            "attempt": self.attempt,
+            "start_print": self.start_print,
+            "result": self.result,
+            "error": self.error,
+            "print_started": self.print_started,
+        }
+
+
+class FileUploader:
+    """Stream G-code files from disk to a printer's upload endpoint.
+
+    The file is posted as a multipart form, read UPLOAD_CHUNK_SIZE bytes at
+    a time in the executor and handed to aiohttp, which waits for the
+    socket to drain before the next chunk is read; a 300 MB file costs one
+    chunk of memory. One upload runs per printer, in the background, and
+    reports progress through events. If the connection drops or stalls,
+    the upload is retried with a growing delay. Moonraker's endpoint only
+    takes whole files, so a retry starts the file over, unless the printer
+    turns out to have stored all of it before the connection dropped.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: CrealityK1MaxCoordinator, entry_id: str
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.entry_id = entry_id
+        self.upload: FileUpload | None = None
+        self._task: asyncio.Task | None = None
+        self.uploads = 0
+        self.bytes_uploaded = 0
+        self.retries = 0
+
+    @property
+    def active(self) -> bool:
+        """Return True while an upload is running."""
+        return self._task is not None and not self._task.done()
+
+    def async_start(
+        self, path: Path, filename: str, size: int, start_print: bool
+    ) -> FileUpload:
+        """Start uploading a file in the background."""
+        if self.active:
+            raise UploadError(
+                f"{self.upload.filename} is still being uploaded to {self.coordinator.host}"
+            )
+        self.upload = FileUpload(path, filename, size, start_print)
+        self._task = self.hass.async_create_task(self._async_run(self.upload))
+        return self.upload
+
+    def async_cancel(self) -> bool:
+        """Cancel the running upload; return False if there is none."""
+        if not self.active:
+            return False
+        self._task.cancel()
+        return True
+
+    async def async_stop(self) -> None:
+        """Cancel the running upload and wait for it to end."""
+        if self.async_cancel():
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _fire(self, event_type: str, upload: FileUpload) -> None:
+        self.hass.bus.async_fire(
+            event_type,
+            {"entry_id": self.entry_id, "host": self.coordinator.host, **upload.as_dict()},
+        )
+
+    async def _async_run(self, upload: FileUpload) -> None:
+        """Upload a file, retrying dropped attempts, and report the result."""
+        try:
+            # Index it first, so its metadata is there when the print starts
+            index = self.coordinator.gcode_index
+            if indexed := await index.async_index([upload.path]):
+                index.async_alias(upload.filename, indexed[0])
+            await self._async_upload(upload)
+        except asyncio.CancelledError:
+            upload.result = UPLOAD_CANCELLED
+            _LOGGER.info("Upload of %s to %s cancelled", upload.filename, self.coordinator.host)
+            self._fire(EVENT_UPLOAD_FINISHED, upload)
+            raise
+        except UploadError as err:
+            upload.result, upload.error = UPLOAD_FAILED, str(err)
+            _LOGGER.error("%s", err)
+        except Exception as err:  # pylint: disable=broad-except
+            # Whatever went wrong, automations waiting for the result get one
+            upload.result, upload.error = UPLOAD_FAILED, str(err) or type(err).__name__
+            _LOGGER.exception(
+                "Unexpected error uploading %s to %s", upload.filename, self.coordinator.host
+            )
+        else:
+            upload.result = UPLOAD_COMPLETE
+            self.uploads += 1
+            self.bytes_uploaded += upload.size
+            _LOGGER.info(
+                "Uploaded %s (%s bytes) to %s in %.0f s",
+                upload.filename,
+                upload.size,
+                self.coordinator.host,
+                time.monotonic() - upload.started,
+            )
+        self._fire(EVENT_UPLOAD_FINISHED, upload)
+
+    async def _async_upload(self, upload: FileUpload) -> None:
+        """Send the file until an attempt succeeds or UPLOAD_ATTEMPTS have dropped."""
+        host = self.coordinator.host
+        try:
+            replaced = await self._async_printer_file(upload.filename)
+        except UploadDropped:
+            pass
+        else:
+            upload.check_stored = True
+            upload.replaced_modified = replaced.get("modified") if replaced else None
+        while True:
+            upload.attempt += 1
+            try:
+                await self._async_attempt(upload)
+                return
+            except UploadDropped as err:
+                if upload.attempt >= UPLOAD_ATTEMPTS:
+                    raise UploadError(
+                        f"Upload of {upload.filename} to {host} failed"
+                        f" after {upload.attempt} attempts: {err}"
+                    ) from err
+                delay = UPLOAD_RETRY_DELAY * 2 ** (upload.attempt - 1)
+                _LOGGER.warning(
+                    "Upload of %s to %s dropped at %s of %s bytes (%s); retrying in %s s",
+                    upload.filename,
+                    host,
+                    upload.sent,
+                    upload.size,
+                    err,
+                    delay,
+                )
+                self.retries += 1
+                await asyncio.sleep(delay)
+                if await self._async_printer_has_file(upload):
+                    # The connection dropped after the printer had stored it,
+                    # so the form's print field may not have been acted on
+                    upload.sent = upload.size
+                    if upload.start_print:
+                        await self._async_start_print(upload)
+                    return
+
+    async def _async_attempt(self, upload: FileUpload) -> None:
+        """Post the file once, raising UploadDropped if the connection fails."""
+        boundary, head, tail = _multipart(upload.filename, upload.start_print)
+        upload.sent = 0
+        upload.read_error = None
+        upload.attempt_started = upload.last_progress = time.monotonic()
+        try:
+            file: IO[bytes] = await self.hass.async_add_executor_job(upload.path.open, "rb")
+        except OSError as err:
+            raise UploadError(f"Cannot read {upload.path}: {err}") from err
+        try:
+            request = asyncio.ensure_future(
+                self.coordinator.async_http_post(
+                    ENDPOINT_FILES_UPLOAD,
+                    self._body(file, upload, head, tail),
+                    {
+                        "Content-Type": f"multipart/form-data; boundary={boundary}",
+                        "Content-Length": str(len(head) + upload.size + len(tail)),
+                    },
+                    aiohttp.ClientTimeout(total=None, sock_connect=HTTP_TIMEOUT),
+                )
+            )
+            try:
+                status, body = await self._async_watch(request, upload)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as err:
+                # The file, not the connection, failed: retrying will not help
+                if upload.read_error is not None:
+                    raise upload.read_error from err
+                raise UploadDropped(str(err) or type(err).__name__) from err
+        finally:
+            await self.hass.async_add_executor_job(file.close)
+
+        if status in _RETRY_STATUSES:
+            raise UploadDropped(f"HTTP {status}")
+        if status >= 300:
+            raise UploadError(
+                f"{self.coordinator.host} refused {upload.filename}: HTTP {status}"
+                f" {body[:200].decode(errors='replace')}"
+            )
+        try:
+            upload.print_started = bool(json.loads(body).get("print_started"))
+        except (ValueError, AttributeError):
+            upload.print_started = False
+
+    async def _async_watch(
+        self, request: asyncio.Future, upload: FileUpload
+    ) -> tuple[int, bytes]:
+        """Wait for the request, cancelling it once it stops making progress.
+
+        aiohttp's read timeout would start while the body is still being
+        sent, so stalls are detected here instead, from the bytes sent and,
+        once the body is out, from how long the printer takes to answer.
+        """
+        try:
+            while True:
+                done, _ = await asyncio.wait((request,), timeout=UPLOAD_STALL_TIMEOUT / 4)
+                if done:
+                    return request.result()
+                if time.monotonic() - upload.last_progress > UPLOAD_STALL_TIMEOUT:
+                    raise asyncio.TimeoutError(
+                        f"no progress for {UPLOAD_STALL_TIMEOUT} seconds"
+                    )
+        finally:
+            request.cancel()
+
+    async def _body(
+        self, file: IO[bytes], upload: FileUpload, head: bytes, tail: bytes
+    ) -> AsyncIterator[bytes]:
+        """Yield the form data, reading the file one chunk at a time."""
+        yield head
+        next_event = time.monotonic() + UPLOAD_PROGRESS_INTERVAL
+        while upload.sent < upload.size:
+            try:
+                chunk = await self.hass.async_add_executor_job(
+                    file.read, min(UPLOAD_CHUNK_SIZE, upload.size - upload.sent)
+                )
+            except OSError as err:
+                upload.read_error = UploadError(f"Cannot read {upload.path}: {err}")
+                raise upload.read_error from err
+            if not chunk:
+                upload.read_error = UploadError(
+                    f"{upload.path} got shorter while it was uploaded"
+                )
+                raise upload.read_error
+            # Counted when aiohttp asks for the next chunk, so once this one
+            # has been written to the socket
+            yield chunk
+            upload.sent += len(chunk)
+            upload.last_progress = now = time.monotonic()
+            if now >= next_event or upload.sent == upload.size:
+                next_event = now + UPLOAD_PROGRESS_INTERVAL
+                self._fire(EVENT_UPLOAD_PROGRESS, upload)
+        yield tail
+        upload.last_progress = time.monotonic()
+
+    async def _async_printer_file(self, filename: str) -> dict[str, Any] | None:
+        """Return the printer's metadata of a file, None if it has no such file.
+
+        Raises UploadDropped if the printer cannot be asked.
+        """
+        try:
+            status, body = await self.coordinator.async_http_get(
+                f"{ENDPOINT_FILES_METADATA}?filename={quote(filename)}",
+                self.coordinator.port,
+            )
+            if status == 404:
+                return None
+            if status != 200:
+                raise UploadDropped(f"HTTP {status}")
+            result = json.loads(body)["result"]
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError) as err:
+            raise UploadDropped(str(err) or type(err).__name__) from err
+        if not isinstance(result, dict):
+            raise UploadDropped("Unexpected file metadata")
+        return result
+
+    async def _async_printer_has_file(self, upload: FileUpload) -> bool:
+        """Return True if the printer has stored the whole of this upload's file.
+
+        A file of the same name and size stored before the upload began does
+        not count: it is told apart by its modification time.
+        """
+        if not upload.check_stored:
+            return False
+        try:
+            stored = await self._async_printer_file(upload.filename)
+        except UploadDropped:
+            return False
+        return (
+            stored is not None
+            and stored.get("size") == upload.size
+            and stored.get("modified") is not None
+            and stored.get("modified") != upload.replaced_modified
+        )
+
+    async def _async_start_print(self, upload: FileUpload) -> None:
+        """Start printing the uploaded file."""
+        host = self.coordinator.host
+        try:
+            status, body = await self.coordinator.async_http_post(
+                f"{ENDPOINT_PRINT_START}?filename={quote(upload.filename)}",
+                b"",
+                {},
+                aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            raise UploadError(
+                f"{upload.filename} was uploaded to {host} but the print"
+                f" could not be started: {err or type(err).__name__}"
+            ) from err
+        if status >= 300:
+            raise UploadError(
+                f"{upload.filename} was uploaded to {host} but the print"
+                f" could not be started: HTTP {status}"
+                f" {body[:200].decode(errors='replace')}"
+            )
+        upload.print_started = True
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return uploader statistics for diagnostics."""
+        return {
+            "uploads": self.uploads,
+            "bytes_uploaded": self.bytes_uploaded,
+            "retries": self.retries,
+            "active": self.active,
+            "last_upload": self.upload.as_dict() if self.upload else None,
+        }
@@ -0,0 +1,748 @@
+"""Fake Creality K1 Max printers for load and integration testing.
+
+Each emulated printer serves the endpoints the integration talks to:
+
+* ``ws://HOST:WS_PORT/websocket``: Creality-format telemetry frames at a
+  configurable rate, ``set`` commands applied after a configurable delay,
+  and Moonraker ``printer.objects.subscribe`` answered with
+  ``notify_status_update`` deltas when started with ``--protocol moonraker``
+* ``http://HOST:WS_PORT/``, ``/server/info`` and ``/printer/info``: the
+  probes used by the config flow
+* ``http://HOST:WS_PORT/server/files/upload`` (Moonraker's multipart
+  upload, read and discarded, optionally starting the print),
+  ``/server/files/metadata`` and ``/printer/print/start``;
+  ``--drop-uploads N`` drops the connection halfway through the first N
+  uploads
+* ``http://HOST:WEB_PORT/downloads/original/current_print_image.png``
+* ``http://HOST:CAMERA_PORT/?action=stream`` (MJPEG) and ``?action=snapshot``
+
+Start N printers with ``--count``. By default they share one address and
+each printer's ports are offset by ``--port-stride``. With
+``--distinct-hosts`` printer *i* binds 127.0.0.(i+1) on the unshifted ports
+instead, which matches the fixed camera (8080) and thumbnail (80) ports the
+integration uses; binding port 80 needs root or CAP_NET_BIND_SERVICE.
+
+    python tools/k1max_emulator.py --count 10 --rate 5
+    python tools/k1max_emulator.py --distinct-hosts --count 40 --web-port 80
+
+Requires aiohttp. Pillow is optional; with it, camera frames are rendered
+at ``--camera-size``, without it a tiny static JPEG is served.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+from dataclasses import dataclass, field
+import io
+import json
+import logging
+import random
+import struct
+import time
+from typing import Any
+import zlib
+
+from aiohttp import WSMsgType, web
+
+_LOGGER = logging.getLogger("k1max_emulator")
+
+MJPEG_BOUNDARY = "boundarydonotcross"
+
+# 16x16 grey JPEG used when Pillow is not installed
+_STATIC_JPEG = base64.b64decode(
+    "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDABsSFBcUERsXFhceHBsgKEIrKCUlKFE6PTBCYFVlZF9V"
+    "XVtqeJmBanGQc1tdhbWGkJ6jq62rZ4C8ybqmx5moq6T/2wBDARweHigjKE4rK06kbl1upKSkpKSk"
+    "pKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKT/wAARCAAQABADASIA"
+    "AhEBAxEB/8QAFQABAQAAAAAAAAAAAAAAAAAAAAX/xAAUEAEAAAAAAAAAAAAAAAAAAAAA/8QAFAEB"
+    "AAAAAAAAAAAAAAAAAAAAAP/EABQRAQAAAAAAAAAAAAAAAAAAAAD/2gAMAwEAAhEDEQA/AIoAP//Z"
+)
+
+FILENAMES = (
+    "bracket_PETG_0.2mm.gcode",
+    "benchy_PLA_0.16mm.gcode",
+    "enclosure_lid_ABS_0.28mm.gcode",
+)
+
+DEVICE_IDLE, DEVICE_PRINTING, DEVICE_PAUSED, DEVICE_COMPLETE = 0, 1, 2, 3
+MOONRAKER_STATES = {
+    DEVICE_IDLE: "standby",
+    DEVICE_PRINTING: "printing",
+    DEVICE_PAUSED: "paused",
+    DEVICE_COMPLETE: "complete",
+}
+
+
+def render_png(width: int, height: int, seed: int) -> bytes:
+    """Return a solid-colour PNG, using only the standard library."""
+    rng = random.Random(seed)
+    pixel = bytes(rng.randrange(256) for _ in range(3))
+    raw = b"".join(b"\x00" + pixel * width for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def render_jpegs(width: int, height: int, count: int) -> list[bytes]:
+    """Pre-render a ring of camera frames so serving them costs no CPU."""
+    try:
+        from PIL import Image, ImageDraw  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return [_STATIC_JPEG]
+
+    frames = []
+    for index in range(count):
+        image = Image.new("RGB", (width, height), (30, 30, 30))
+        draw = ImageDraw.Draw(image)
+        x = int((width - 40) * index / max(1, count - 1))
+        draw.rectangle((x, height // 2 - 20, x + 40, height // 2 + 20), fill=(220, 120, 0))
+        draw.text((10, 10), f"K1 Max emulator frame {index}", fill=(255, 255, 255))
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=80)
+        frames.append(buffer.getvalue())
+    return frames
+
+
+@dataclass
+class PrinterStats:
+    """Counters a load test can assert on."""
+
+    ws_connections: int = 0
+    frames_sent: int = 0
+    bytes_sent: int = 0
+    commands: int = 0
+    info_requests: int = 0
+    thumbnail_requests: int = 0
+    snapshot_requests: int = 0
+    stream_clients: int = 0
+    stream_rejected: int = 0
+    uploads: int = 0
+    uploads_dropped: int = 0
+    upload_bytes: int = 0
+
+
+@dataclass
+class FakePrinter:
+    """One emulated printer: simulated print state plus its servers."""
+
+    name: str
+    host: str = "127.0.0.1"
+    ws_port: int = 9999
+    web_port: int = 8081
+    camera_port: int = 8080
+    rate: float = 5.0
+    full_frame_interval: float = 30.0
+    protocol: str = "creality"
+    command_delay: float = 0.5
+    print_seconds: float = 1800.0
+    camera_fps: float = 10.0
+    max_camera_clients: int | None = None
+    disconnect_every: float | None = None
+    drop_uploads: int = 0
+    jpegs: list[bytes] = field(default_factory=lambda: [_STATIC_JPEG])
+    seed: int = 0
+    stats: PrinterStats = field(default_factory=PrinterStats)
+
+    def __post_init__(self) -> None:
+        """Initialize the simulated print."""
+        self._rng = random.Random(self.seed)
+        self._runners: list[web.AppRunner] = []
+        self._tick_task: asyncio.Task | None = None
+        self._sockets: set[web.WebSocketResponse] = set()
+        self._stream_clients = 0
+        self._file_index = 0
+        # Uploaded file name -> size and upload time; the content is not kept
+        self.files: dict[str, tuple[int, float]] = {}
+        self.state: dict[str, Any] = {
+            "device_state": DEVICE_IDLE,
+            "nozzle_temp": 25.0,
+            "nozzle_target": 0.0,
+            "bed_temp": 25.0,
+            "bed_target": 0.0,
+            "x": 150.0,
+            "y": 150.0,
+            "z": 0.0,
+            "speed": 0.0,
+            "feedrate_pct": 100,
+            "job_time": 0.0,
+            "total_layers": 0,
+            "model_fan": 0,
+            "auxiliary_fan": 0,
+            "case_fan": 0,
+            "light": 0,
+            "filename": "",
+        }
+        self._start_print()
+
+    # Simulation
+
+    def _start_print(self, filename: str | None = None) -> None:
+        """Start a print of filename, or of the next file in the rotation."""
+        state = self.state
+        if filename is None:
+            filename = FILENAMES[self._file_index % len(FILENAMES)]
+            self._file_index += 1
+        state["filename"] = filename
+        state["device_state"] = DEVICE_PRINTING
+        state["job_time"] = 0.0
+        state["total_layers"] = 150 + self._rng.randrange(150)
+        state["nozzle_target"] = 220.0
+        state["bed_target"] = 60.0
+        state["model_fan"] = 100
+        self._complete_since: float | None = None
+
+    @property
+    def progress(self) -> float:
+        """Return the print progress as a fraction."""
+        return min(1.0, self.state["job_time"] / self.print_seconds)
+
+    @property
+    def layer(self) -> int:
+        """Return the current layer."""
+        return int(self.progress * self.state["total_layers"])
+
+    def step(self, dt: float) -> None:
+        """Advance the simulation by dt seconds."""
+        state = self.state
+        for temp, target in (("nozzle_temp", "nozzle_target"), ("bed_temp", "bed_target")):
+            goal = max(state[target], 25.0)
+            state[temp] += (goal - state[temp]) * min(1.0, dt / 8) + self._rng.gauss(0, 0.15)
+
+        if state["device_state"] == DEVICE_PRINTING:
+            state["job_time"] += dt
+            state["x"] = min(300.0, max(0.0, state["x"] + self._rng.uniform(-30, 30)))
+            state["y"] = min(300.0, max(0.0, state["y"] + self._rng.uniform(-30, 30)))
+            state["z"] = round(self.layer * 0.2, 2)
+            state["speed"] = self._rng.uniform(60, 300) * state["feedrate_pct"] / 100
+            if self.progress >= 1.0:
+                state["device_state"] = DEVICE_COMPLETE
+                state["nozzle_target"] = state["bed_target"] = 0.0
+                state["speed"] = 0.0
+                self._complete_since = time.monotonic()
+        elif (
+            state["device_state"] == DEVICE_COMPLETE
+            and self._complete_since is not None
+            and time.monotonic() - self._complete_since > 30
+        ):
+            self._start_print()
+
+    def apply_command(self, params: dict[str, Any]) -> None:
+        """Apply a Creality ``set`` command."""
+        state = self.state
+        for key, value in params.items():
+            if key == "fan":
+                state["model_fan"] = int(value)
+            elif key == "auxiliaryFanPct":
+                state["auxiliary_fan"] = int(value)
+            elif key == "caseFanPct":
+                state["case_fan"] = int(value)
+            elif key == "lightSw":
+                state["light"] = int(value)
+            elif key == "nozzleTargetTemp":
+                state["nozzle_target"] = float(value)
+            elif key == "bedTargetTemp":
+                state["bed_target"] = float(value)
+            elif key == "pause":
+                if int(value) and state["device_state"] == DEVICE_PRINTING:
+                    state["device_state"] = DEVICE_PAUSED
+                elif not int(value) and state["device_state"] == DEVICE_PAUSED:
+                    state["device_state"] = DEVICE_PRINTING
+            elif key == "stop" and int(value):
+                state["device_state"] = DEVICE_IDLE
+                state["nozzle_target"] = state["bed_target"] = 0.0
+            elif key == "gcode" and str(value).upper().startswith("G28"):
+                state["x"] = state["y"] = state["z"] = 0.0
+
+    def creality_frame(self, full: bool) -> dict[str, Any]:
+        """Return a Creality-format frame; partial frames carry fast fields only."""
+        state = self.state
+        frame: dict[str, Any] = {
+            "nozzleTemp": f"{state['nozzle_temp']:.6f}",
+            "bedTemp0": f"{state['bed_temp']:.6f}",
+            "curPosition": f"X:{state['x']:.2f} Y:{state['y']:.2f} Z:{state['z']:.2f}",
+            "realTimeSpeed": f"{state['speed']:.2f}",
+            "printJobTime": int(state["job_time"]),
+            "printLeftTime": int(max(0.0, self.print_seconds - state["job_time"])),
+            "printProgress": int(self.progress * 100),
+            "layer": self.layer,
+            "deviceState": state["device_state"],
+            "targetNozzleTemp": int(state["nozzle_target"]),
+            "targetBedTemp0": int(state["bed_target"]),
+            "modelFanPct": state["model_fan"],
+            "auxiliaryFanPct": state["auxiliary_fan"],
+            "caseFanPct": state["case_fan"],
+            "lightSw": state["light"],
+        }
+        if full:
+            frame.update(
+                {
+                    "state": state["device_state"],
+                    "printFileName": f"/usr/data/printer_data/gcodes/{state['filename']}",
+                    "TotalLayer": state["total_layers"],
+                    "curFeedratePct": state["feedrate_pct"],
+                    "boxTemp": 31,
+                    "model": "K1 Max",
+                    "hostname": self.name,
+                    "err": {"errcode": 0, "key": 0},
+                }
+            )
+        return frame
+
+    def moonraker_status(
+        self, objects: dict[str, list[str] | None] | None = None
+    ) -> dict[str, Any]:
+        """Return the Moonraker status of the subscribed objects and fields.
+
+        Objects carry the other fields Klipper reports too, so subscribing
+        to everything costs what it does on a real printer.
+        """
+        state = self.state
+        position = [state["x"], state["y"], state["z"], state["job_time"] * 2]
+        status = {
+            "print_stats": {
+                "state": MOONRAKER_STATES[state["device_state"]],
+                "filename": state["filename"],
+                "print_duration": state["job_time"],
+                "total_duration": state["job_time"],
+                "filament_used": round(state["job_time"] * 0.8, 2),
+                "message": "",
+                "info": {
+                    "current_layer": self.layer,
+                    "total_layer": state["total_layers"],
+                },
+            },
+            "toolhead": {
+                "position": position,
+                "homed_axes": "xyz",
+                "print_time": round(state["job_time"] + 3.2, 3),
+                "estimated_print_time": round(state["job_time"] + 3.1, 3),
+                "extruder": "extruder",
+                "max_velocity": 800.0,
+                "max_accel": 20000.0,
+                "minimum_cruise_ratio": 0.5,
+                "square_corner_velocity": 5.0,
+                "axis_minimum": [-2.0, -2.0, -10.0, 0.0],
+                "axis_maximum": [300.0, 300.0, 300.0, 0.0],
+            },
+            "extruder": {
+                "temperature": round(state["nozzle_temp"], 2),
+                "target": state["nozzle_target"],
+                "power": round(min(1.0, max(0.0, (state["nozzle_target"] - state["nozzle_temp"]) / 10 + 0.4)), 3),
+                "can_extrude": state["nozzle_temp"] > 170,
+                "pressure_advance": 0.04,
+                "smooth_time": 0.04,
+            },
+            "heater_bed": {
+                "temperature": round(state["bed_temp"], 2),
+                "target": state["bed_target"],
+                "power": round(min(1.0, max(0.0, (state["bed_target"] - state["bed_temp"]) / 5 + 0.3)), 3),
+            },
+            "fan": {"speed": state["model_fan"] / 100, "rpm": state["model_fan"] * 42},
+            "gcode_move": {
+                "speed": state["speed"] * 60,
+                "speed_factor": state["feedrate_pct"] / 100,
+                "extrude_factor": 1.0,
+                "absolute_coordinates": True,
+                "absolute_extrude": False,
+                "homing_origin": [0.0, 0.0, 0.0, 0.0],
+                "position": position,
+                "gcode_position": position,
+            },
+            "virtual_sdcard": {
+                "progress": self.progress,
+                "file_path": f"/usr/data/printer_data/gcodes/{state['filename']}",
+                "file_position": int(self.progress * 4_800_000),
+                "file_size": 4_800_000,
+                "is_active": state["device_state"] == DEVICE_PRINTING,
+            },
+        }
+        if objects is None:
+            return status
+        filtered = {}
+        for name, wanted in objects.items():
+            if (values := status.get(name)) is None:
+                continue
+            if wanted is not None:
+                values = {key: values[key] for key in wanted if key in values}
+            filtered[name] = values
+        return filtered
+
+    # Servers
+
+    async def start(self) -> None:
+        """Start the simulation and bind every server."""
+        apps: dict[int, web.Application] = {}
+
+        def app_for(port: int) -> web.Application:
+            if port not in apps:
+                apps[port] = web.Application()
+            return apps[port]
+
+        ws_app = app_for(self.ws_port)
+        ws_app.router.add_get("/websocket", self._handle_websocket)
+        for path in ("/", "/server/info", "/printer/info"):
+            ws_app.router.add_get(path, self._handle_info)
+        ws_app.router.add_post("/server/files/upload", self._handle_upload)
+        ws_app.router.add_get("/server/files/metadata", self._handle_metadata)
+        ws_app.router.add_post("/printer/print/start", self._handle_print_start)
+        app_for(self.web_port).router.add_get(
+            "/downloads/original/current_print_image.png", self._handle_thumbnail
+        )
+        camera_app = app_for(self.camera_port)
+        if self.camera_port == self.ws_port:
+            raise ValueError("The camera port must differ from the WebSocket port")
+        camera_app.router.add_get("/", self._handle_camera)
+
+        for port, app in apps.items():
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, self.host, port).start()
+            self._runners.append(runner)
+
+        self._tick_task = asyncio.create_task(self._tick_loop())
+
+    async def stop(self) -> None:
+        """Stop the simulation and close every server."""
+        if self._tick_task:
+            self._tick_task.cancel()
+        for websocket in list(self._sockets):
+            await websocket.close()
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+    async def _tick_loop(self) -> None:
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(0.1)
+            now = time.monotonic()
+            self.step(now - last)
+            last = now
+
+    async def _send(self, websocket: web.WebSocketResponse, payload: dict[str, Any]) -> None:
+        message = json.dumps(payload, separators=(",", ":"))
+        await websocket.send_str(message)
+        self.stats.frames_sent += 1
+        self.stats.bytes_sent += len(message)
+
+    async def _handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        websocket = web.WebSocketResponse(autoping=True)
+        await websocket.prepare(request)
+        self.stats.ws_connections += 1
+        self._sockets.add(websocket)
+        subscribed = asyncio.Event()
+        subscription: dict[str, list[str] | None] = {}
+        sender = asyncio.create_task(
+            self._send_loop(websocket, subscribed, subscription)
+        )
+        try:
+            async for message in websocket:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    payload = json.loads(message.data)
+                except ValueError:
+                    continue
+                await self._handle_request(websocket, payload, subscribed, subscription)
+        finally:
+            sender.cancel()
+            self._sockets.discard(websocket)
+        return websocket
+
+    async def _handle_request(
+        self,
+        websocket: web.WebSocketResponse,
+        payload: dict[str, Any],
+        subscribed: asyncio.Event,
+        subscription: dict[str, list[str] | None],
+    ) -> None:
+        method = payload.get("method")
+        if method == "set":
+            self.stats.commands += 1
+            params = payload.get("params") or {}
+            asyncio.get_running_loop().call_later(
+                self.command_delay, self.apply_command, params
+            )
+        elif method == "printer.objects.subscribe":
+            # A new subscription replaces the previous one
+            subscription.clear()
+            subscription.update((payload.get("params") or {}).get("objects") or {})
+            await self._send(
+                websocket,
+                {
+                    "jsonrpc": "2.0",
+                    "result": {
+                        "eventtime": time.monotonic(),
+                        "status": self.moonraker_status(subscription),
+                    },
+                    "id": payload.get("id"),
+                },
+            )
+            subscribed.set()
+
+    async def _send_loop(
+        self,
+        websocket: web.WebSocketResponse,
+        subscribed: asyncio.Event,
+        subscription: dict[str, list[str] | None],
+    ) -> None:
+        interval = 1 / self.rate
+        started = time.monotonic()
+        last_full = 0.0
+        previous: dict[str, Any] = {}
+        while not websocket.closed:
+            await asyncio.sleep(interval * self._rng.uniform(0.8, 1.2))
+            now = time.monotonic()
+            if self.disconnect_every and now - started > self.disconnect_every:
+                await websocket.close()
+                return
+
+            if self.protocol == "moonraker":
+                if not subscribed.is_set():
+                    continue
+                status = self.moonraker_status(subscription)
+                delta = {
+                    obj: {k: v for k, v in fields.items() if previous.get(obj, {}).get(k) != v}
+                    for obj, fields in status.items()
+                }
+                delta = {obj: fields for obj, fields in delta.items() if fields}
+                previous = status
+                if delta:
+                    await self._send(
+                        websocket,
+                        {
+                            "jsonrpc": "2.0",
+                            "method": "notify_status_update",
+                            "params": [delta, now],
+                        },
+                    )
+                continue
+
+            full = now - last_full >= self.full_frame_interval
+            if full:
+                last_full = now
+            await self._send(websocket, self.creality_frame(full))
+
+    async def _handle_info(self, request: web.Request) -> web.Response:
+        self.stats.info_requests += 1
+        if request.path == "/printer/info":
+            result = {"state": "ready", "hostname": self.name, "software_version": "emulator"}
+        else:
+            result = {"klippy_connected": True, "klippy_state": "ready", "moonraker_version": "emulator"}
+        return web.json_response({"result": result})
+
+    async def _handle_upload(self, request: web.Request) -> web.Response:
+        fields: dict[str, str] = {}
+        filename, size = None, 0
+        # Drop halfway through the first drop_uploads uploads
+        drop_at = (request.content_length or 0) // 2 if self.drop_uploads else None
+        reader = await request.multipart()
+        try:
+            async for part in reader:
+                if part.name != "file":
+                    fields[part.name] = await part.text()
+                    continue
+                filename = part.filename
+                while chunk := await part.read_chunk(256 * 1024):
+                    size += len(chunk)
+                    self.stats.upload_bytes += len(chunk)
+                    if drop_at is not None and size >= drop_at:
+                        self.drop_uploads -= 1
+                        self.stats.uploads_dropped += 1
+                        request.transport.close()
+                        raise web.HTTPServiceUnavailable()
+        except ConnectionResetError:
+            # The client cancelled the upload
+            raise web.HTTPBadRequest(text="Upload aborted") from None
+        if not filename:
+            raise web.HTTPBadRequest(text="No file")
+        self.files[filename] = (size, time.time())
+        self.stats.uploads += 1
+        start = fields.get("print", "false").lower() == "true"
+        if start and self.state["device_state"] != DEVICE_PRINTING:
+            self._start_print(filename)
+        else:
+            start = False
+        return web.json_response(
+            {
+                "item": {"path": filename, "root": fields.get("root", "gcodes")},
+                "print_started": start,
+                "print_queued": False,
+                "action": "create_file",
+            },
+            status=201,
+        )
+
+    async def _handle_metadata(self, request: web.Request) -> web.Response:
+        filename = request.query.get("filename", "")
+        if filename not in self.files:
+            raise web.HTTPNotFound()
+        size, modified = self.files[filename]
+        return web.json_response(
+            {"result": {"filename": filename, "size": size, "modified": modified}}
+        )
+
+    async def _handle_print_start(self, request: web.Request) -> web.Response:
+        filename = request.query.get("filename", "")
+        if filename not in self.files:
+            raise web.HTTPNotFound()
+        if self.state["device_state"] == DEVICE_PRINTING:
+            raise web.HTTPBadRequest(text="Printer is busy")
+        self._start_print(filename)
+        return web.json_response({"result": "ok"})
+
+    async def _handle_thumbnail(self, request: web.Request) -> web.Response:
+        self.stats.thumbnail_requests += 1
+        seed = zlib.crc32(self.state["filename"].encode())
+        return web.Response(body=render_png(300, 300, seed), content_type="image/png")
+
+    async def _handle_camera(self, request: web.Request) -> web.StreamResponse:
+        action = request.query.get("action")
+        if action == "snapshot":
+            self.stats.snapshot_requests += 1
+            jpeg = self.jpegs[int(time.monotonic() * self.camera_fps) % len(self.jpegs)]
+            return web.Response(body=jpeg, content_type="image/jpeg")
+        if action != "stream":
+            raise web.HTTPNotFound()
+
+        if self.max_camera_clients is not None and self._stream_clients >= self.max_camera_clients:
+            self.stats.stream_rejected += 1
+            raise web.HTTPServiceUnavailable(text="Too many stream clients")
+
+        response = web.StreamResponse(
+            headers={"Content-Type": f"multipart/x-mixed-replace;boundary={MJPEG_BOUNDARY}"}
+        )
+        await response.prepare(request)
+        self._stream_clients += 1
+        self.stats.stream_clients += 1
+        try:
+            index = 0
+            while True:
+                jpeg = self.jpegs[index % len(self.jpegs)]
+                index += 1
+                await response.write(
+                    f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+                    + jpeg
+                    + b"\r\n"
+                )
+                await asyncio.sleep(1 / self.camera_fps)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self._stream_clients -= 1
+        return response
+
+
+async def start_printers(
+    count: int,
+    host: str = "127.0.0.1",
+    distinct_hosts: bool = False,
+    ws_port: int = 9999,
+    web_port: int = 8081,
+    camera_port: int = 8080,
+    port_stride: int = 10,
+    **kwargs: Any,
+) -> list[FakePrinter]:
+    """Start count printers and return them once every server is bound."""
+    printers = []
+    for index in range(count):
+        if distinct_hosts:
+            printer_host, offset = f"127.0.0.{index + 1}", 0
+        else:
+            printer_host, offset = host, index * port_stride
+        printer = FakePrinter(
+            name=f"K1Max-{index:03d}",
+            host=printer_host,
+            ws_port=ws_port + offset,
+            web_port=web_port + offset,
+            camera_port=camera_port + offset,
+            seed=index,
+            **kwargs,
+        )
+        await printer.start()
+        printers.append(printer)
+    return printers
+
+
+async def _run(args: argparse.Namespace) -> None:
+    width, _, height = args.camera_size.partition("x")
+    jpegs = render_jpegs(int(width), int(height), 30)
+    printers = await start_printers(
+        args.count,
+        host=args.host,
+        distinct_hosts=args.distinct_hosts,
+        ws_port=args.ws_port,
+        web_port=args.web_port,
+        camera_port=args.camera_port,
+        port_stride=args.port_stride,
+        rate=args.rate,
+        protocol=args.protocol,
+        command_delay=args.command_delay,
+        print_seconds=args.print_seconds,
+        camera_fps=args.camera_fps,
+        max_camera_clients=args.max_camera_clients,
+        disconnect_every=args.disconnect_every,
+        drop_uploads=args.drop_uploads,
+        jpegs=jpegs,
+    )
+    print(f"{'printer':<12} {'host':<12} {'ws':>6} {'web':>6} {'camera':>6}")
+    for printer in printers:
+        print(
+            f"{printer.name:<12} {printer.host:<12} {printer.ws_port:>6}"
+            f" {printer.web_port:>6} {printer.camera_port:>6}"
+        )
+
+    try:
+        while True:
+            await asyncio.sleep(args.stats_interval)
+            totals = PrinterStats()
+            for printer in printers:
+                for name, value in vars(printer.stats).items():
+                    setattr(totals, name, getattr(totals, name) + value)
+            print(json.dumps(vars(totals)))
+    finally:
+        for printer in printers:
+            await printer.stop()
+
+
+def main() -> None:
+    """Parse arguments and run until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--distinct-hosts", action="store_true")
+    parser.add_argument("--ws-port", type=int, default=9999)
+    parser.add_argument("--web-port", type=int, default=8081)
+    parser.add_argument("--camera-port", type=int, default=8080)
+    parser.add_argument("--port-stride", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=5.0, help="frames per second")
+    parser.add_argument("--protocol", choices=("creality", "moonraker"), default="creality")
+    parser.add_argument("--command-delay", type=float, default=0.5)
+    parser.add_argument("--print-seconds", type=float, default=1800.0)
+    parser.add_argument("--camera-size", default="1280x720")
+    parser.add_argument("--camera-fps", type=float, default=10.0)
+    parser.add_argument("--max-camera-clients", type=int, default=None)
+    parser.add_argument("--disconnect-every", type=float, default=None)
+    parser.add_argument("--drop-uploads", type=int, default=0)
+    parser.add_argument("--stats-interval", type=float, default=10.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()